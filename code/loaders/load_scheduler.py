@@ -0,0 +1,244 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+import mysql_helpers as sql
+
+# MySQL lock wait timeout and deadlock error codes, parallel steps hitting them are retried
+LOCK_ERROR_CODES = [1205, 1213]
+DEFAULT_MAX_RETRIES = 3
+
+
+def get_table_dependencies(engine, tables):
+    """
+    Build the foreign key dependency graph of a set of tables from the (cached) schema reflection
+
+    :param engine: sqlalchemy.engine.base.Engine
+    :param tables: list of str table names
+    :return: dictionary of {str table: set of str tables of `tables` it references}
+    """
+    dependencies = dict()
+    for table in set(tables):
+        referred_tables = [x['referred_table'] for x in sql.get_table_foreign_keys(engine, table).values()]
+        dependencies[table] = set(x for x in referred_tables if x in tables and x != table)
+    return(dependencies)
+
+
+def split_by_key(df, field, n_chunks):
+    """
+    Split a DataFrame into chunks holding disjoint, contiguous ranges of a key field, so chunks loaded
+    in parallel never touch the same keys
+
+    :param df: pandas.DataFrame
+    :param field: str key field, e.g. 'player_id'
+    :param n_chunks: int largest number of chunks
+    :return: list of pandas.DataFrame
+    """
+    keys = np.unique(df[field].values)
+    if keys.size == 0 or n_chunks <= 1:
+        return([df])
+
+    # chunk boundaries fall between keys, never inside a key's rows
+    bounds = [x[0] for x in np.array_split(keys, min(n_chunks, keys.size))]
+    chunk_ids = np.searchsorted(bounds, df[field].values, side='right') - 1
+    return([df[chunk_ids == k] for k in range(len(bounds))])
+
+
+def is_lock_error(e):
+    """
+    :param e: Exception raised by a load step
+    :return: boolean indicator for whether `e` is a MySQL deadlock or lock wait timeout
+    """
+    return(getattr(getattr(e, 'orig', e), 'errno', None) in LOCK_ERROR_CODES)
+
+
+class TableLoadScheduler(object):
+    """
+    Load tables in the order of their foreign key dependencies, running steps of independent tables
+    at the same time, so the load takes as long as its critical path instead of the sum of its tables.
+
+    A step is one function of a mysql_helpers.LoadSession writing one table, e.g. an insert, and a
+    table can have several steps, e.g. chunks of a fact table (see `split_by_key`), which then run in
+    parallel. Every step of a table waits for all steps of the tables it references, and for the steps
+    it is explicitly added `after`.
+
+    With one worker every step runs on one LoadSession, in one transaction (or one savepoint per step).
+    With more workers every step runs on its own LoadSession, so its own pooled connection and
+    transaction: a failed step stops the load, but steps committed before it stay loaded. Loads skip
+    rows that already exist, so the load can simply be run again.
+    """
+
+    def __init__(self, engine, n_workers=1, savepoints=False, max_retries=DEFAULT_MAX_RETRIES, verbose=True):
+        """
+        :param engine: sqlalchemy.engine.base.Engine, its connection pool should allow `n_workers` connections
+        :param n_workers: int number of steps run at the same time
+        :param savepoints: boolean indicator for whether each step gets its own savepoint, see
+        mysql_helpers.LoadSession, only used with one worker
+        :param max_retries: int number of times a parallel step is run again after a deadlock or lock
+        wait timeout
+        :param verbose: boolean indicator for whether SQL statements and timings should be printed
+        """
+        self.engine = engine
+        self.n_workers = n_workers
+        self.savepoints = savepoints
+        self.max_retries = max_retries
+        self.verbose = verbose
+        self.steps = list()
+        self.results = dict()
+        self.timings = dict()
+        self.failed = list()
+        self.id_maps = dict()
+        self.lock = threading.Lock()
+
+    def add(self, table, func, after=None, name=None, **kwargs):
+        """
+        Add a load step
+
+        :param table: str name of the table the step writes to
+        :param func: function called as func(session, table=table, **kwargs), e.g. mysql_helpers.LoadSession.insert
+        :param after: list of int step ids that must finish before this step starts
+        :param name: str step name for progress messages, default is the table name
+        :param kwargs: keyword arguments of `func`
+        :return: int step id, its result is `results[step id]` after `run`
+        """
+        step_id = len(self.steps)
+        self.steps.append({'table': table
+                           , 'func': func
+                           , 'after': set(after or list())
+                           , 'name': name or table
+                           , 'kwargs': kwargs})
+        return(step_id)
+
+    def get_step_dependencies(self):
+        """
+        :return: list, by step id, of sets of step ids each step waits for
+        """
+        table_dependencies = get_table_dependencies(self.engine, [x['table'] for x in self.steps])
+        table_steps = dict()
+        for step_id, step in enumerate(self.steps):
+            table_steps.setdefault(step['table'], set()).add(step_id)
+
+        step_dependencies = list()
+        for step in self.steps:
+            dependencies = set(step['after'])
+            for table in table_dependencies[step['table']]:
+                dependencies |= table_steps[table]
+            step_dependencies.append(dependencies)
+        return(step_dependencies)
+
+    def _record(self, step, start, n_rows):
+        """
+        Widen a table's wall clock span to include a finished step
+
+        :return: None
+        """
+        with self.lock:
+            first_start, last_end, rows = self.timings.get(step['table'], (start, start, 0))
+            self.timings[step['table']] = (min(first_start, start), max(last_end, time.time()), rows + n_rows)
+
+    def _run_step(self, step, session=None):
+        """
+        Run one step, on `session` or else on a new LoadSession of its own, retried after lock errors
+
+        :param step: dictionary, see `add`
+        :param session: mysql_helpers.LoadSession shared by all steps, or None
+        :return: what the step's function returns
+        """
+        print('Loading %s.' % step['name'])
+        start = time.time()
+        n_rows = sum(x.shape[0] for x in step['kwargs'].values() if hasattr(x, 'shape'))
+
+        if session is not None:
+            out = step['func'](session, table=step['table'], **step['kwargs'])
+            self._record(step, start, n_rows)
+            return(out)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                # parallel steps don't echo SQL, statements of different threads would interleave
+                with sql.LoadSession(self.engine, verbose=False, id_maps=self.id_maps) as step_session:
+                    out = step['func'](step_session, table=step['table'], **step['kwargs'])
+                break
+            except Exception as e:
+                if not is_lock_error(e) or attempt == self.max_retries:
+                    raise
+                print('Retrying %s after a lock error: %s' % (step['name'], e))
+
+        self._record(step, start, n_rows)
+        return(out)
+
+    def run(self):
+        """
+        Run every step, each one as soon as the steps it waits for are done
+
+        :return: dictionary of {int step id: step result}
+        """
+        step_dependencies = self.get_step_dependencies()
+        done = set()
+        self.start_time = time.time()
+
+        # one worker: plain topological order on one session, in one transaction
+        if self.n_workers <= 1:
+            with sql.LoadSession(self.engine
+                                 , savepoints=self.savepoints
+                                 , verbose=self.verbose
+                                 , id_maps=self.id_maps) as session:
+                while len(done) < len(self.steps):
+                    ready = [x for x in range(len(self.steps)) if x not in done and step_dependencies[x] <= done]
+                    if not ready:
+                        raise ValueError('Load steps have circular dependencies: %s'
+                                         % ', '.join(self.steps[x]['name'] for x in range(len(self.steps))
+                                                     if x not in done))
+                    for step_id in ready:
+                        self.results[step_id] = self._run_step(self.steps[step_id], session=session)
+                        done.add(step_id)
+            self.failed = session.failed
+
+        else:
+            running = dict()
+            error = None
+            with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+                while len(done) < len(self.steps):
+                    if error is None:
+                        for step_id in range(len(self.steps)):
+                            if step_id not in done and step_id not in running.values() \
+                                    and step_dependencies[step_id] <= done:
+                                running[executor.submit(self._run_step, self.steps[step_id])] = step_id
+
+                    if not running:
+                        if error is not None:
+                            break
+                        raise ValueError('Load steps have circular dependencies: %s'
+                                         % ', '.join(self.steps[x]['name'] for x in range(len(self.steps))
+                                                     if x not in done))
+
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        step_id = running.pop(future)
+                        try:
+                            self.results[step_id] = future.result()
+                            done.add(step_id)
+                        except Exception as e:
+                            # stop submitting steps, let running ones finish
+                            print('Loading %s failed: %s' % (self.steps[step_id]['name'], e))
+                            self.failed.append(self.steps[step_id]['table'])
+                            error = error or e
+
+            if error is not None:
+                raise error
+
+        # a single session prints its own timings
+        if self.verbose and self.n_workers > 1:
+            self.print_timings()
+        return(self.results)
+
+    def print_timings(self):
+        """
+        Print every table's wall clock span (first step start to last step end) and rows, in load order
+
+        :return: None
+        """
+        print('%-24s %10s %10s %12s' % ('table', 'start', 'seconds', 'rows'))
+        for table, (start, end, rows) in sorted(self.timings.items(), key=lambda x: x[1][0]):
+            print('%-24s %10.2f %10.2f %12d' % (table, start - self.start_time, end - start, rows))
+        print('%-24s %10s %10.2f' % ('total', '', time.time() - self.start_time))
@@ -1,6 +1,27 @@
 import sqlalchemy as sa
-import time
+import numpy as np
+import pandas as pd
+import os
+import tempfile
+import uuid
 import re
+import time
+import weakref
+
+STAGING_METHODS = ['rows', 'multi', 'infile']
+BULK_ROW_THRESHOLD = 10000
+DEFAULT_CHUNK_SIZE = 5000
+
+# statements that change the schema of a database (staging TEMPORARY tables aside)
+DDL_REGEX = re.compile(r'^\s*(CREATE|ALTER|DROP|RENAME|TRUNCATE)\s+(?!TEMPORARY\s)', flags=re.IGNORECASE)
+
+# one SchemaCache per engine, see `get_schema_cache`
+_schema_caches = weakref.WeakKeyDictionary()
+
+# how insert and update stage DataFrames, see `configure_staging`
+_staging_config = {'method': None
+                   , 'chunksize': DEFAULT_CHUNK_SIZE
+                   , 'bulk_row_threshold': BULK_ROW_THRESHOLD}
 
 
 # Replace generalizable sql class placeholder
@@ -37,7 +58,7 @@ def get_mysql_field_types():
     return(t)
 
 
-def get_sa_eng(user, password, host, db):
+def get_sa_eng(user, password, host, db, local_infile=False, pool_size=5):
     """
     Get sqlalchemy.engine.base.Engine object from user/database information
 
@@ -45,133 +66,496 @@ def get_sa_eng(user, password, host, db):
     :param password: str database user password
     :param host: str name of database host server
     :param db: str name of MySQL database
+    :param local_infile: boolean indicator for whether the client may send files with
+    LOAD DATA LOCAL INFILE, required by the 'infile' staging method
+    :param pool_size: int number of connections kept open in the engine's connection pool, e.g. one per
+    parallel load step
     :return: sqlalchemy.engine object
     """
 
     eng_str = 'mysql+mysqlconnector://' + user + ':' + password + '@' + host + '/' + db
-    eng = sa.engine.create_engine(eng_str)
+    if local_infile:
+        eng = sa.engine.create_engine(eng_str
+                                      , pool_size=pool_size
+                                      , connect_args={'allow_local_infile': True})
+    else:
+        eng = sa.engine.create_engine(eng_str
+                                      , pool_size=pool_size)
     return(eng)
 
 
+class SchemaCache(object):
+    """
+    Reflection cache of a MySQL database tied to one engine: every table's columns and types, primary
+    keys, unique keys and foreign keys come from a single INFORMATION_SCHEMA query, run on first use
+    and again only after `invalidate`. DDL executed through the engine (other than on TEMPORARY
+    tables) invalidates the cache automatically.
+    """
+
+    def __init__(self, engine):
+        """
+        :param engine: sqlalchemy.engine.base.Engine
+        """
+        # a weak reference: the engine's listener holds this cache, which must not keep the engine alive
+        # (see `get_schema_cache`)
+        self.engine_ref = weakref.ref(engine)
+        self.db = str(engine.url).split('/')[-1]
+        self.tables = None
+        sa.event.listen(engine, 'after_cursor_execute', self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.tables is not None and DDL_REGEX.match(statement):
+            self.invalidate()
+
+    def invalidate(self):
+        """
+        Forget the reflected schema, it is reloaded on next use
+
+        :return: None
+        """
+        self.tables = None
+
+    def load(self):
+        """
+        Reflect every table of the database in one query
+
+        :return: None
+        """
+        query = "SELECT 'column', TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, COLUMN_KEY, ORDINAL_POSITION, NULL " \
+                "FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_SCHEMA = '{0}' " \
+                "UNION ALL " \
+                "SELECT 'unique', TABLE_NAME, COLUMN_NAME, INDEX_NAME, NULL, SEQ_IN_INDEX, NULL " \
+                "FROM INFORMATION_SCHEMA.STATISTICS WHERE TABLE_SCHEMA = '{0}' AND NON_UNIQUE = 0 " \
+                "UNION ALL " \
+                "SELECT 'foreign', TABLE_NAME, COLUMN_NAME, CONSTRAINT_NAME, REFERENCED_TABLE_NAME, " \
+                "ORDINAL_POSITION, REFERENCED_COLUMN_NAME " \
+                "FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE WHERE TABLE_SCHEMA = '{0}' " \
+                "AND REFERENCED_TABLE_NAME IS NOT NULL".format(self.db)
+        # columns in table order, key fields in key order
+        rows = [[x.decode('utf-8') if isinstance(x, (bytes, bytearray)) else x for x in row]
+                for row in self.engine_ref().execute(query).fetchall()]
+        rows = sorted(rows
+                      , key=lambda x: (x[0], x[1], '' if x[0] == 'column' else str(x[3]), int(x[5])))
+
+        column_types = get_mysql_field_types()
+        tables = dict()
+        for kind, table, field, detail, key, position, referred_field in rows:
+            table_dat = tables.setdefault(table, {'schema': dict()
+                                                  , 'primary_keys': list()
+                                                  , 'unique_keys': dict()
+                                                  , 'foreign_keys': dict()})
+            if kind == 'column':
+                # INFORMATION_SCHEMA spells INTEGER columns INT(11), or INT as of MySQL 8.0.19
+                column_type = re.sub(r'^INT\b', 'INTEGER', str(detail).upper())
+                # types get_mysql_field_types doesn't list, e.g. JSON, keep their own name
+                matches = [x for x in column_types if re.search(x, column_type)]
+                table_dat['schema'][field] = {'type': max(matches, key=len) if matches else column_type.split('(')[0]}
+                size = re.search(r'\((\d+)', column_type)
+                if size:
+                    table_dat['schema'][field]['size'] = int(size.group(1))
+                if key == 'PRI':
+                    table_dat['primary_keys'].append(field)
+
+            elif kind == 'unique':
+                table_dat['unique_keys'].setdefault(detail, list()).append(field)
+
+            else:
+                foreign_key = table_dat['foreign_keys'].setdefault(detail, {'fields': list()
+                                                                            , 'referred_table': key
+                                                                            , 'referred_fields': list()})
+                foreign_key['fields'].append(field)
+                foreign_key['referred_fields'].append(referred_field)
+
+        self.tables = tables
+
+    def get_table(self, table):
+        """
+        :param table: str name of table in database
+        :return: dictionary of the table's reflected 'schema', 'primary_keys', 'unique_keys' and 'foreign_keys'
+        """
+        if self.tables is None or table not in self.tables:
+            self.load()
+        if table not in self.tables:
+            raise sa.exc.NoSuchTableError(table)
+        return(self.tables[table])
+
+    def get_table_names(self):
+        """
+        :return: list of str names of the database's tables
+        """
+        if self.tables is None:
+            self.load()
+        return(sorted(self.tables.keys()))
+
+
+def get_schema_cache(engine):
+    """
+    Get the reflection cache of an engine's database, created on first use
+
+    :param engine: sqlalchemy.engine.base.Engine
+    :return: SchemaCache
+    """
+    if engine not in _schema_caches:
+        _schema_caches[engine] = SchemaCache(engine)
+    return(_schema_caches[engine])
+
+
 # Replace generalizable sql class placeholder
 def get_mysql_table_schema(engine, table):
     """
-    Get table schema from a MySQL table
+    Get table schema from a MySQL table (cached, see `SchemaCache`)
 
     :param engine: sqlalchemy.engine.base.Engine
     :param table: str name of table in database
     :return: dictionary, keys are field names, values are dictionaries
     {'type': str SQL type, 'size': int field bytes}
     """
-    inspector = sa.inspect(engine)
-    column_types = get_mysql_field_types()
-    schema_dict = dict()
-
-    for field in inspector.get_columns(table):
-        schema_dict[field['name']] = dict()
-        schema_dict[field['name']]['type'] = [x for x in column_types if re.search(x, str(field['type']))]
-        schema_dict[field['name']]['type'] = max(schema_dict[field['name']]['type'], key=len)
-        if 'display_width' in dir(field['type']):
-            schema_dict[field['name']]['size'] = int(field['type'].display_width)
-        elif 'length' in dir(field['type']):
-            schema_dict[field['name']]['size'] = int(field['type'].length)
-
-    return(schema_dict)
+    return(get_schema_cache(engine).get_table(table)['schema'])
 
 
 def get_table_primary_keys(engine, table):
     """
-    Get names of primary key field from a SQL table
+    Get names of primary key field from a SQL table (cached, see `SchemaCache`)
 
     :param engine: sqlalchemy.engine.base.Engine
     :param table: str name of table in database
     :return: list of str names of primary keys of a SQL table
     """
-    db = str(engine.url).split('/')[-1]
-    query = "SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_SCHEMA = '%s' " \
-            "AND TABLE_NAME = '%s' AND COLUMN_KEY = 'PRI'" % (db, table)
-    pk_list = list(map(lambda x: x[0], engine.execute(query).fetchall()))
-    return(pk_list)
+    return(list(get_schema_cache(engine).get_table(table)['primary_keys']))
+
+
+def get_table_unique_keys(engine, table):
+    """
+    Get the unique keys (primary key included) of a SQL table (cached, see `SchemaCache`)
+
+    :param engine: sqlalchemy.engine.base.Engine
+    :param table: str name of table in database
+    :return: dictionary of {str index name: list of str fields}
+    """
+    return(dict(get_schema_cache(engine).get_table(table)['unique_keys']))
+
+
+def get_table_foreign_keys(engine, table):
+    """
+    Get the foreign keys of a SQL table (cached, see `SchemaCache`)
+
+    :param engine: sqlalchemy.engine.base.Engine
+    :param table: str name of table in database
+    :return: dictionary of {str constraint name: {'fields': list of str fields, 'referred_table': str table,
+    'referred_fields': list of str fields}}
+    """
+    return(dict(get_schema_cache(engine).get_table(table)['foreign_keys']))
 
 
 def get_staging_table_name(table):
     """
-    Create name for a staging table by appending '_[unix datetime]'
-    to the name of the table being staged for CRUD
+    Create a unique name for a staging table, 'tmp_[table]_[random hex]', so that concurrent
+    loads of the same table never collide
 
     :param table: str name of table in database
-    :return: str `table_[unix datetime]`
+    :return: str `tmp_[table]_[random hex]`
     """
-    staging_table_name = table + '_' + str(int(time.time()))
+    staging_table_name = 'tmp_' + table + '_' + uuid.uuid4().hex[:16]
     return(staging_table_name)
 
 
-def make_staging_table(df, conn, name, verbose=True):
+def configure_staging(method=None, chunksize=DEFAULT_CHUNK_SIZE, bulk_row_threshold=BULK_ROW_THRESHOLD):
+    """
+    Set how `insert` and `update` upload DataFrames to staging tables
+
+    :param method: str staging method, see `make_staging_table`, default None means 'rows' for small
+    DataFrames and 'multi' for DataFrames of at least `bulk_row_threshold` rows
+    :param chunksize: int number of rows per multi-row INSERT statement
+    :param bulk_row_threshold: int number of rows from which DataFrames are bulk loaded when `method` is None
+    :return: None
+    """
+    if method is not None and method not in STAGING_METHODS:
+        raise ValueError('Staging method must be one of: %s' % ', '.join(STAGING_METHODS))
+
+    _staging_config['method'] = method
+    _staging_config['chunksize'] = chunksize
+    _staging_config['bulk_row_threshold'] = bulk_row_threshold
+
+
+def get_staging_method(df, method=None):
     """
-    Upload a pandas.DataFrame to a MySQL database.
-    Will replace any table in the database whose name is same as `name` parameter
+    :param df: pandas.DataFrame to be staged
+    :param method: str staging method, default None means the configured one, see `configure_staging`
+    :return: str staging method for `df`
+    """
+    method = method or _staging_config['method']
+    if method is None:
+        method = 'multi' if df.shape[0] >= _staging_config['bulk_row_threshold'] else 'rows'
+    return(method)
+
+
+def get_infile_text(values):
+    """
+    Format a column for LOAD DATA INFILE's default text format: NULLs are \\N, and backslashes, tabs
+    and newlines inside values are escaped with a backslash
+
+    :param values: pandas.Series
+    :return: pandas.Series of str
+    """
+    is_null = pd.isnull(values)
+    if pd.api.types.is_bool_dtype(values):
+        values = values.astype(int)
+
+    text = values.astype(object).where(~is_null, '').astype(str)
+    if not pd.api.types.is_numeric_dtype(values):
+        text = text.str.replace('\\', '\\\\', regex=False)\
+            .str.replace('\t', '\\t', regex=False)\
+            .str.replace('\n', '\\n', regex=False)
+    return(text.where(~is_null, '\\N'))
+
+
+def load_data_infile(df, conn, name):
+    """
+    Bulk load a DataFrame into an existing table with LOAD DATA LOCAL INFILE, from a temporary
+    tab-separated file. Requires local_infile on the server and a client engine from
+    `get_sa_eng(..., local_infile=True)`.
+
+    :param df: pandas.DataFrame whose fields are all in table `name`
+    :param conn: sqlalchemy.engine.base.Connection
+    :param name: str name of the table to load into
+    :return: None
+    """
+    columns = [get_infile_text(df[field]).reset_index(drop=True) for field in df.columns]
+    lines = columns[0].str.cat(columns[1:], sep='\t') if len(columns) > 1 else columns[0]
+
+    fd, infile_path = tempfile.mkstemp(prefix='load_' + name + '_', suffix='.tsv')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+            if lines.shape[0]:
+                f.write('\n'.join(lines.tolist()) + '\n')
+
+        # default FIELDS/LINES options: tab separated, backslash escaped, newline terminated
+        load_stmt = "LOAD DATA LOCAL INFILE '{0}' INTO TABLE {1} ".format(infile_path.replace('\\', '/'), name)
+        load_stmt += 'CHARACTER SET utf8mb4 (' + ', '.join(df.columns) + ')'
+        conn.execute(load_stmt)
+    finally:
+        os.remove(infile_path)
+
+
+def make_staging_table(df, conn, name, verbose=True, method='rows', chunksize=DEFAULT_CHUNK_SIZE, keys=None):
+    """
+    Upload a pandas.DataFrame to a session-scoped TEMPORARY table of a MySQL database: the table only
+    exists for `conn`, takes no permanent catalog changes and disappears with the connection.
+
+    Staging methods:
+    - 'rows': one INSERT per row, sent in batches of `chunksize` rows
+    - 'multi': multi-row INSERT statements of `chunksize` rows each
+    - 'infile': LOAD DATA LOCAL INFILE from a temporary file, see `load_data_infile`
 
     :param df: pandas.DataFrame for upload to the database
     :param conn: sqlalchemy.engine.base.Connection
     :param name: str name of table to give the DataFrame once in the database
     :param verbose: boolean indicator for whether to print message about the upload
+    :param method: str staging method, 'rows', 'multi' or 'infile'
+    :param chunksize: int number of rows per INSERT statement (multi) or batch of statements (rows)
+    :param keys: list of str fields to make the staging table's primary key, so joins on them are
+    indexed, default None means no key
     :return: None
     """
+    if method not in STAGING_METHODS:
+        raise ValueError('Staging method must be one of: %s' % ', '.join(STAGING_METHODS))
+
     if verbose:
-        print('Moving %d rows into staging table %s' % (df.shape[0], name))
+        print('Moving %d rows into staging table %s (%s)' % (df.shape[0], name, method))
 
-    df.to_sql(name
-              , con=conn
-              , if_exists='replace'
-              , index=False)
+    # create the empty staging table with pandas' column types, then load it
+    create_staging_table(df
+                         , conn=conn
+                         , name=name
+                         , keys=keys)
+    fill_staging_table(df
+                       , conn=conn
+                       , name=name
+                       , method=method
+                       , chunksize=chunksize)
 
 
-def drop_table(conn, table, verbose=True):
+def create_staging_table(df, conn, name, keys=None):
+    """
+    Create an empty TEMPORARY staging table with the fields and pandas' column types of a DataFrame
+
+    :param df: pandas.DataFrame the staging table is made for
+    :param conn: sqlalchemy.engine.base.Connection
+    :param name: str name of the staging table
+    :param keys: list of str fields to make the staging table's primary key, default None means no key
+    :return: None
+    """
+    # MySQL can't index pandas' TEXT type for strings: string key fields get a VARCHAR wide enough for them
+    dtype = dict()
+    for field in (keys or list()):
+        # categoricals are typed by their categories, e.g. normalized team names
+        field_dtype = df[field].dtype
+        if isinstance(field_dtype, pd.CategoricalDtype):
+            field_dtype = field_dtype.categories.dtype
+        if pd.api.types.is_string_dtype(field_dtype):
+            width = df[field].astype(str).str.len().max()
+            dtype[field] = sa.types.VARCHAR(int(width) if pd.notnull(width) and width > 0 else 1)
+
+    create_stmt = pd.io.sql.get_schema(df, name, keys=keys, con=conn, dtype=dtype or None)
+    conn.execute(re.sub(r'^\s*CREATE TABLE', 'CREATE TEMPORARY TABLE', create_stmt))
+
+
+def get_insert_rows(df, fields):
+    """
+    :param df: pandas.DataFrame
+    :param fields: list of str fields of `df`
+    :return: list of tuples of plain Python values of `fields`, one per row, None for missing values
+    """
+    values_df = df[fields].astype(object)
+    return([tuple(x) for x in values_df.where(pd.notnull(values_df), None).itertuples(index=False)])
+
+
+def fill_staging_table(df, conn, name, method='rows', chunksize=DEFAULT_CHUNK_SIZE):
+    """
+    Append a pandas.DataFrame to an existing staging table, see `make_staging_table`. Rows are inserted
+    with explicit INSERT statements: pandas' to_sql can't see TEMPORARY tables when checking that the
+    table exists.
+
+    :param df: pandas.DataFrame for upload to the database, with the staging table's fields
+    :param conn: sqlalchemy.engine.base.Connection the staging table was made on
+    :param name: str name of the staging table
+    :param method: str staging method, 'rows', 'multi' or 'infile'
+    :param chunksize: int number of rows per INSERT statement (multi) or batch of statements (rows)
+    :return: None
+    """
+    if method == 'infile':
+        load_data_infile(df
+                         , conn=conn
+                         , name=name)
+        return
+
+    fields = list(df.columns)
+    rows = get_insert_rows(df, fields=fields)
+    row_values = '(' + ', '.join(['%s'] * len(fields)) + ')'
+    insert_stmt = 'INSERT INTO {0} ('.format(name) + ', '.join(fields) + ') VALUES '
+
+    for start in range(0, len(rows), chunksize):
+        chunk = rows[start:start + chunksize]
+        if method == 'rows':
+            conn.execute(insert_stmt + row_values, chunk)
+        else:
+            conn.execute(insert_stmt + ', '.join([row_values] * len(chunk))
+                         , tuple(x for row in chunk for x in row))
+
+
+def begin(conn):
+    """
+    Begin a transaction on a connection, unless it is already in one (e.g. the connection of a
+    LoadSession), in which case committing or rolling back is up to whoever began that one
+
+    :param conn: sqlalchemy.engine.base.Connection
+    :return: sqlalchemy.engine.base.Transaction, or None if `conn` was already in a transaction
+    """
+    if conn.in_transaction():
+        return(None)
+    return(conn.begin())
+
+
+def drop_table(conn, table, verbose=True, temporary=False):
     """
     Drop a table in an RDBMS database
 
     :param conn: sqlalchemy.engine.base.Connection
     :param table: str name of table to drop
     :param verbose: boolean indicator for whether to print the SQL to be executed
+    :param temporary: boolean indicator for whether `table` is a TEMPORARY table, e.g. a staging table
     :return: None
     """
-    drop_stmt = 'DROP TABLE {0}'.format(table)
+    drop_stmt = 'DROP {0}TABLE {1}'.format('TEMPORARY ' if temporary else '', table)
 
     if verbose:
         print('Executing SQL DROP statement:')
         print(drop_stmt)
 
-    trans = conn.begin()
+    trans = begin(conn)
     try:
         conn.execute(drop_stmt)
-        trans.commit()
+        if trans is not None:
+            trans.commit()
     except:
-        trans.rollback()
+        if trans is not None:
+            trans.rollback()
+        raise
+
+
+def delete(engine, table, field, values, verbose=True, conn=None):
+    """
+    Delete rows from a SQL table by running a statement
+    "DELETE FROM table WHERE field IN (values);"
+
+    :param engine: sqlalchemy.engine.base.Engine
+    :param table: str name of table in the database to delete rows from
+    :param field: str name of field in table used to select rows
+    :param values: list of values of `field` whose rows will be deleted
+    :param verbose: boolean indicator for whether SQL DELETE statement should be printed
+    :param conn: sqlalchemy.engine.base.Connection to run on, default None means a new connection of `engine`
+    :return: int number of deleted rows
+    """
+    if not values:
+        return(0)
+
+    delete_stmt = 'DELETE FROM {0} WHERE {1} IN ('.format(table, field)
+    delete_stmt += ', '.join(['%s'] * len(values)) + ')'
+
+    if verbose:
+        print('Executing SQL DELETE statement:')
+        print(delete_stmt % tuple(values))
+
+    own_conn = conn is None
+    if own_conn:
+        conn = engine.connect()
+
+    trans = begin(conn)
+    try:
+        n_deleted = conn.execute(delete_stmt, tuple(values)).rowcount
+        if trans is not None:
+            trans.commit()
+    except Exception as e:
+        if trans is not None:
+            trans.rollback()
+        print(e)
         raise
 
+    if own_conn:
+        conn.close()
+
+    return(n_deleted)
+
 
 # TODO: make this RDBMS-agnostic
 # TODO: add schema specification to this
-def insert(df, engine, table, id_fields, verbose=True):
+def insert(df, engine, table, id_fields, verbose=True, conn=None):
     """
     Insert data into a SQL table with data in a pandas.DataFrame by running a
     statement "INSERT INTO table_1 t1 (SELECT `fields` FROM table_2 t2
     WHERE NOT EXISTS (SELECT * FROM t2 WHERE `t1.id_fields = t2.id_fields`);"
 
+    When the table has a surrogate primary key (a single primary key field that isn't one of the
+    `id_fields`, e.g. team.team_id), the surrogate keys of the staged rows are then read back by
+    joining the table to the staging table on `id_fields`, so the caller gets a natural key -> surrogate
+    key mapping of just the rows it inserted, or that were already there, without reading the whole table.
+
     :param df: pandas.DataFrame to use for data update
     :param engine: sqlalchemy.engine.base.Engine
     :param table: str name of table in the database to be updated
     :param id_fields: str or list of str fields in table used to identify unique data instances (rows)
     :param fields: list of str fields to be updated in table.
     :param verbose: boolean indicator for whether SQL UPDATE statement should be printed
-    :return: list primary key values inserted into table
+    :param conn: sqlalchemy.engine.base.Connection to run on, default None means a new connection of `engine`
+    :return: pandas.DataFrame with `id_fields` and the surrogate primary key field, one row per distinct
+    staged natural key (rows with a NULL id field are left out), or None if the table has no surrogate key
     """
     if type(id_fields) == str:
         id_fields = [id_fields]
 
     table_schema = get_mysql_table_schema(engine, table=table)
     staging_table_name = get_staging_table_name(table=table)
-    inserted_pk_ids = None
+    id_map = None
 
     # ensure id_fields are legit
     table_fields = list(table_schema.keys())
@@ -194,57 +578,84 @@ def insert(df, engine, table, id_fields, verbose=True):
         insert_stmt += ' AND '.join(table + '.' + field + ' = t2.' + field for field in id_fields)
         insert_stmt += ')'
 
+    # construct the natural key -> surrogate key read back, the staging table is only referenced once
+    # (a MySQL TEMPORARY table can't be opened twice in one statement)
+    id_map_stmt = None
+    if id_fields and len(primary_keys) == 1 and primary_keys[0] not in id_fields:
+        id_map_stmt = 'SELECT ' + ', '.join('t1.' + field for field in id_fields + primary_keys)
+        id_map_stmt += ' FROM {0} t1 INNER JOIN (SELECT DISTINCT {1} FROM {2}) t2 ON '.format(
+            table, ', '.join(id_fields), staging_table_name)
+        id_map_stmt += ' AND '.join('t1.' + field + ' = t2.' + field for field in id_fields)
+
     # Connect to database, upload data to staging
-    conn = engine.connect()
-    make_staging_table(df
+    own_conn = conn is None
+    if own_conn:
+        conn = engine.connect()
+
+    # only stage the fields the statement reads
+    make_staging_table(df[fields]
                        , conn=conn
-                       , name=staging_table_name)
+                       , name=staging_table_name
+                       , method=get_staging_method(df)
+                       , chunksize=_staging_config['chunksize'])
 
     if verbose:
         print('Executing SQL INSERT statement:')
         print(insert_stmt)
 
     # SQL transaction block
-    trans = conn.begin()
+    trans = begin(conn)
     try:
         conn.execute(insert_stmt)
 
-        # construct *RETURNING*-like primary key returning phrase for MySQL database
-        if engine.name.lower() == 'mysql' and len(primary_keys) == 1:
-            last_insert_pk_id = conn.execute('SELECT LAST_INSERT_ID() FROM %s LIMIT 1;' % table).fetchall()[0][0]
-            max_pk_id = conn.execute('SELECT MAX(%s) FROM %s LIMIT 1;' % (primary_keys[0], table)).fetchall()[0][0]
-            if max_pk_id - last_insert_pk_id <= df.shape[0]:
-                inserted_pk_ids = list(range(last_insert_pk_id, max_pk_id + 1))
+        # *RETURNING*-like natural key -> surrogate key mapping of the staged rows
+        if id_map_stmt is not None:
+            id_map = pd.read_sql(con=conn
+                                 , sql=id_map_stmt)
 
-        trans.commit()
+        if trans is not None:
+            trans.commit()
         drop_table(conn
-                   , table=staging_table_name)
+                   , table=staging_table_name
+                   , temporary=True)
     except Exception as e:
-        trans.rollback()
+        if trans is not None:
+            trans.rollback()
         drop_table(conn
-                   , table=staging_table_name)
+                   , table=staging_table_name
+                   , temporary=True)
         print(e)
         raise
 
-    conn.close()
+    if own_conn:
+        conn.close()
 
-    return(inserted_pk_ids)
+    return(id_map)
 
 
-def update(df, engine, table, id_fields, fields='all', verbose=True):
+def update(df, engine, table, id_fields, fields='all', chunksize=None, verbose=True, conn=None):
     """
-    Update data in a MySQL table with data in a pandas.DataFrame by running a
-    statement "UPDATE table_1 INNER JOIN table_2 ON `id_fields = table2.id_fields`
-    SET table_1.fields = table_2.fields"
+    Update data in a MySQL table with data in a pandas.DataFrame by running statements
+    "UPDATE table_1 t1 INNER JOIN table_2 t2 ON t1.id_field = t2.id_field AND ...
+    SET t1.field = t2.field, ...", `chunksize` rows at a time. The staging table (table_2) is keyed on
+    `id_fields`, so each statement joins through indexes and only locks the rows it updates.
 
-    :param df: pandas.DataFrame to use for data update
+    Every chunk is committed on its own, so a failure only rolls back the chunk it happened in. On a
+    connection that is already in a transaction (e.g. `conn` of a LoadSession) all chunks are part of
+    that transaction instead, and hold their row locks until it ends.
+
+    :param df: pandas.DataFrame to use for data update, rows with a missing id field are skipped and
+    the last row of each repeated key wins
     :param engine: sqlalchemy.engine.base.Engine
     :param table: name of table in the database where data will be updated
     :param id_fields: fields in table used to identify unique data instances (rows)
     :param fields: list of str or str, names fields to be updated in table.
-    If `all`, all fields in df will be updated in table.
+    If `all`, all fields in df (besides id_fields and primary keys) will be updated in table.
+    :param chunksize: int number of rows per UPDATE statement, default None means the configured one,
+    see `configure_staging`
     :param verbose: boolean indicator for whether SQL UPDATE statement should be printed
-    :return: None
+    :param conn: sqlalchemy.engine.base.Connection to run on, default None means a new connection of `engine`
+    :return: int number of updated rows
     """
     table_schema = get_mysql_table_schema(engine, table=table)
     table_fields = list(table_schema.keys())
@@ -255,56 +666,414 @@ def update(df, engine, table, id_fields, fields='all', verbose=True):
     if type(id_fields) == str:
         id_fields = [id_fields]
 
-    if type(fields) == list:
-        fields = list(set(fields) - set(primary_keys))
-
-    elif fields == 'all':
-        fields = list(set(table_fields) - set(primary_keys))
+    if fields == 'all':
+        fields = [x for x in df.columns if x in table_fields]
 
     elif type(fields) == str:
         fields = [fields]
 
-    # Subset update to just fields supplied in df
-    fields = list(set(table_fields).intersection(set(df.columns)))
+    # ensure id_fields and fields are legit
+    missing_fields = list(set(id_fields + list(fields)) - set(table_fields))
+    missing_fields += list(set(id_fields + list(fields)) - set(df.columns))
+    if missing_fields:
+        raise ValueError('These fields are not in the %s table: %s' % (table, ', '.join(sorted(set(missing_fields)))))
 
-    # ensure id_fields are legit
-    missing_id_fields = list(set(id_fields) - set(table_fields))
-    missing_id_fields += list(set(id_fields) - set(df.columns))
-    if missing_id_fields:
-        raise ValueError('These fields are not in the %s table: %s' % (table, ', '.join(missing_id_fields)))
+    # keys are matched on, never set
+    fields = [x for x in fields if x not in id_fields and x not in primary_keys]
+    if not fields:
+        raise ValueError('No fields of the %s table to update outside of its keys' % table)
 
-    # construct update statement: where id_field = staging_table.id_field
-    update_stmt = 'UPDATE {0} INNER JOIN {1} ON '.format(table, staging_table_name)
-    for field in id_fields:
-        update_stmt += (table + '.' + field + ' = ' + staging_table_name + '.' + field)
-        if field != id_fields[0]:
-            update_stmt += ', '
+    # construct update statement: where id_field = staging_table.id_field for every id field
+    update_stmt = 'UPDATE {0} t1 INNER JOIN {1} t2 ON '.format(table, staging_table_name)
+    update_stmt += ' AND '.join('t1.' + field + ' = t2.' + field for field in id_fields)
+    update_stmt += ' SET ' + ', '.join('t1.' + field + ' = t2.' + field for field in fields)
 
-    if fields:
-        update_stmt += ' SET ' + ', '.join([table + '.' + field + ' = ' + staging_table_name
-                                            + '.' + field for field in fields])
-    # Connect to database, upload data to staging
-    conn = engine.connect()
-    make_staging_table(df
-                       , conn=conn
-                       , name=staging_table_name)
+    # only stage the fields the statement reads, one row per key
+    staging_df = df.loc[df[id_fields].notnull().all(axis=1), id_fields + fields]
+    staging_df = staging_df.drop_duplicates(id_fields, keep='last')
+    chunksize = chunksize or _staging_config['chunksize']
+
+    # picked from all staged rows, chunks alone would never reach the bulk row threshold
+    method = get_staging_method(staging_df)
 
     if verbose:
-        print('Executing SQL UPDATE statement:')
+        print('Executing SQL UPDATE statement on %d rows:' % staging_df.shape[0])
         print(update_stmt)
 
-    # SQL transaction block
-    trans = conn.begin()
+    # Connect to database, make a staging table keyed on id_fields
+    own_conn = conn is None
+    if own_conn:
+        conn = engine.connect()
+
+    create_staging_table(staging_df
+                         , conn=conn
+                         , name=staging_table_name
+                         , keys=id_fields)
+
+    # one transaction per chunk, so row locks are held for one chunk at a time: the staging table is
+    # emptied and refilled for every chunk
+    trans = None
+    n_updated = 0
     try:
-        conn.execute(update_stmt)
-        trans.commit()
+        for start in range(0, staging_df.shape[0], chunksize):
+            trans = begin(conn)
+            chunk_df = staging_df.iloc[start:start + chunksize]
+            if start > 0:
+                conn.execute('DELETE FROM {0};'.format(staging_table_name))
+            fill_staging_table(chunk_df
+                               , conn=conn
+                               , name=staging_table_name
+                               , method=method
+                               , chunksize=_staging_config['chunksize'])
+            n_updated += conn.execute(update_stmt).rowcount
+            if trans is not None:
+                trans.commit()
+                trans = None
+
         drop_table(conn
-                   , table=staging_table_name)
+                   , table=staging_table_name
+                   , temporary=True)
     except Exception as e:
-        trans.rollback()
+        if trans is not None:
+            trans.rollback()
         drop_table(conn
-                   , table=staging_table_name)
+                   , table=staging_table_name
+                   , temporary=True)
+        print(e)
+        raise
+
+    if own_conn:
+        conn.close()
+
+    return(n_updated)
+
+
+def upsert(df, engine, table, fields='all', chunksize=None, verbose=True, conn=None):
+    """
+    Insert new rows and update existing ones of a SQL table with a primary or unique key by running
+    statements "INSERT INTO table (`fields`) VALUES (...), (...) ON DUPLICATE KEY UPDATE
+    field = VALUES(field)", `chunksize` rows at a time, without a staging table
+
+    :param df: pandas.DataFrame to insert or update, holding every field of at least one unique key of table
+    :param engine: sqlalchemy.engine.base.Engine
+    :param table: str name of table in the database
+    :param fields: list of str or str, names of fields updated when a row already exists.
+    If `all`, all fields in df outside of the table's unique keys will be updated.
+    :param chunksize: int number of rows per statement, default None means the configured one,
+    see `configure_staging`
+    :param verbose: boolean indicator for whether SQL INSERT statement should be printed
+    :param conn: sqlalchemy.engine.base.Connection to run on, default None means a new connection of `engine`
+    :return: int number of affected rows (MySQL counts 1 per inserted row and 2 per updated row)
+    """
+    table_fields = list(get_mysql_table_schema(engine, table=table).keys())
+    unique_keys = get_table_unique_keys(engine, table=table)
+    insert_fields = [x for x in df.columns if x in table_fields]
+
+    df_keys = [x for x in unique_keys.values() if set(x).issubset(insert_fields)]
+    if not df_keys:
+        raise ValueError('No unique key of the %s table is in the DataFrame: %s'
+                         % (table, '; '.join(', '.join(x) for x in unique_keys.values())))
+
+    key_fields = set(x for key in unique_keys.values() for x in key)
+    if fields == 'all':
+        fields = [x for x in insert_fields if x not in key_fields]
+    elif type(fields) == str:
+        fields = [fields]
+    fields = [x for x in fields if x in insert_fields]
+
+    upsert_stmt = 'INSERT INTO {0} ('.format(table) + ', '.join(insert_fields)
+    upsert_stmt += ') VALUES (' + ', '.join(['%s'] * len(insert_fields)) + ') ON DUPLICATE KEY UPDATE '
+    if fields:
+        upsert_stmt += ', '.join(field + ' = VALUES(' + field + ')' for field in fields)
+    else:
+        # existing rows are left as they are, unlike INSERT IGNORE other errors still raise
+        upsert_stmt += '{0} = {0}'.format(df_keys[0][0])
+
+    if verbose:
+        print('Executing SQL INSERT statement on %d rows:' % df.shape[0])
+        print(upsert_stmt)
+
+    rows = get_insert_rows(df, fields=insert_fields)
+    chunksize = chunksize or _staging_config['chunksize']
+    n_affected = 0
+
+    # SQL transaction block
+    own_conn = conn is None
+    if own_conn:
+        conn = engine.connect()
+
+    trans = begin(conn)
+    try:
+        for start in range(0, len(rows), chunksize):
+            n_affected += conn.execute(upsert_stmt, rows[start:start + chunksize]).rowcount
+        if trans is not None:
+            trans.commit()
+    except Exception as e:
+        if trans is not None:
+            trans.rollback()
         print(e)
         raise
 
-    conn.close()
\ No newline at end of file
+    if own_conn:
+        conn.close()
+
+    return(n_affected)
+
+
+def melt_sparse(df, id_fields, value_fields, var_name='stat_name', value_name='stat_value'):
+    """
+    Convert a wide DataFrame whose value fields are mostly missing to long format, one row per
+    non-missing value, e.g. player_stats rows to (player_id, year, stat_name, stat_value) rows
+
+    :param df: pandas.DataFrame in wide format
+    :param id_fields: list of str fields identifying a wide row, kept on every long row
+    :param value_fields: list of str numeric fields to melt
+    :param var_name: str name of the long format field holding value field names
+    :param value_name: str name of the long format field holding values
+    :return: pandas.DataFrame with `id_fields`, `var_name` (categorical) and `value_name` fields
+    """
+    values = df[value_fields].to_numpy(dtype=float, na_value=np.nan)
+    rows, cols = np.nonzero(~np.isnan(values))
+
+    long_df = df[id_fields].iloc[rows].reset_index(drop=True)
+    long_df[var_name] = pd.Categorical.from_codes(cols, categories=value_fields)
+    long_df[value_name] = values[rows, cols]
+    return(long_df)
+
+
+def insert_sparse(df, engine, table, id_fields, value_fields, dim_table, dim_id_field, dim_name_field
+                  , value_name='stat_value', dim_df=None, verbose=True, conn=None):
+    """
+    Insert wide, mostly missing data into a long-format SQL table, e.g. player_stats rows into
+    player_stat_value, so that only non-missing values are staged and stored. Value field names are
+    replaced by their ids in a dimension table, e.g. stat, which must already hold every value field.
+
+    :param df: pandas.DataFrame in wide format
+    :param engine: sqlalchemy.engine.base.Engine
+    :param table: str name of the long-format table in the database
+    :param id_fields: list of str fields identifying a wide row, e.g. ['player_id', 'year']
+    :param value_fields: list of str numeric fields of `df` to insert
+    :param dim_table: str name of the dimension table of value fields, e.g. 'stat'
+    :param dim_id_field: str dimension table id field, also a field of `table`, e.g. 'stat_id'
+    :param dim_name_field: str dimension table field holding value field names, e.g. 'stat_name'
+    :param value_name: str `table` field holding values
+    :param dim_df: pandas.DataFrame of the dimension table's `dim_id_field` and `dim_name_field`, e.g.
+    what `insert` returned for it, default None means read them from the dimension table
+    :param verbose: boolean indicator for whether SQL INSERT statement should be printed
+    :param conn: sqlalchemy.engine.base.Connection to run on, default None means a new connection of `engine`
+    :return: int number of long-format rows staged for insert
+    """
+    if dim_df is None:
+        dim_df = pd.read_sql(con=conn if conn is not None else engine
+                             , sql='SELECT {0}, {1} FROM {2};'.format(dim_id_field, dim_name_field, dim_table))
+    dim_ids = dict(zip(dim_df[dim_name_field], dim_df[dim_id_field]))
+
+    missing_fields = [x for x in value_fields if x not in dim_ids]
+    if missing_fields:
+        raise ValueError('These fields are not in the %s table: %s' % (dim_table, ', '.join(missing_fields)))
+
+    long_df = melt_sparse(df
+                          , id_fields=id_fields
+                          , value_fields=value_fields
+                          , var_name=dim_name_field
+                          , value_name=value_name)
+    long_df[dim_id_field] = long_df[dim_name_field].cat.rename_categories(
+        [dim_ids[x] for x in long_df[dim_name_field].cat.categories]).astype(int)
+
+    insert(long_df[id_fields + [dim_id_field, value_name]]
+           , engine=engine
+           , table=table
+           , id_fields=id_fields + [dim_id_field]
+           , verbose=verbose
+           , conn=conn)
+
+    return(long_df.shape[0])
+
+
+class LoadSession(object):
+    """
+    One connection and one transaction for a whole load, instead of a connection (and a transaction)
+    per insert, update, upsert, delete or read. Used as a context manager, the transaction is committed
+    when the block finishes and rolled back when it raises, so a failed load leaves no half-populated
+    tables behind. Reads go through the session's connection too, so they see its uncommitted rows.
+
+    With `savepoints`, every table step runs inside its own SAVEPOINT instead: a step that fails is
+    rolled back to its savepoint, reported and skipped, and the steps that succeeded are still committed.
+
+    Every step is timed, see `timings` and `print_timings`.
+
+    The session also caches the natural key -> surrogate key mappings returned by its inserts, merged
+    across inserts into the same table, so later steps find foreign keys with `get_id_map` instead of
+    reading whole tables back.
+    """
+
+    def __init__(self, engine, savepoints=False, verbose=True, id_maps=None):
+        """
+        :param engine: sqlalchemy.engine.base.Engine, see `get_sa_eng`
+        :param savepoints: boolean indicator for whether each table step gets its own savepoint
+        :param verbose: boolean indicator for whether SQL statements and timings should be printed
+        :param id_maps: dictionary ID cache to share with other sessions, see `get_id_map`, default None
+        means a new one
+        """
+        self.engine = engine
+        self.savepoints = savepoints
+        self.verbose = verbose
+        self.conn = None
+        self.trans = None
+        self.timings = dict()
+        self.failed = list()
+        self.id_maps = id_maps if id_maps is not None else dict()
+
+    def __enter__(self):
+        self.conn = self.engine.connect()
+        self.trans = self.conn.begin()
+        self.start_time = time.time()
+        return(self)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.trans.commit()
+            else:
+                print('Rolling back the load.')
+                self.trans.rollback()
+        finally:
+            self.conn.close()
+            self.conn = None
+            self.trans = None
+
+        if self.verbose:
+            self.print_timings()
+        return(False)
+
+    def _run(self, table, n_rows, func, **kwargs):
+        """
+        Run one table step on the session's connection, timed and, with savepoints, in its own savepoint
+
+        :param table: str name of the table the step writes to
+        :param n_rows: int number of DataFrame rows (or values) the step is given
+        :param func: one of `insert`, `update`, `upsert`, `delete` or `insert_sparse`
+        :param kwargs: keyword arguments of `func` other than engine, table, verbose and conn
+        :return: what `func` returns, or None if the step failed and was rolled back to its savepoint
+        """
+        start = time.time()
+        savepoint = self.conn.begin_nested() if self.savepoints else None
+        out = None
+        try:
+            out = func(engine=self.engine
+                       , table=table
+                       , verbose=self.verbose
+                       , conn=self.conn
+                       , **kwargs)
+            if savepoint is not None:
+                savepoint.commit()
+        except Exception as e:
+            if savepoint is None:
+                raise
+            savepoint.rollback()
+            self.failed.append(table)
+            print('Loading the %s table failed, rolled back to its savepoint: %s' % (table, e))
+
+        seconds, rows = self.timings.get(table, (0., 0))
+        self.timings[table] = (seconds + time.time() - start, rows + n_rows)
+        return(out)
+
+    def insert(self, df, table, id_fields):
+        """
+        :return: see `insert`, the mapping is also added to the session's ID cache
+        """
+        id_map = self._run(table, df.shape[0], insert
+                           , df=df
+                           , id_fields=id_fields)
+        if id_map is not None:
+            self.update_id_map(table, id_map)
+        return(id_map)
+
+    def update_id_map(self, table, id_map):
+        """
+        Add natural key -> surrogate key pairs to the ID cache of a table, newer pairs win
+
+        :param table: str table name
+        :param id_map: pandas.DataFrame of natural key fields and the surrogate key field, see `insert`
+        :return: None
+        """
+        if table in self.id_maps:
+            id_fields = [x for x in id_map.columns if x not in get_table_primary_keys(self.engine, table)]
+            id_map = pd.concat([self.id_maps[table], id_map]
+                               , ignore_index=True).drop_duplicates(id_fields, keep='last')
+        self.id_maps[table] = id_map.reset_index(drop=True)
+
+    def get_id_map(self, table, id_fields):
+        """
+        :param table: str table name
+        :param id_fields: list of str natural key fields of `table`
+        :return: pandas.DataFrame natural key -> surrogate key mapping of every row this session
+        inserted (or found already there) in `table`, see `insert`. Tables the session hasn't inserted
+        into, e.g. because their step failed, are read back whole.
+        """
+        if table not in self.id_maps:
+            query = 'SELECT {0} FROM {1};'.format(', '.join(id_fields + get_table_primary_keys(self.engine, table))
+                                                  , table)
+            self.id_maps[table] = self.read_sql(query)
+        return(self.id_maps[table])
+
+    def update(self, df, table, id_fields, fields='all', chunksize=None):
+        """
+        :return: see `update`
+        """
+        return(self._run(table, df.shape[0], update
+                         , df=df
+                         , id_fields=id_fields
+                         , fields=fields
+                         , chunksize=chunksize))
+
+    def upsert(self, df, table, fields='all', chunksize=None):
+        """
+        :return: see `upsert`
+        """
+        return(self._run(table, df.shape[0], upsert
+                         , df=df
+                         , fields=fields
+                         , chunksize=chunksize))
+
+    def delete(self, table, field, values):
+        """
+        :return: see `delete`
+        """
+        return(self._run(table, len(values), delete
+                         , field=field
+                         , values=values))
+
+    def insert_sparse(self, df, table, id_fields, value_fields, dim_table, dim_id_field, dim_name_field
+                      , value_name='stat_value'):
+        """
+        :return: see `insert_sparse`
+        """
+        return(self._run(table, df.shape[0], insert_sparse
+                         , df=df
+                         , id_fields=id_fields
+                         , value_fields=value_fields
+                         , dim_table=dim_table
+                         , dim_id_field=dim_id_field
+                         , dim_name_field=dim_name_field
+                         , value_name=value_name
+                         , dim_df=self.id_maps.get(dim_table)))
+
+    def read_sql(self, query):
+        """
+        :param query: str SQL SELECT query
+        :return: pandas.DataFrame, read on the session's connection
+        """
+        return(pd.read_sql(con=self.conn
+                           , sql=query))
+
+    def print_timings(self):
+        """
+        Print the time spent on, and the number of rows given to, every table, in load order
+
+        :return: None
+        """
+        print('%-24s %10s %12s' % ('table', 'seconds', 'rows'))
+        for table, (seconds, rows) in self.timings.items():
+            print('%-24s %10.2f %12d%s' % (table, seconds, rows, ' (failed)' if table in self.failed else ''))
+        print('%-24s %10.2f' % ('total', time.time() - self.start_time))
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+# rapidfuzz computes whole similarity matrices in C across all cores; fall back to fuzzywuzzy pairs without it
+try:
+    from rapidfuzz import fuzz as rapid_fuzz
+    from rapidfuzz.process import cdist
+except ImportError:
+    from fuzzywuzzy import fuzz
+    cdist = None
+
+
+class UnionFind(object):
+    """
+    Disjoint-set forest over the integers 0, ..., n - 1 with path compression and union by size
+    """
+
+    def __init__(self, n):
+        self.parent = np.arange(n)
+        self.size = np.ones(n, dtype=int)
+
+    def find(self, i):
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return(root)
+
+    def union(self, i, j):
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i == root_j:
+            return
+        if self.size[root_i] < self.size[root_j]:
+            root_i, root_j = root_j, root_i
+        self.parent[root_j] = root_i
+        self.size[root_i] += self.size[root_j]
+
+
+def normalize_text(values):
+    """
+    Normalize names or towns for blocking and matching: lowercase, punctuation dropped, whitespace squeezed
+
+    :param values: pandas.Series of str
+    :return: pandas.Series of str
+    """
+    values = values.astype(object).where(pd.notnull(values), '').astype(str).str.lower()
+    values = values.str.replace(r'[^a-z0-9, ]', '', regex=True).str.replace(r'\s+', ' ', regex=True)
+    return(values.str.strip())
+
+
+def get_town_similarity(towns, n_workers=-1):
+    """
+    Get the hometown similarity matrix of a set of distinct towns, the higher of fuzz.ratio and
+    fuzz.partial_token_set_ratio for every pair
+
+    :param towns: list of str normalized town names
+    :param n_workers: int number of cores used to compute the matrix, -1 means all
+    :return: numpy.ndarray (len(towns), len(towns)) of uint8 scores between 0 and 100
+    """
+    if cdist is None:
+        return(np.array([[max(fuzz.ratio(x, y), fuzz.partial_token_set_ratio(x, y)) for y in towns] for x in towns]
+                        , dtype=np.uint8))
+
+    similarity = cdist(towns, towns
+                       , scorer=rapid_fuzz.ratio
+                       , dtype=np.uint8
+                       , workers=n_workers)
+    np.maximum(similarity
+               , cdist(towns, towns
+                       , scorer=rapid_fuzz.partial_token_set_ratio
+                       , dtype=np.uint8
+                       , workers=n_workers)
+               , out=similarity)
+    return(similarity)
+
+
+def find_duplicate_players(player_df, name_field='player_name', hometown_field='player_hometown'
+                           , state_field=None, threshold=80, n_workers=-1):
+    """
+    It's likely that thousands of players have their hometowns misspelled, e.g. "Downingtown, PA" and
+    "Downing Town, PA" or "Shippensville, PA" and "Shippenville, PA", so this clusters rows that are likely
+    the same player listed under different spellings of one hometown.
+
+    Rows are blocked by normalized player name plus hometown state, so only players who share a name
+    and a state are ever compared. Hometown similarities are computed as one batched matrix per block,
+    over the block's distinct towns only, and every pair of rows in a block whose hometowns score
+    above `threshold` is merged with union-find, so clusters can have any size.
+
+    Note: this assumes that there aren't two players with exactly the same name coming from similarly
+    named towns of the same state, which is a modest assumption, but still an assumption.
+
+    :param player_df: pandas.DataFrame with one row per (player name, hometown)
+    :param name_field: str name of the player name column
+    :param hometown_field: str name of the "City, ST" hometown column
+    :param state_field: str name of a hometown state column, default None means take the state from
+    `hometown_field`
+    :param threshold: int similarity score between 0 and 100 above which two hometowns are considered the same
+    :param n_workers: int number of cores used for similarity matrices, -1 means all
+    :return: pandas.Series, indexed like `player_df`, of the index label of each row's cluster
+    representative (its first row)
+    """
+    n = player_df.shape[0]
+    names = normalize_text(player_df[name_field]).values
+    hometowns = player_df[hometown_field].astype(object).where(pd.notnull(player_df[hometown_field]), '')
+    hometowns = hometowns.astype(str)
+
+    if state_field:
+        states = player_df[state_field].astype(object).where(pd.notnull(player_df[state_field]), '').astype(str)
+    else:
+        states = hometowns.str.rsplit(',', n=1).str[-1].where(hometowns.str.contains(','), '')
+    states = normalize_text(states).values
+    towns = normalize_text(hometowns).values
+
+    # blocks of row positions sharing a name and a state, only blocks with 2+ rows can hold duplicates
+    block_ids = pd.MultiIndex.from_arrays([names, states]).factorize()[0]
+    block_sizes = np.bincount(block_ids)
+    candidates = np.flatnonzero(block_sizes[block_ids] > 1)
+    candidates = candidates[np.argsort(block_ids[candidates], kind='stable')]
+    blocks = np.split(candidates, np.flatnonzero(np.diff(block_ids[candidates])) + 1)
+
+    union_find = UnionFind(n)
+    for rows in blocks:
+        if rows.size < 2:
+            continue
+
+        # one similarity matrix per block, over its distinct towns, then spread over its pairs of rows
+        block_towns, town_idx = np.unique(towns[rows], return_inverse=True)
+        similarity = get_town_similarity(block_towns.tolist(), n_workers=n_workers)
+        is_match = np.triu(similarity[np.ix_(town_idx, town_idx)] > threshold, k=1)
+        for a, b in zip(*np.nonzero(is_match)):
+            union_find.union(rows[a], rows[b])
+
+    # representative of a cluster: its first row
+    roots = np.array([union_find.find(i) for i in range(n)])
+    first_row = pd.Series(np.arange(n)).groupby(roots).transform('min').values
+    return(pd.Series(player_df.index[first_row], index=player_df.index))
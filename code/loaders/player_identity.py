@@ -0,0 +1,373 @@
+import hashlib
+import json
+import os
+import sys
+from collections import Counter
+import numpy as np
+import pandas as pd
+import mysql_helpers as sql
+from player_dedup import normalize_text
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'scrapers'))
+from page_cache import atomic_write
+
+IDENTITY_TABLE = 'player_identity'
+IDENTITY_TABLE_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', 'sql', 'player_identity.sql')
+DEFAULT_LOCK_TIMEOUT = 60
+HOMETOWN_KEY = 'hometown'
+TEAM_KEY = 'team'
+DEFAULT_MAX_YEAR_GAP = 2
+
+
+def get_identity_key(key_type, name, value):
+    """
+    Make the key of one player identity, e.g. "hometown:john smith|downingtown, pa"
+
+    :param key_type: str HOMETOWN_KEY or TEAM_KEY
+    :param name: str normalized player name
+    :param value: str normalized hometown or team name
+    :return: str identity key
+    """
+    return(key_type + ':' + name + '|' + value)
+
+
+def get_identity_hash(key):
+    """
+    :param key: str identity key, see `get_identity_key`
+    :return: str sha1 hex digest of the key, the primary key of the `player_identity` table
+    """
+    return(hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+
+class PlayerIdentityIndex(object):
+    """
+    Persistent index from player identities to `player.player_id`, so every season's rows resolve their
+    player_id through dictionary lookups instead of reading the whole `player` table and merging on
+    name and hometown. Two kinds of keys point at a player:
+
+    - hometown keys: (normalized name, normalized hometown), only for players with a hometown
+    - team keys: (normalized name, normalized team name), with the first and last seasons seen, so a
+      player listed under a different hometown keeps their player_id while staying on the same team
+      (team continuity)
+
+    The index is kept in the `player_identity` table (sql/player_identity.sql, created on `open` in
+    databases deployed before it existed) and mirrored to a JSON file on disk. The file is only trusted
+    while it agrees with the table (number of keys, max player_id and a checksum of every key), otherwise
+    the index is read back from the table, so incremental loads from different machines stay consistent.
+
+    New player_ids are handed out here, not by the database, so `open` takes a MySQL named lock that
+    `close` releases (as does the end of the process): a second load opening the index waits until
+    the first one is done, then sees its players.
+    """
+
+    def __init__(self, engine, index_file, max_year_gap=DEFAULT_MAX_YEAR_GAP, conn=None
+                 , lock_timeout=DEFAULT_LOCK_TIMEOUT):
+        """
+        :param engine: sqlalchemy.engine.base.Engine
+        :param index_file: str path of the on-disk JSON copy of the index
+        :param max_year_gap: int largest number of seasons between two appearances of a player on one
+        team for a team key to still match
+        :param conn: sqlalchemy.engine.base.Connection to read and write on, e.g. the one of a
+        mysql_helpers.LoadSession so uncommitted `player` rows are seen, default None means `engine`
+        :param lock_timeout: int seconds `open` waits for another load to release the index
+        """
+        self.engine = engine
+        self.conn = conn
+        self.con = conn if conn is not None else engine
+        self.index_file = os.path.abspath(index_file)
+        self.max_year_gap = max_year_gap
+        self.identities = dict()
+        self.changed = set()
+        self.next_player_id = 1
+        self.lock_timeout = lock_timeout
+        self.lock_conn = None
+
+    def _get_table_state(self, con=None):
+        """
+        :param con: sqlalchemy.engine.base.Connection to read on, default None means the index's own
+        :return: (int number of keys, int max player_id, int checksum of every key's row) 3-tuple of the
+        `player_identity` table
+        """
+        con = con if con is not None else self.con
+        query = "SELECT COUNT(*), MAX(player_id), BIT_XOR(CRC32(CONCAT_WS('|', identity_hash, player_id" \
+                ", COALESCE(first_year, 0), COALESCE(last_year, 0)))) FROM %s;" % IDENTITY_TABLE
+        n_keys, max_player_id, checksum = con.execute(query).fetchall()[0]
+        return((int(n_keys), int(max_player_id or 0), int(checksum or 0)))
+
+    def _read_table(self):
+        """
+        Read the index from the `player_identity` table
+
+        :return: None
+        """
+        rows = self.con.execute('SELECT identity_key, player_id, first_year, last_year FROM %s;'
+                                % IDENTITY_TABLE).fetchall()
+        self.identities = dict((key, [int(player_id)
+                                      , int(first_year) if first_year is not None else None
+                                      , int(last_year) if last_year is not None else None])
+                               for key, player_id, first_year, last_year in rows)
+
+    def _bootstrap(self):
+        """
+        Build the index of a database loaded before `player_identity` existed from its `player` and
+        `team_player_position` tables (one time only)
+
+        :return: None
+        """
+        player_df = pd.read_sql(con=self.con
+                                , sql='SELECT player_id, player_name, player_hometown FROM player;')
+        for player_id, name, hometown in zip(player_df['player_id'].tolist()
+                                             , normalize_text(player_df['player_name']).tolist()
+                                             , normalize_text(player_df['player_hometown']).tolist()):
+            if hometown:
+                self.add(HOMETOWN_KEY, name, hometown, player_id)
+
+        team_df = pd.read_sql(con=self.con
+                              , sql='SELECT tpp.player_id, p.player_name, t.team_name'
+                                    ', MIN(tpp.year) AS first_year, MAX(tpp.year) AS last_year'
+                                    ' FROM team_player_position tpp'
+                                    ' INNER JOIN player p ON p.player_id = tpp.player_id'
+                                    ' INNER JOIN team t ON t.team_id = tpp.team_id'
+                                    ' GROUP BY tpp.player_id, p.player_name, t.team_name;')
+        for player_id, name, team, first_year, last_year in zip(team_df['player_id'].tolist()
+                                                                , normalize_text(team_df['player_name']).tolist()
+                                                                , normalize_text(team_df['team_name']).tolist()
+                                                                , team_df['first_year'].tolist()
+                                                                , team_df['last_year'].tolist()):
+            self.add(TEAM_KEY, name, team, player_id, year=int(first_year))
+            self.add(TEAM_KEY, name, team, player_id, year=int(last_year))
+
+    def _get_lock_name(self):
+        """
+        :return: str name of the MySQL named lock of this database's index
+        """
+        return('%s.%s' % (self.engine.url.database, IDENTITY_TABLE))
+
+    def _create_table(self):
+        """
+        Create the `player_identity` table in a database deployed before it existed
+
+        :return: None
+        """
+        if IDENTITY_TABLE in sql.get_schema_cache(self.engine).get_table_names():
+            return
+        print('Creating the %s table.' % IDENTITY_TABLE)
+        with open(IDENTITY_TABLE_FILE, 'r') as f:
+            create_stmt = f.read()
+        self.engine.execute(create_stmt.replace('CREATE TABLE', 'CREATE TABLE IF NOT EXISTS', 1))
+
+    def open(self):
+        """
+        Take the index's lock, then load the index, from the on-disk copy when it matches the
+        `player_identity` table
+
+        :return: self
+        """
+        # held on a connection of its own until `close`
+        self.lock_conn = self.engine.connect()
+        locked = self.lock_conn.execute('SELECT GET_LOCK(%s, %s);'
+                                        , (self._get_lock_name(), self.lock_timeout)).fetchall()[0][0]
+        if locked != 1:
+            self.close()
+            raise RuntimeError('Another load is still resolving player identities of %s, gave up after %d seconds.'
+                               % (self.engine.url.database, self.lock_timeout))
+
+        self._create_table()
+        n_keys, max_player_id, checksum = self._get_table_state()
+
+        # a re-keyed or merged player changes the checksum, even when the number of keys and max player_id stay
+        loaded = False
+        if os.path.isfile(self.index_file):
+            with open(self.index_file, 'r') as f:
+                index_dat = json.load(f)
+            index_state = [index_dat.get(x) for x in ['n_keys', 'max_player_id', 'checksum']]
+            if index_state == [n_keys, max_player_id, checksum]:
+                self.identities = index_dat['identities']
+                loaded = True
+
+        if not loaded and n_keys:
+            print('Player identity file %s is missing or stale, reading the %s table.'
+                  % (self.index_file, IDENTITY_TABLE))
+            self._read_table()
+
+        elif not loaded:
+            self._bootstrap()
+
+        max_db_player_id = self.con.execute('SELECT MAX(player_id) FROM player;').fetchall()[0][0]
+        self.next_player_id = max([int(max_db_player_id or 0)]
+                                  + [x[0] for x in self.identities.values()]) + 1
+        return(self)
+
+    def add(self, key_type, name, value, player_id, year=None):
+        """
+        Point a key at a player, widening the key's seasons to include `year`
+
+        :param key_type: str HOMETOWN_KEY or TEAM_KEY
+        :param name: str normalized player name
+        :param value: str normalized hometown or team name
+        :param player_id: int player_id
+        :param year: int season the key was seen in, or None
+        :return: None
+        """
+        key = get_identity_key(key_type, name, value)
+        identity = self.identities.get(key)
+
+        if identity is None or identity[0] != player_id:
+            identity = [player_id, year, year]
+        elif year is not None:
+            identity = [player_id
+                        , year if identity[1] is None else min(identity[1], year)
+                        , year if identity[2] is None else max(identity[2], year)]
+
+        if self.identities.get(key) != identity:
+            self.identities[key] = identity
+            self.changed.add(key)
+
+    def lookup_team(self, name, team, year):
+        """
+        :param name: str normalized player name
+        :param team: str normalized team name
+        :param year: int season
+        :return: int player_id of the player with this name on this team within `max_year_gap` seasons
+        of `year`, or None
+        """
+        identity = self.identities.get(get_identity_key(TEAM_KEY, name, team))
+        if identity is None or identity[1] is None:
+            return(None)
+        if identity[1] - self.max_year_gap <= year <= identity[2] + self.max_year_gap:
+            return(identity[0])
+        return(None)
+
+    def resolve(self, player_df, year, team, hometown_aliases=None):
+        """
+        Get the player_id of every player on one team's roster for one season, registering new players
+        (with new player_ids) and new keys of known players on the way. A hometown key match wins over
+        a team continuity match, which only applies to names listed once on the roster; one player_id
+        is never given to two rows of the same roster.
+
+        :param player_df: pandas.DataFrame with 'player_name' and 'player_hometown' columns
+        :param year: int season
+        :param team: str team name
+        :param hometown_aliases: dictionary of {(str player_name, str player_hometown): str player_hometown},
+        hometowns considered misspellings of another, see `player_dedup.find_duplicate_players`
+        :return: (pandas.Series of int player_ids indexed like `player_df`, list of int new player_ids) 2-tuple
+        """
+        names = normalize_text(player_df['player_name']).tolist()
+        raw_hometowns = player_df['player_hometown'].astype(object).where(pd.notnull(player_df['player_hometown']), None)
+        if hometown_aliases:
+            raw_hometowns = [hometown_aliases.get((name, hometown), hometown)
+                             for name, hometown in zip(player_df['player_name'].tolist(), raw_hometowns.tolist())]
+        hometowns = normalize_text(pd.Series(raw_hometowns, dtype=object)).tolist()
+        team_value = normalize_text(pd.Series([team])).iloc[0]
+
+        # team keys are ambiguous for names listed more than once on the roster
+        name_counts = Counter(names)
+
+        player_ids = list()
+        new_player_ids = list()
+        roster_ids = set()
+        for name, hometown in zip(names, hometowns):
+            # a missing hometown identifies no one: players sharing a name would all match it
+            identity = self.identities.get(get_identity_key(HOMETOWN_KEY, name, hometown)) if hometown else None
+            player_id = identity[0] if identity is not None and identity[0] not in roster_ids else None
+
+            if player_id is None and name_counts[name] == 1:
+                player_id = self.lookup_team(name, team_value, year)
+
+            if player_id is None:
+                player_id = self.next_player_id
+                self.next_player_id += 1
+                new_player_ids.append(player_id)
+
+            if hometown and get_identity_key(HOMETOWN_KEY, name, hometown) not in self.identities:
+                self.add(HOMETOWN_KEY, name, hometown, player_id)
+            if name_counts[name] == 1:
+                self.add(TEAM_KEY, name, team_value, player_id, year=year)
+
+            roster_ids.add(player_id)
+            player_ids.append(player_id)
+
+        return((pd.Series(player_ids, index=player_df.index), new_player_ids))
+
+    def resolve_season(self, season_df, year, hometown_aliases=None):
+        """
+        Get the player_id of every row of one season, team by team, see `resolve`. A new player listed by
+        two teams in the season gets one player_id, and one row of the new players.
+
+        :param season_df: pandas.DataFrame with 'team_name', 'player_name' and 'player_hometown' columns
+        :param year: int season
+        :param hometown_aliases: see `resolve`
+        :return: (pandas.Series of int player_ids indexed like `season_df`, pandas.DataFrame of new players
+        with player_id, player_name and player_hometown fields, one row per player_id) 2-tuple
+        """
+        player_ids = np.zeros(season_df.shape[0], dtype=int)
+        new_player_ids = list()
+        for team, idx in season_df.groupby('team_name', observed=True, sort=False).indices.items():
+            team_player_ids, team_new_player_ids = self.resolve(season_df.iloc[idx]
+                                                                , year=year
+                                                                , team=team
+                                                                , hometown_aliases=hometown_aliases)
+            player_ids[idx] = team_player_ids.values
+            new_player_ids += team_new_player_ids
+
+        player_ids = pd.Series(player_ids, index=season_df.index)
+        new_player_df = season_df.loc[player_ids.isin(new_player_ids).values, ['player_name', 'player_hometown']]
+        new_player_df.insert(0, 'player_id', player_ids[new_player_df.index])
+        return((player_ids, new_player_df.drop_duplicates('player_id')))
+
+    def save(self, verbose=True, conn=None):
+        """
+        Write new and changed keys to the `player_identity` table. Call after the `player` rows of
+        new player_ids are loaded, and `write_index_file` once the keys are committed.
+
+        :param verbose: boolean indicator for whether SQL statements should be printed
+        :param conn: sqlalchemy.engine.base.Connection to write on, e.g. the one of the mysql_helpers.LoadSession
+        that loaded the `player` rows, default None means the index's own
+        :return: int number of keys written to the table
+        """
+        conn = conn if conn is not None else self.conn
+
+        changed = sorted(self.changed)
+        if changed:
+            identity_df = pd.DataFrame({'identity_key': changed
+                                        , 'player_id': [self.identities[x][0] for x in changed]
+                                        , 'first_year': [self.identities[x][1] for x in changed]
+                                        , 'last_year': [self.identities[x][2] for x in changed]})
+            identity_df['identity_hash'] = identity_df['identity_key'].map(get_identity_hash)
+            identity_df['identity_type'] = identity_df['identity_key'].str.split(':', n=1).str[0]
+
+            # new keys are inserted, changed keys updated in place
+            sql.upsert(identity_df
+                       , engine=self.engine
+                       , table=IDENTITY_TABLE
+                       , verbose=verbose
+                       , conn=conn)
+
+        self.changed = set()
+        return(len(changed))
+
+    def write_index_file(self):
+        """
+        Write the whole index to disk, stamped with the committed state of the `player_identity` table.
+        Only call after the keys written by `save` are committed, the file would be trusted otherwise.
+
+        :return: None
+        """
+        n_keys, max_player_id, checksum = self._get_table_state(self.engine)
+        index_dat = {'n_keys': n_keys
+                     , 'max_player_id': max_player_id
+                     , 'checksum': checksum
+                     , 'identities': self.identities}
+
+        atomic_write(self.index_file, json.dumps(index_dat).encode('utf-8'))
+
+    def close(self):
+        """
+        Release the index's lock
+
+        :return: None
+        """
+        if self.lock_conn is not None:
+            self.lock_conn.execute('SELECT RELEASE_LOCK(%s);', (self._get_lock_name(),))
+            self.lock_conn.close()
+            self.lock_conn = None
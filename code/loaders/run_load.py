@@ -1,10 +1,18 @@
 import argparse
-import pickle as pkl
+import os
+import sys
 import pandas as pd
 import numpy as np
-import sqlalchemy as sa
+import multiprocessing as mp
 import mysql_helpers as sql
-from fuzzywuzzy import fuzz
+from player_dedup import find_duplicate_players
+from player_identity import PlayerIdentityIndex
+from scrape_artifact import ScrapeArtifact
+from load_scheduler import TableLoadScheduler, split_by_key
+
+# share the scrape's roster normalization with the loader
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'scrapers'))
+from roster_normalize import normalize_roster
 
 
 # --------------------------------------------------- #
@@ -30,195 +38,423 @@ parser.add_argument('-i'
                     , '--input'
                     , default=None
                     , type=str
-                    , help='input filepath to team metadata .pkl file containing'\
-                           ' results of scrapers/run_scrape.py')
+                    , help='input filepath to the results of scrapers/run_scrape.py: a .pkl file or a'\
+                           ' parquet/feather output directory')
+parser.add_argument('--identity_file'
+                    , default='player_identity.json'
+                    , type=str
+                    , help='filepath of the on-disk copy of the player identity index, kept in sync with'\
+                           ' the player_identity table across loads')
+parser.add_argument('-n'
+                    , '--n_jobs'
+                    , default=1
+                    , type=int
+                    , help='number of processes reading and normalizing seasons in parallel (one season per'\
+                           ' task), most useful for parquet/feather inputs')
+parser.add_argument('--stats_format'
+                    , default='wide'
+                    , choices=['wide', 'long']
+                    , help='wide: one player_stats row per player and season; long: one player_stat_value row per'\
+                           ' statistic a player has (see the stat table and the player_stats_wide view)')
+parser.add_argument('--staging_method'
+                    , default=None
+                    , choices=sql.STAGING_METHODS
+                    , help='how DataFrames are uploaded to staging tables: rows (one INSERT per row), multi'\
+                           ' (multi-row INSERTs) or infile (LOAD DATA LOCAL INFILE, needs local_infile enabled on'\
+                           ' the server), default is rows for small and multi for large DataFrames')
+parser.add_argument('--chunk_size'
+                    , default=sql.DEFAULT_CHUNK_SIZE
+                    , type=int
+                    , help='number of rows per multi-row INSERT statement')
+parser.add_argument('--savepoints'
+                    , action='store_true'
+                    , help='load each table in its own savepoint: a table that fails is rolled back and skipped'\
+                           ' while the others are committed, default is to load every table in one transaction'\
+                           ' and roll all of them back on failure. Not available for delta artifacts replacing'\
+                           ' whole seasons')
+parser.add_argument('--n_load_jobs'
+                    , default=1
+                    , type=int
+                    , help='number of tables (or chunks of the team_player_position and player statistics tables)'\
+                           ' loaded at the same time, each on its own connection and transaction; default 1 loads'\
+                           ' every table in one transaction')
 args = parser.parse_args()
 parser.parse_args()
 
+_artifact = None
 
-def misspelled_hometown(town_a, town_b, threshold=0.8):
+
+def init_worker(input_path):
     """
-    It's likely that thousands of players have their hometowns misspelled, so this function attempts to
-    reduce the number of duplicate players that exist because they come from misspelled hometowns,
-    e.g. "Downingtown, PA" and "Downing Town, PA" or "Shippensville, PA" and "Shippenville, PA"
-    (Shippensville, PA does not exist)
+    multiprocessing.Pool initializer: open a columnar scrape artifact once per worker process, which only
+    reads its manifest. Workers of pickle artifacts are sent their season's frames instead.
 
-    Note: I'll assume that there aren't two players with exactly the same name coming from the same hometown,
-    which is a modest assumption, but still an assumption (e.g. there are 15 Christopher Jacobses)
+    :param input_path: str run_scrape.py output directory, see `ScrapeArtifact`, or None
+    :return: None
     """
-    if fuzz.ratio(town_a, town_b) > threshold or fuzz.partial_token_set_ratio(town_a, town_b) > threshold:
-        return True
-    else:
-        return False
+    global _artifact
+    if input_path is not None:
+        _artifact = ScrapeArtifact(input_path)
+
+
+def get_season_df(artifact, yr, columns, team_frames=None):
+    """
+    Read one season of player statistics and concatenate its teams once, keyed by categorical `year`
+    and `team_name` columns, then normalize the whole season in one vectorized pass
+
+    :param artifact: ScrapeArtifact, or None when `team_frames` is given
+    :param yr: season, see `ScrapeArtifact.get_years`
+    :param columns: list of str columns to read
+    :param team_frames: list of (str team name, pandas.DataFrame) 2-tuples already read from the
+    artifact, default None reads them from `artifact`
+    :return: pandas.DataFrame with one row per (team, player) and loader column names
+    """
+    if team_frames is None:
+        team_frames = [(team, artifact.read_player_frame(yr, team, columns=columns))
+                       for team in artifact.get_teams(yr)]
+    teams = [x[0] for x in team_frames]
+    team_dfs = [x[1] for x in team_frames]
+    n_players = [x.shape[0] for x in team_dfs]
+
+    season_df = pd.concat(team_dfs
+                          , ignore_index=True
+                          , sort=False)
+    del team_dfs, team_frames
+
+    # artifacts scraped before roster normalization still hold raw height strings
+    season_df = normalize_roster(season_df)
+    season_df.rename(columns={'position': 'position_name'
+                              , 'name': 'player_name'
+                              , 'hometown': 'player_hometown'}
+                     , inplace=True)
+    if 'player_hometown' not in season_df.columns:
+        season_df['player_hometown'] = None
+
+    season_df['team_name'] = pd.Categorical.from_codes(np.repeat(np.arange(len(teams)), n_players)
+                                                       , categories=teams)
+    season_df['year'] = pd.Categorical(np.full(season_df.shape[0], int(yr)))
+    return(season_df)
+
+
+def get_season_df_for_par(season_task):
+    """
+    Pool worker version of `get_season_df`
+
+    :param season_task: (year, list of str columns, list of (team, pandas.DataFrame) 2-tuples or None)
+    3-tuple, see `get_season_df`
+    :return: pandas.DataFrame, see `get_season_df`
+    """
+    yr, columns, team_frames = season_task
+    return(get_season_df(_artifact, yr, columns=columns, team_frames=team_frames))
+
+
+def get_stat_df(stat_fields):
+    """
+    Build the `stat` dimension table of the long-format player_stat_value table. Every cfbstats.com stat
+    table has a games played statistic ("<stat table>_games"), so a statistic's stat table is the
+    longest such prefix of its name, e.g. tackles_for_loss_yards -> tackles_for_loss.
+
+    :param stat_fields: list of str player_stats statistics fields
+    :return: pandas.DataFrame with stat_name and stat_table fields
+    """
+    stat_tables = sorted([x[:-len('_games')] for x in stat_fields if x.endswith('_games')]
+                         , key=len
+                         , reverse=True)
+    stat_table_names = list()
+    for field in stat_fields:
+        stat_table_names.append(next((x for x in stat_tables if field.startswith(x + '_')), field))
+
+    return(pd.DataFrame({'stat_name': stat_fields
+                         , 'stat_table': stat_table_names}))
+
+
+def transform_season(season_df, player_pos_fields, player_stat_fields):
+    """
+    Derive one season's team_player_position and player_stats rows from a resolved season frame
+    (one with a player_id column) with column-wise operations
+
+    :param season_df: pandas.DataFrame, see `get_season_df`
+    :param player_pos_fields: list of str team_player_position fields to keep, besides year and team_name
+    :param player_stat_fields: list of str player_stats table fields
+    :return: (pandas.DataFrame team_player_position rows, pandas.DataFrame player_stats rows) 2-tuple
+    """
+    player_pos_df = season_df[[x for x in player_pos_fields if x in season_df.columns] + ['year', 'team_name']]
+
+    # Drop players with no meaningful statistics
+    stat_cols = [x for x in player_stat_fields if x in season_df.columns and x not in ['player_id', 'year']]
+    has_stats = season_df[stat_cols].notnull().any(axis=1)
+    player_stat_df = season_df.loc[has_stats, ['player_id', 'year'] + stat_cols]
+
+    return((player_pos_df, player_stat_df))
+
+
+def load_conference_team(session, table, conf_team_df):
+    """
+    Load step of the conference_team table, see `load_scheduler.TableLoadScheduler.add`
+
+    :param session: mysql_helpers.LoadSession
+    :param table: str 'conference_team'
+    :param conf_team_df: pandas.DataFrame with conference_name and team_name fields
+    :return: int number of affected rows
+    """
+    conf_team_df = conf_team_df.merge(session.get_id_map('conference', id_fields=['conference_name'])
+                                      , on='conference_name')\
+        .merge(session.get_id_map('team', id_fields=['team_name']), on='team_name')
+
+    # upsert on the (conference, team, year) unique key: refreshes won/lost records of seasons in progress
+    return(session.upsert(conf_team_df
+                          , table=table))
+
+
+def load_team_player_position(session, table, player_pos_df):
+    """
+    Load step of (a chunk of) the team_player_position table
+
+    :param session: mysql_helpers.LoadSession
+    :param table: str 'team_player_position'
+    :param player_pos_df: pandas.DataFrame with team_name and position_name fields
+    :return: None
+    """
+    # Get primary keys required to establish relationships: team_id, position_id
+    player_pos_df = player_pos_df.merge(session.get_id_map('team', id_fields=['team_name']), on='team_name')\
+        .merge(session.get_id_map('positions', id_fields=['position_name']), on='position_name')
+
+    return(session.insert(player_pos_df
+                          , table=table
+                          , id_fields=['team_id', 'position_id', 'player_id', 'year']))
+
+
+def load_player(session, table, player_df, identity):
+    """
+    Load step of the player table together with the player_identity table: new players and the identity
+    keys pointing at them are written in one transaction, so a committed player always keeps its player_id
+    in the identity index, and the next load can't give it a second one
+
+    :param session: mysql_helpers.LoadSession
+    :param table: str 'player'
+    :param player_df: pandas.DataFrame of new players with player_id, player_name and player_hometown fields
+    :param identity: PlayerIdentityIndex
+    :return: int number of identity keys written, or None if the player table failed to load
+    """
+    session.insert(player_df
+                   , table=table
+                   , id_fields=['player_id'])
+    if table in session.failed:
+        return(None)
+    return(identity.save(verbose=session.verbose
+                         , conn=session.conn))
 
 
 if __name__ == '__main__':
 
     # Required overhead: connect to college_football db and obtain the names
     # of individual player statistics fields
-    eng_str = 'mysql+mysqlconnector://' + args.user + ':' + args.password + '@' + args.host + '/college_football'
-    eng = sa.engine.create_engine(eng_str)
+    eng = sql.get_sa_eng(args.user
+                         , password=args.password
+                         , host=args.host
+                         , db='college_football'
+                         , local_infile=args.staging_method == 'infile'
+                         , pool_size=max(5, args.n_load_jobs))
+    sql.configure_staging(method=args.staging_method
+                          , chunksize=args.chunk_size)
 
     # ---------------------------------------------------- #
     # Read in results of run_scrape.py cfbstats.com scrape #
     # ---------------------------------------------------- #
-    with open(args.input, 'rb') as f:
-        dat = pkl.load(f)
-
-    # ------------------------- #
-    # Load in low-hanging fruit #
-    # ------------------------- #
-    print('Loading conference table.')
-    out = sql.insert(dat['conference']
-                     , engine=eng
-                     , table='conference'
-                     , id_fields=['conference_name']
-                     , verbose=True)
-
-    print('Loading team table.')
-    out = sql.insert(dat['team']
-                     , engine=eng
-                     , table='team'
-                     , id_fields=['team_name']
-                     , verbose=True)
-
-    print('Loading positions table.')
-    out = sql.insert(dat['positions']
-                     , engine=eng
-                     , table='positions'
-                     , id_fields=['position_name']
-                     , verbose=True)
-
-    print('Loading conference_team table.')
-    conf_df = pd.read_sql(con=eng
-                          , sql='SELECT * FROM conference;')
-    team_df = pd.read_sql(con=eng
-                          , sql='SELECT * FROM team;')
-    conf_team_df = dat['conference_team'].merge(conf_df, on='conference_name').merge(team_df, on='team_name')
-    out = sql.insert(conf_team_df
-                     , engine=eng
-                     , table='conference_team'
-                     , id_fields=['conference_id', 'team_id']
-                     , verbose=True)
+    # columnar outputs are only opened here, their player statistics are read one (year, team) shard at a time
+    dat = ScrapeArtifact(args.input)
+    if dat.delta and dat.refresh_years and args.savepoints:
+        # a season's delete and reload would be separate savepoints: a failed reload would still commit the delete
+        parser.error('--savepoints can\'t be used with a delta artifact that replaces whole seasons')
+
+    player_pos_fields = ['height', 'weight', 'year_in_school', 'position_name', 'player_id']
+    player_stat_fields = list(sql.get_mysql_table_schema(eng, 'player_stats').keys())
+    player_read_fields = ['name', 'hometown', 'hometown_state', 'position', 'year_in_school', 'height', 'weight'] \
+        + player_stat_fields
+
+    # every season is read once, seasons come back in order so team continuity runs forward in time.
+    # Workers read their own shards of columnar artifacts, and are sent their season's frames of an
+    # already unpickled artifact. Workers never use the database connections they inherit.
+    years = dat.get_years()
+    if args.n_jobs > 1:
+        season_tasks = list()
+        for yr in years:
+            team_frames = None
+            if not dat.columnar:
+                team_frames = [(team, dat.read_player_frame(yr, team, columns=player_read_fields))
+                               for team in dat.get_teams(yr)]
+            season_tasks.append((yr, player_read_fields, team_frames))
+        p = mp.Pool(processes=min(args.n_jobs, len(season_tasks))
+                    , initializer=init_worker
+                    , initargs=(args.input if dat.columnar else None,))
+        season_dfs = p.map(get_season_df_for_par, season_tasks)
+        p.close()
+        p.join()
+        del season_tasks
+    else:
+        season_dfs = [get_season_df(dat, yr, columns=player_read_fields) for yr in years]
 
     # -------------------------------------------------------------- #
     # Clean up and format set of players to have played college ball #
     # -------------------------------------------------------------- #
     print('Cleaning up set of individual college football players.')
-    player_df_list = list()
-    player_dat = dat['player_year_dict']
-    for yr in player_dat:
-        for team in player_dat[yr]:
-            player_df = player_dat[yr][team][['player_hometown', 'name']]
-            player_df = player_df.rename(index=int
-                                         , columns={'name': 'player_name'})
-            player_df_list.append(player_df)
-
-    # Drop players when name, position, team are repeated
-    # (because hometown, height, weight, etc tend to change over time (data not perfect))
-    player_df = pd.concat(player_df_list
+    player_df = pd.concat([x.reindex(columns=['player_name', 'player_hometown', 'hometown_state'])
+                           for x in season_dfs]
                           , ignore_index=True)
     player_df.drop_duplicates(['player_name', 'player_hometown'], inplace=True)
-    player_df.drop_duplicates(['player_name', 'team', 'position'], inplace=True)
-
-    # Reduce number of duplicated players due to hometown misspelling
-    repeated_players = player_df['player_name'].value_counts()[
-        player_df['player_name'].value_counts() == 2].index.tolist()
-    repeated_players_df = player_df[player_df['player_name'].isin(repeated_players)]
-
-    drop_idx = list()
-    for player_name in repeated_players_df['player_name'].unique():
-        repeat_player_df = repeated_players_df[repeated_players_df['player_name'] == player_name]
-        towns = repeated_players_df['player_hometown'].tolist()
-        likely_duplicate = misspelled_hometown(towns[0], towns[1])
-        if likely_duplicate:
-            drop_idx.append(repeat_player_df.index[1])
-
-    print('Dropping %d players due to likely duplicates from misspelled player hometowns' % len(drop_idx))
-    player_df.drop(drop_idx
-                   , inplace=True)
-
-    # --------------------------- #
-    # Load data into player table #
-    # --------------------------- #
-    print('Loading player table')
-    out = sql.insert(player_df
-                     , engine=eng
-                     , table='player'
-                     , id_fields=['player_name']
-                     , verbose=True)
+
+    # Reduce number of duplicated players due to hometown misspelling: within each cluster of players
+    # sharing a name and state with similar hometowns, treat every hometown as the first one's misspelling
+    representative = find_duplicate_players(player_df
+                                            , name_field='player_name'
+                                            , hometown_field='player_hometown'
+                                            , state_field='hometown_state'
+                                            , threshold=80)
+    is_duplicate = representative.values != player_df.index.values
+    hometown_aliases = dict(zip(zip(player_df['player_name'].values[is_duplicate]
+                                    , player_df['player_hometown'].values[is_duplicate])
+                                , player_df.loc[representative.values[is_duplicate], 'player_hometown'].values))
+    print('Merging %d players due to likely duplicates from misspelled player hometowns' % len(hometown_aliases))
 
     # ------------------------------------------------------------------------------------ #
     # Format temporal player <> position <> team relationships (who played what for whom)  #
     # Format player statistics
     # ------------------------------------------------------------------------------------ #
     print('Finding who played what for whom, and how each player played.')
+    # locks the index until this load is committed: concurrent loads never hand out the same player_ids
+    identity = PlayerIdentityIndex(eng
+                                   , index_file=args.identity_file).open()
+    new_player_df_list = list()
     player_pos_df_list = list()
     player_stat_df_list = list()
-    player_pos_fields = ['height', 'weight', 'year_in_school', 'position_name', 'player_name', 'player_hometown']
-    player_stat_fields = list(sql.get_mysql_table_schema(eng, 'player_stats').keys())
-    player_dat = dat['player_year_dict']
-    for yr in player_dat:
-        for team in player_dat[yr]:
-            player_df = player_dat[yr][team]
-            player_df = player_df.rename(index=int
-                                         , columns={'position': 'position_name'
-                                                    , 'name': 'player_name'})
-
-            # acquire data for team_player_position table
-            player_pos_df = player_df[list(set(player_df.columns).intersection(set(player_pos_fields)))]
-            player_pos_df['year'] = yr
-            player_pos_df['team_name'] = team
-            player_pos_df_list.append(player_pos_df)
-
-            # acquire data for player_statistics table
-            player_stat_df = player_df[list(set(player_stat_fields).intersection(set(player_df.columns)))
-                                       + ['player_name', 'player_hometown']]
-            player_stat_df['year'] = yr
-
-            # Drop players with no meaningful statistics
-            player_stat_cols = list(set(player_stat_df.columns)
-                                    - set(['player_id', 'year', 'player_hometown', 'player_name']))
-            tmp_df = player_stat_df[player_stat_cols]
-            tmp_df = tmp_df.where((pd.notnull(tmp_df)), np.NaN)
-            tmp_df.dropna(axis=0, how='all', inplace=True)
-            player_stat_df = player_stat_df.loc[tmp_df.index]
-            player_stat_df_list.append(player_stat_df.where((pd.notnull(player_stat_df)), None))
 
+    for i, yr in enumerate(years):
+        season_df = season_dfs[i]
+        season_dfs[i] = None
+
+        # who is who: player_ids from the identity index, new players get new player_ids
+        player_ids, new_player_df = identity.resolve_season(season_df
+                                                            , year=int(yr)
+                                                            , hometown_aliases=hometown_aliases)
+        season_df['player_id'] = player_ids
+        new_player_df_list.append(new_player_df)
+
+        # acquire data for team_player_position and player_statistics tables
+        player_pos_df, player_stat_df = transform_season(season_df
+                                                         , player_pos_fields=player_pos_fields
+                                                         , player_stat_fields=player_stat_fields)
+        player_pos_df_list.append(player_pos_df)
+        player_stat_df_list.append(player_stat_df)
+        del season_df
+
+    # identity resolution never gives one player_id to two rows of a roster, so only a player_stats
+    # row of a player listed by two teams in one season can repeat
     player_pos_df = pd.concat(player_pos_df_list
-                              , ignore_index=True).drop_duplicates()
+                              , ignore_index=True)
     del player_pos_df_list
     player_stat_df = pd.concat(player_stat_df_list
-                              , ignore_index=True).drop_duplicates()
+                               , ignore_index=True).drop_duplicates(['player_id', 'year'])
     del player_stat_df_list
 
-    # Get primary keys required to establish relationships: team_id, player_id, position_id
-    position_df = pd.read_sql(con=eng
-                              , sql='SELECT * FROM positions;')
-    players_df = pd.read_sql(con=eng
-                             , sql='SELECT * FROM player;')
-
-    player_pos_df = player_pos_df.merge(team_df, on='team_name')\
-        .merge(position_df, on='position_name')\
-        .merge(players_df, on=['player_name', 'player_hometown'])
-
-    player_stat_df = player_stat_df.merge(players_df, on=['player_name', 'player_hometown'])
-
-    # ----------------------------------------------------------- #
-    # Load data into team_player_position and player_stats tables #
-    # ----------------------------------------------------------- #
-    print('Loading team_player_position table.')
-    out = sql.insert(player_pos_df
-                     , engine=eng
-                     , table='team_player_position'
-                     , id_fields=['team_id', 'position_id', 'player_id', 'year']
-                     , verbose=True)
-
-    print('Loading player_stats table.')
-    out = sql.insert(player_stat_df
-                     , engine=eng
-                     , table='player_stats'
-                     , id_fields=['player_id', 'year']
-                     , verbose=True)
-
-    print('Successfully uploaded cfbstats.com data into college_football database!')
\ No newline at end of file
+    # ---------------------------------------------------------------------------------- #
+    # Load every table: the scheduler orders load steps by their foreign key dependencies, #
+    # with one job all of them run in one transaction, rolled back as a whole on failure   #
+    # ---------------------------------------------------------------------------------- #
+    loader = TableLoadScheduler(eng
+                                , n_workers=args.n_load_jobs
+                                , savepoints=args.savepoints)
+    stats_table = 'player_stats' if args.stats_format == 'wide' else 'player_stat_value'
+
+    # A delta artifact (run_scrape.py --incremental) re-scrapes whole seasons that are still being
+    # played: replace what the database holds for those seasons instead of skipping existing rows.
+    delete_steps = dict()
+    if dat.delta and dat.refresh_years:
+        refresh_yrs = dat.refresh_years
+        print('Applying delta scrape: replacing seasons %s.' % ', '.join([str(x) for x in refresh_yrs]))
+        for table in [stats_table, 'team_player_position', 'conference_team']:
+            delete_steps[table] = [loader.add(table
+                                              , sql.LoadSession.delete
+                                              , name='delete of seasons from %s' % table
+                                              , field='year'
+                                              , values=refresh_yrs)]
+
+    # inserts return the natural key -> surrogate key mapping of the rows they were given, and the
+    # loader keeps it: foreign keys are found without reading these tables back
+    loader.add('conference'
+               , sql.LoadSession.insert
+               , df=dat.get_table('conference')
+               , id_fields=['conference_name'])
+    loader.add('team'
+               , sql.LoadSession.insert
+               , df=dat.get_table('team')
+               , id_fields=['team_name'])
+    loader.add('positions'
+               , sql.LoadSession.insert
+               , df=dat.get_table('positions')
+               , id_fields=['position_name'])
+    loader.add('conference_team'
+               , load_conference_team
+               , after=delete_steps.get('conference_team')
+               , conf_team_df=dat.get_table('conference_team'))
+    player_step = loader.add('player'
+                             , load_player
+                             , player_df=pd.concat(new_player_df_list, ignore_index=True)
+                             , identity=identity)
+
+    # the two fact tables are loaded in chunks of disjoint player_id ranges, in parallel with more jobs
+    player_pos_chunks = split_by_key(player_pos_df, 'player_id', n_chunks=args.n_load_jobs)
+    for k, chunk_df in enumerate(player_pos_chunks):
+        loader.add('team_player_position'
+                   , load_team_player_position
+                   , after=delete_steps.get('team_player_position')
+                   , name='team_player_position chunk %d/%d' % (k + 1, len(player_pos_chunks))
+                   , player_pos_df=chunk_df)
+
+    player_stat_chunks = split_by_key(player_stat_df, 'player_id', n_chunks=args.n_load_jobs)
+    stat_value_steps = list()
+    if args.stats_format == 'wide':
+        for k, chunk_df in enumerate(player_stat_chunks):
+            loader.add('player_stats'
+                       , sql.LoadSession.insert
+                       , after=delete_steps.get('player_stats')
+                       , name='player_stats chunk %d/%d' % (k + 1, len(player_stat_chunks))
+                       , df=chunk_df
+                       , id_fields=['player_id', 'year'])
+
+    else:
+        stat_fields = [x for x in player_stat_fields if x not in ['player_id', 'year']]
+        loader.add('stat'
+                   , sql.LoadSession.insert
+                   , df=get_stat_df(stat_fields)
+                   , id_fields=['stat_name'])
+        for k, chunk_df in enumerate(player_stat_chunks):
+            stat_value_steps.append(loader.add('player_stat_value'
+                                               , sql.LoadSession.insert_sparse
+                                               , after=delete_steps.get('player_stat_value')
+                                               , name='player_stat_value chunk %d/%d' % (k + 1, len(player_stat_chunks))
+                                               , df=chunk_df
+                                               , id_fields=['player_id', 'year']
+                                               , value_fields=[x for x in stat_fields if x in player_stat_df.columns]
+                                               , dim_table='stat'
+                                               , dim_id_field='stat_id'
+                                               , dim_name_field='stat_name'
+                                               , value_name='stat_value'))
+
+    results = loader.run()
+
+    # the on-disk copy of the identity index is only written once its keys are committed, then the
+    # index's lock is released (a failed load releases it when the process exits)
+    if results.get(player_step) is not None:
+        identity.write_index_file()
+    identity.close()
+
+    n_values = [results[x] for x in stat_value_steps if results[x] is not None]
+    if n_values:
+        print('Loaded %d statistics values, %.1f%% of the wide player_stats cells.'
+              % (sum(n_values), 100. * sum(n_values) / max(1, player_stat_df.shape[0] * len(stat_fields))))
+
+    if loader.failed:
+        print('Loaded cfbstats.com data into college_football database, except for tables: %s'
+              % ', '.join(sorted(set(loader.failed))))
+    else:
+        print('Successfully uploaded cfbstats.com data into college_football database!')
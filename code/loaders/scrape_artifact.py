@@ -0,0 +1,137 @@
+import json
+import os
+import pickle as pkl
+import pandas as pd
+
+# memory-mapped reads of feather shards need pyarrow, which pandas also uses for parquet
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+MANIFEST_FILE = 'manifest.json'
+
+
+class ScrapeArtifact(object):
+    """
+    Read-only view of a scrapers/run_scrape.py output, giving the loader one (year, team) frame of player
+    statistics at a time. Two layouts are supported:
+
+    - a columnar output directory (--output_format parquet or feather): only the manifest is read up
+      front, each (year, team) shard is read on demand and only for the requested columns, feather
+      shards through a memory map
+    - a pickle file (--output_format pickle): the whole file is unpickled up front, as before
+
+    For columnar outputs, peak memory of a loader going through the frames one at a time scales with
+    one shard instead of the whole scrape.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: str run_scrape.py output, a .pkl file or a directory holding a manifest.json
+        """
+        self.path = path
+        self.manifest = None
+        self.dat = None
+
+        if os.path.isdir(path):
+            manifest_path = os.path.join(path, MANIFEST_FILE)
+            if not os.path.isfile(manifest_path):
+                raise IOError('%s has no %s, was the scrape finished?' % (path, MANIFEST_FILE))
+            with open(manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+            self.shards = dict(((x['year'], x['team']), x) for x in self.manifest['player_year'])
+
+        else:
+            with open(path, 'rb') as f:
+                self.dat = pkl.load(f)
+
+    @property
+    def columnar(self):
+        """
+        :return: boolean indicator for whether this is a columnar output directory, whose shards can be
+        read independently, e.g. by several processes
+        """
+        return(self.manifest is not None)
+
+    @property
+    def delta(self):
+        """
+        :return: boolean indicator for whether this is a delta artifact (run_scrape.py --incremental)
+        """
+        source = self.manifest if self.manifest is not None else self.dat
+        return(bool(source.get('delta')))
+
+    @property
+    def refresh_years(self):
+        """
+        :return: list of int seasons a delta artifact replaces as a whole
+        """
+        source = self.manifest if self.manifest is not None else self.dat
+        return([int(x) for x in source.get('refresh_years') or list()])
+
+    def _read_file(self, rel_path, columns=None):
+        """
+        Read one columnar file of the output directory
+
+        :param rel_path: str path relative to the output directory
+        :param columns: list of str columns to read, default None means all
+        :return: pandas.DataFrame
+        """
+        path = os.path.join(self.path, rel_path)
+        if self.manifest['format'] == 'feather':
+            if feather is None:
+                return(pd.read_feather(path, columns=columns))
+            return(feather.read_table(path
+                                      , columns=columns
+                                      , memory_map=True).to_pandas())
+        return(pd.read_parquet(path, columns=columns))
+
+    def get_table(self, name):
+        """
+        :param name: str relation table name: 'conference', 'team', 'conference_team' or 'positions'
+        :return: pandas.DataFrame
+        """
+        if self.manifest is None:
+            return(self.dat[name])
+        return(self._read_file(self.manifest['tables'][name]))
+
+    def get_years(self):
+        """
+        :return: list of seasons with player statistics, in chronological order
+        """
+        if self.manifest is None:
+            years = self.dat['player_year_dict'].keys()
+        else:
+            years = set(yr for yr, _ in self.shards)
+        return(sorted(years, key=int))
+
+    def get_teams(self, yr):
+        """
+        :param yr: season, see `get_years`
+        :return: list of str team names with player statistics in season `yr`
+        """
+        if self.manifest is None:
+            return(list(self.dat['player_year_dict'][yr].keys()))
+        return(sorted(team for shard_yr, team in self.shards if shard_yr == str(yr)))
+
+    def read_player_frame(self, yr, team, columns=None):
+        """
+        Read one team's player statistics for one season
+
+        :param yr: season, see `get_years`
+        :param team: str team name
+        :param columns: list of str columns to read, columns the frame doesn't have are skipped,
+        default None means all
+        :return: pandas.DataFrame
+        """
+        if self.manifest is None:
+            players_df = self.dat['player_year_dict'][yr][team]
+            if columns is not None:
+                players_df = players_df[[x for x in players_df.columns if x in set(columns)]]
+            return(players_df)
+
+        shard = self.shards[(str(yr), team)]
+        if columns is not None:
+            columns = [x for x in shard['columns'] if x in set(columns)]
+        return(self._read_file(shard['path'], columns=columns))
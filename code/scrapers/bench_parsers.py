@@ -0,0 +1,142 @@
+import argparse
+import json
+import os
+import time
+import html_parsing
+from player_scrape import parse_roster, parse_player_stats
+
+# --------------------------------------------------- #
+# command line argument parser, example usage:
+# $ python bench_parsers.py --cache_dir ./cfbstats_cache -n 200
+# $ python bench_parsers.py --pages_dir ./sample_pages
+# --------------------------------------------------- #
+
+
+def get_page_parser(name):
+    """
+    Pick the parser for a saved cfbstats.com page from its URL or file name
+
+    :param name: str page URL or file name
+    :return: `parse_roster`, `parse_player_stats`, or None for pages the benchmark does not cover
+    """
+    if 'roster' in name:
+        return(parse_roster)
+    if 'player' in name:
+        return(parse_player_stats)
+    return(None)
+
+
+def load_sample_pages(pages_dir=None, cache_dir=None, n_pages=None):
+    """
+    Load saved roster and player pages, either .html files from a directory (file names must contain
+    "roster" or "player") or pages from a page_cache.PageCache directory
+
+    :param pages_dir: str directory of saved .html pages
+    :param cache_dir: str page cache directory
+    :param n_pages: int max number of pages of each kind to load, default None means all
+    :return: list of (parse function, str page HTML) 2-tuples
+    """
+    pages = list()
+    counts = dict()
+
+    if pages_dir:
+        for name in sorted(os.listdir(pages_dir)):
+            if name.endswith('.html'):
+                with open(os.path.join(pages_dir, name), 'rb') as f:
+                    pages.append((name, f.read().decode('utf-8', errors='replace')))
+
+    if cache_dir:
+        index_dir = os.path.join(cache_dir, 'index')
+        for name in sorted(os.listdir(index_dir)):
+            if not name.endswith('.json'):
+                continue
+            with open(os.path.join(index_dir, name), 'r') as f:
+                entry = json.load(f)
+            with open(os.path.join(cache_dir, 'objects', entry['object']), 'rb') as f:
+                pages.append((entry['url'], f.read().decode(entry.get('encoding') or 'utf-8', errors='replace')))
+
+    samples = list()
+    for name, html in pages:
+        page_parser = get_page_parser(name)
+        if page_parser is None:
+            continue
+        counts[page_parser] = counts.get(page_parser, 0) + 1
+        if n_pages is None or counts[page_parser] <= n_pages:
+            samples.append((page_parser, html))
+
+    return(samples)
+
+
+def time_parsing(samples, backend, targeted, n_repeats=3):
+    """
+    Time parsing every sample page with one parser configuration, keeping the best of `n_repeats` runs
+
+    :param samples: list of (parse function, str page HTML) 2-tuples
+    :param backend: str BeautifulSoup parser backend
+    :param targeted: boolean, parse only the elements each extractor needs
+    :param n_repeats: int number of timed runs
+    :return: (float best seconds, list of parsed outputs) 2-tuple
+    """
+    html_parsing.configure(backend=backend
+                           , targeted=targeted)
+    best = None
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        outputs = [page_parser(html) for page_parser, html in samples]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return((best, outputs))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages_dir'
+                        , default=None
+                        , type=str
+                        , help='directory of saved roster/player .html pages')
+    parser.add_argument('--cache_dir'
+                        , default=None
+                        , type=str
+                        , help='page cache directory filled by run_scrape.py --cache_dir')
+    parser.add_argument('-n'
+                        , '--n_pages'
+                        , default=None
+                        , type=int
+                        , help='max number of roster pages and of player pages to benchmark')
+    parser.add_argument('-r'
+                        , '--n_repeats'
+                        , default=3
+                        , type=int
+                        , help='number of timed runs per parser configuration, the best is reported')
+    args = parser.parse_args()
+
+    if not args.pages_dir and not args.cache_dir:
+        parser.error('supply --pages_dir and/or --cache_dir')
+
+    samples = load_sample_pages(args.pages_dir
+                                , cache_dir=args.cache_dir
+                                , n_pages=args.n_pages)
+    if not samples:
+        parser.error('no roster or player pages found')
+    print('Benchmarking HTML parsing over %d sample pages.\n' % len(samples))
+
+    # Baseline: the original full-page html.parser tree, after one untimed warm-up pass
+    time_parsing(samples
+                 , backend='html.parser'
+                 , targeted=False
+                 , n_repeats=1)
+    baseline_time, baseline_outputs = time_parsing(samples
+                                                   , backend='html.parser'
+                                                   , targeted=False
+                                                   , n_repeats=args.n_repeats)
+
+    print('%-12s %-9s %12s %9s %10s' % ('backend', 'targeted', 'ms / page', 'speedup', 'identical'))
+    for backend in html_parsing.get_available_backends():
+        for targeted in [False, True]:
+            elapsed, outputs = time_parsing(samples
+                                            , backend=backend
+                                            , targeted=targeted
+                                            , n_repeats=args.n_repeats)
+            print('%-12s %-9s %12.2f %8.1fx %10s' % (backend, targeted, 1000 * elapsed / len(samples)
+                                                      , baseline_time / elapsed, outputs == baseline_outputs))
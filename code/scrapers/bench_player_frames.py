@@ -0,0 +1,122 @@
+import argparse
+import os
+import random
+import re
+import time
+import tracemalloc
+import pandas as pd
+from player_frame import PlayerFrameBuilder
+
+# --------------------------------------------------- #
+# command line argument parser, example usage:
+# $ python bench_player_frames.py -n 120 -r 50
+# --------------------------------------------------- #
+
+
+def get_schema_stat_fields(sql_file=None):
+    """
+    Read the `player_stats` field names from the table's CREATE TABLE statement
+
+    :param sql_file: str path to player_stats.sql, default None means the repository's sql/player_stats.sql
+    :return: list of str field names
+    """
+    if sql_file is None:
+        sql_file = os.path.join(os.path.dirname(os.path.realpath(__file__)), '../../sql/player_stats.sql')
+    with open(sql_file, 'r') as f:
+        return(re.findall(r'^\s+(\w+) (?:MEDIUMINT|YEAR|FLOAT)', f.read(), flags=re.MULTILINE))
+
+
+def make_roster(n_players, stat_fields, seed=0):
+    """
+    Make a synthetic roster: every player fills the statistics of one to three stat tables
+
+    :param n_players: int number of players
+    :param stat_fields: list of str `player_stats` field names
+    :param seed: int random seed
+    :return: (list of player dictionaries, list of player statistics dictionaries) 2-tuple
+    """
+    rng = random.Random(seed)
+    tables = sorted(set(re.sub(r'_[a-z]+$', '', x) for x in stat_fields))
+    player_dat = list()
+    player_stats_list = list()
+
+    for i in range(n_players):
+        player_dat.append({'number': i, 'name': 'Player %d' % i, 'position': rng.choice(['QB', 'WR', 'DL'])
+                           , 'year_in_school': 'SR', 'height': '6-2', 'weight': 200, 'hometown': 'Austin, TX'
+                           , 'last_school': '-', 'url': 'http://www.cfbstats.com/2016/player/%d/index.html' % i})
+        player_tables = rng.sample(tables, rng.randint(1, 3))
+        player_stats_list.append(dict((x, rng.randint(0, 100)) for x in stat_fields
+                                      if any(x.startswith(t) for t in player_tables)))
+
+    return((player_dat, player_stats_list))
+
+
+def get_players_df_per_player(player_dat, player_stats_list, stat_fields):
+    """
+    The original assembly: one single-row DataFrame per player, then concat
+    """
+    player_dfs = list()
+    for i in range(len(player_dat)):
+        player_info = dict(player_dat[i])
+        player_info['name'] = [player_info['name']]
+        for field in stat_fields:
+            player_info[field] = [player_stats_list[i].get(field, None)]
+        player_dfs.append(pd.DataFrame(player_info))
+
+    players_df = pd.concat(player_dfs, ignore_index=True)
+    players_df = players_df.where(pd.notnull(players_df), None)
+    players_df.dropna(axis=1, how='all', inplace=True)
+    return(players_df)
+
+
+def get_players_df_columnar(player_dat, player_stats_list, stat_fields):
+    """
+    Assembly with PlayerFrameBuilder
+    """
+    builder = PlayerFrameBuilder(len(player_dat), stat_fields=stat_fields)
+    for i in range(len(player_dat)):
+        builder.add_player(i, player_info=player_dat[i], player_stats=player_stats_list[i])
+    return(builder.build())
+
+
+def measure(fun, n_repeats, *args):
+    """
+    Get best wall-clock seconds over `n_repeats` calls and peak traced memory of one call
+    """
+    best = None
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        fun(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    fun(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return((best, peak))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n'
+                        , '--n_players'
+                        , default=120
+                        , type=int
+                        , help='number of players on the synthetic roster')
+    parser.add_argument('-r'
+                        , '--n_repeats'
+                        , default=10
+                        , type=int
+                        , help='number of timed runs per method, the best is reported')
+    args = parser.parse_args()
+
+    stat_fields = get_schema_stat_fields()
+    player_dat, player_stats_list = make_roster(args.n_players, stat_fields=stat_fields)
+    print('Assembling a %d-player roster over %d player_stats fields.\n' % (args.n_players, len(stat_fields)))
+
+    print('%-12s %12s %14s' % ('method', 'ms / roster', 'peak KiB'))
+    for name, fun in [('per-player', get_players_df_per_player), ('columnar', get_players_df_columnar)]:
+        elapsed, peak = measure(fun, args.n_repeats, player_dat, player_stats_list, stat_fields)
+        print('%-12s %12.2f %14.1f' % (name, 1000 * elapsed, peak / 1024.))
@@ -0,0 +1,83 @@
+import json
+import os
+import pickle as pkl
+from urllib.parse import quote
+from page_cache import atomic_write
+
+
+class ScrapeCheckpoint(object):
+    """
+    Journal of a scrape run on disk: the team metadata the run works from, plus one pickle per
+    finished (year, team). Each piece is written atomically, so a crashed or interrupted run
+    leaves only complete pieces behind and a resumed run can skip them.
+    """
+
+    def __init__(self, checkpoint_dir):
+        """
+        :param checkpoint_dir: str directory holding the checkpoint, created if missing
+        """
+        self.checkpoint_dir = checkpoint_dir
+        self.team_metadata_file = os.path.join(checkpoint_dir, 'team_metadata.json')
+
+        if not os.path.isdir(checkpoint_dir):
+            os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def _team_path(self, yr, team):
+        return(os.path.join(self.checkpoint_dir, str(yr), quote(team, safe='') + '.pkl'))
+
+    def save_team_metadata(self, team_dat):
+        """
+        Save the team metadata a run works from, see `team_scrape.get_team_metadata`
+
+        :param team_dat: nested dictionary of year -> conference -> team metadata
+        :return: None
+        """
+        atomic_write(self.team_metadata_file, json.dumps(team_dat, ensure_ascii=True).encode('utf-8'))
+
+    def load_team_metadata(self):
+        """
+        Load the team metadata saved by a previous run
+
+        :return: nested dictionary of year -> conference -> team metadata, or None if not saved
+        """
+        if not os.path.isfile(self.team_metadata_file):
+            return(None)
+
+        with open(self.team_metadata_file, 'r') as f:
+            return(json.load(f))
+
+    def save(self, yr, team, players_df):
+        """
+        Save a finished team's player statistics
+
+        :param yr: year
+        :param team: str team name
+        :param players_df: player statistics DataFrame
+        :return: None
+        """
+        team_path = self._team_path(yr, team)
+        if not os.path.isdir(os.path.dirname(team_path)):
+            os.makedirs(os.path.dirname(team_path), exist_ok=True)
+
+        atomic_write(team_path, pkl.dumps(players_df))
+
+    def is_done(self, yr, team):
+        """
+        Determine whether a team's player statistics were already saved
+
+        :param yr: year
+        :param team: str team name
+        :return: boolean
+        """
+        return(os.path.isfile(self._team_path(yr, team)))
+
+    def load(self, yr, team):
+        """
+        Load a finished team's player statistics
+
+        :param yr: year
+        :param team: str team name
+        :return: player statistics DataFrame
+        """
+        with open(self._team_path(yr, team), 'rb') as f:
+            return(pkl.load(f))
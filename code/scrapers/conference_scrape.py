@@ -1,5 +1,5 @@
-from bs4 import BeautifulSoup
-import requests
+from html_parsing import make_soup, SEASONS_STRAINER, CONFERENCES_STRAINER
+import fetch
 import unicodedata
 
 def get_conference_metadata():
@@ -13,18 +13,18 @@ def get_conference_metadata():
     conf_dict = dict()
 
     # Determine years that have a conference associated with them.
-    r = requests.get(base_url % 2017)
+    r = fetch.get(base_url % 2017)
     dat = r.text
-    soup = BeautifulSoup(dat, 'html.parser')
+    soup = make_soup(dat, parse_only=SEASONS_STRAINER)
 
     seasons = soup.find(id='seasons').text.split('\n')
     conf_yrs = list(filter(lambda x: unicodedata.normalize('NFKD', x).strip() != '', seasons))
+    conf_yrs = [int(yr) for yr in conf_yrs]
 
     # Iterate over available years - determine conferences in each year.
-    for yr in conf_yrs:
-        yr = int(yr)
-        r = requests.get(base_url % yr)
-        soup = BeautifulSoup(r.text, 'html.parser')
+    responses = fetch.get_many([base_url % yr for yr in conf_yrs])
+    for yr, r in zip(conf_yrs, responses):
+        soup = make_soup(r.text, parse_only=CONFERENCES_STRAINER)
 
         confs = soup.find(id='conferences').text.split('\n')
         confs = list(filter(lambda x: unicodedata.normalize('NFKD', x).strip() not in ['', 'Conferences']
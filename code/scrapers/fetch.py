@@ -0,0 +1,209 @@
+import os
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from page_cache import PageCache, CacheMiss
+from throttle import RetryPolicy, RetriesExhausted
+
+DEFAULT_POOL_SIZE = 32
+DEFAULT_CONCURRENCY = 16
+DEFAULT_TIMEOUT = 30
+
+_fetch_config = {'pool_size': DEFAULT_POOL_SIZE
+                 , 'max_concurrency': DEFAULT_CONCURRENCY
+                 , 'timeout': DEFAULT_TIMEOUT
+                 , 'replay': False}
+_session = None
+_session_pid = None
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+_cache = None
+_retry_policy = RetryPolicy()
+_rate_limiter = None
+_circuit_breaker = None
+
+
+def configure(pool_size=None, max_concurrency=None, timeout=None, cache=None, replay=None
+              , retry_policy=None, rate_limiter=None, circuit_breaker=None):
+    """
+    Set process-wide options of the shared fetch engine. Options left as None keep their
+    current value. Safe to use as a multiprocessing.Pool initializer.
+
+    :param pool_size: int max number of keep-alive connections kept open per host
+    :param max_concurrency: int default number of requests in flight in `get_many`
+    :param timeout: int or float seconds to wait on a server before giving up on a request
+    :param cache: page_cache.PageCache or str cache directory to serve and store pages through
+    :param replay: boolean, if True never touch the network and serve every page from `cache`
+    :param retry_policy: throttle.RetryPolicy for failed requests
+    :param rate_limiter: throttle.TokenBucket shared by all processes sending requests
+    :param circuit_breaker: throttle.CircuitBreaker shared by all processes sending requests
+    :return: None
+    """
+    global _session, _executor, _cache, _retry_policy, _rate_limiter, _circuit_breaker
+
+    if pool_size is not None:
+        _fetch_config['pool_size'] = pool_size
+        with _lock:
+            _session = None
+    if max_concurrency is not None:
+        _fetch_config['max_concurrency'] = max_concurrency
+        with _lock:
+            if _executor is not None and _executor_pid == os.getpid():
+                _executor.shutdown(wait=False)
+            _executor = None
+    if timeout is not None:
+        _fetch_config['timeout'] = timeout
+    if cache is not None:
+        _cache = cache if isinstance(cache, PageCache) else PageCache(cache)
+    if replay is not None:
+        _fetch_config['replay'] = replay
+    if retry_policy is not None:
+        _retry_policy = retry_policy
+    if rate_limiter is not None:
+        _rate_limiter = rate_limiter
+    if circuit_breaker is not None:
+        _circuit_breaker = circuit_breaker
+
+    if _fetch_config['replay'] and _cache is None:
+        raise ValueError('Offline replay mode requires a page cache.')
+
+
+def get_session():
+    """
+    Get the pooled, keep-alive requests.Session shared by every scraper in this process.
+    A new session is made after a fork so that child processes never share sockets
+    with their parent. Safe to call from many threads at once, only one session is made.
+
+    :return: requests.Session
+    """
+    global _session, _session_pid
+
+    with _lock:
+        if _session is None or _session_pid != os.getpid():
+            pool_size = _fetch_config['pool_size']
+            adapter = HTTPAdapter(pool_connections=pool_size
+                                  , pool_maxsize=pool_size)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+            _session_pid = os.getpid()
+        return(_session)
+
+
+def get_executor():
+    """
+    Get the thread pool that `get_many` runs requests on, one per process with `max_concurrency`
+    threads (see `configure`), made once and reused by every call. A new one is made after a fork.
+
+    :return: concurrent.futures.ThreadPoolExecutor
+    """
+    global _executor, _executor_pid
+
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=_fetch_config['max_concurrency']
+                                           , thread_name_prefix='fetch')
+            _executor_pid = os.getpid()
+        return(_executor)
+
+
+def download(url, headers=None):
+    """
+    GET a URL from the network under the configured rate limit, circuit breaker and retry policy.
+    Responses with a fatal status code (e.g. 404) are returned as-is for the caller to handle.
+
+    :param url: str URL
+    :param headers: dictionary of extra HTTP request headers, optional
+    :return: requests.Response
+    """
+    for attempt in range(_retry_policy.max_retries + 1):
+        if _circuit_breaker:
+            _circuit_breaker.wait()
+        if _rate_limiter:
+            _rate_limiter.acquire()
+
+        retry_after = None
+        try:
+            r = get_session().get(url
+                                  , headers=headers
+                                  , timeout=_fetch_config['timeout'])
+        except Exception as e:
+            if not _retry_policy.is_retryable_exception(e):
+                raise
+            error = e
+        else:
+            if not _retry_policy.is_retryable_status(r.status_code):
+                if _circuit_breaker:
+                    _circuit_breaker.record_success()
+                return(r)
+            error = 'HTTP %d' % r.status_code
+            retry_after = r.headers.get('Retry-After')
+
+        if _circuit_breaker:
+            _circuit_breaker.record_failure()
+        if attempt < _retry_policy.max_retries:
+            time.sleep(_retry_policy.get_delay(attempt, retry_after=retry_after))
+
+    raise RetriesExhausted('Gave up on %s after %d attempts, last error: %s'
+                           % (url, _retry_policy.max_retries + 1, error))
+
+
+def get(url):
+    """
+    GET a URL over the shared connection pool. When a page cache is configured, fresh cached
+    pages are served from disk, stale ones are revalidated with a conditional GET, and in
+    replay mode the network is never touched.
+
+    :param url: str URL, e.g. http://www.cfbstats.com/2015/team/128/roster.html
+    :return: requests.Response
+    """
+    if _cache is None:
+        return(download(url))
+
+    entry = _cache.lookup(url)
+    if entry and (_fetch_config['replay'] or _cache.is_fresh(entry)):
+        return(_cache.get_response(entry))
+
+    if _fetch_config['replay']:
+        raise CacheMiss('%s is not cached and offline replay mode is on.' % url)
+
+    r = download(url
+                 , headers=_cache.get_revalidation_headers(entry))
+
+    if r.status_code == 304 and entry:
+        return(_cache.get_response(_cache.touch(entry)))
+
+    if r.status_code == 200:
+        _cache.store(url, r)
+
+    return(r)
+
+
+def get_many(urls, max_concurrency=None):
+    """
+    GET many URLs at once over the shared connection pool. Requests are blocking `get` calls run on
+    the process's thread pool (see `get_executor`), so concurrency comes from threads, not an
+    event loop.
+
+    :param urls: iterable of str URLs
+    :param max_concurrency: int max number of requests of this call in flight at once, default None
+    means use the value set with `configure`, which also caps it
+    :return: list of requests.Response, in the same order as `urls`
+    """
+    urls = list(urls)
+    if not urls:
+        return(list())
+
+    if not max_concurrency:
+        max_concurrency = _fetch_config['max_concurrency']
+    semaphore = threading.BoundedSemaphore(min(max_concurrency, len(urls)))
+
+    def bounded_get(url):
+        with semaphore:
+            return(get(url))
+
+    return(list(get_executor().map(bounded_get, urls)))
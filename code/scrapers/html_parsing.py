@@ -0,0 +1,64 @@
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+PARSER_BACKENDS = ['html.parser', 'lxml', 'html5lib']
+
+_parsing_config = {'backend': 'html.parser'
+                   , 'targeted': True}
+
+
+def get_available_backends():
+    """
+    List the BeautifulSoup parser backends installed in this environment
+
+    :return: list of str backend names, e.g. ['html.parser', 'lxml']
+    """
+    backends = list()
+    for backend in PARSER_BACKENDS:
+        try:
+            BeautifulSoup('', backend)
+            backends.append(backend)
+        except FeatureNotFound:
+            pass
+    return(backends)
+
+
+def configure(backend=None, targeted=None):
+    """
+    Set process-wide HTML parsing options used by every scraper. Options left as None keep
+    their current value.
+
+    :param backend: str BeautifulSoup parser backend, one of PARSER_BACKENDS, e.g. 'lxml'
+    (C-accelerated, must be installed separately)
+    :param targeted: boolean, if True only build the parts of a page each scraper reads
+    :return: None
+    """
+    if backend is not None:
+        if backend not in get_available_backends():
+            raise ValueError('HTML parser backend %s is not available. Choose from: %s'
+                             % (backend, ', '.join(get_available_backends())))
+        _parsing_config['backend'] = backend
+    if targeted is not None:
+        _parsing_config['targeted'] = targeted
+
+
+def make_soup(html, parse_only=None):
+    """
+    Parse a page with the configured backend
+
+    :param html: str page HTML
+    :param parse_only: bs4.SoupStrainer matching the only elements a scraper needs, optional.
+    Ignored when targeted parsing is turned off.
+    :return: bs4.BeautifulSoup
+    """
+    if not _parsing_config['targeted']:
+        parse_only = None
+    return(BeautifulSoup(html, _parsing_config['backend'], parse_only=parse_only))
+
+
+# Elements each scraper extracts from its pages
+ROSTER_STRAINER = SoupStrainer('div', attrs={'class': 'team-roster'})
+PLAYER_STATS_STRAINER = SoupStrainer('table')
+SEASONS_STRAINER = SoupStrainer(id='seasons')
+CONFERENCES_STRAINER = SoupStrainer(id='conferences')
+CONFERENCE_TEAMS_STRAINER = SoupStrainer('div', attrs={'class': 'conference'})
+TEAM_RECORD_STRAINER = SoupStrainer('div', attrs={'class': 'team-record'})
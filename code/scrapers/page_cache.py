@@ -0,0 +1,290 @@
+import datetime
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import re
+import tempfile
+import time
+import requests
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+DEFAULT_CURRENT_SEASON_TTL = 60 * 60
+
+
+class CacheMiss(LookupError):
+    """
+    Raised in offline replay mode when a requested page was never cached.
+    """
+    pass
+
+
+def get_current_season(today=None):
+    """
+    Get the college football season currently being played (or most recently played).
+    Seasons start in late summer, so January through July still belong to the previous year's season.
+
+    :param today: datetime.date, default None means today
+    :return: int season year
+    """
+    if today is None:
+        today = datetime.date.today()
+    return(today.year if today.month >= 8 else today.year - 1)
+
+
+def get_url_season(url):
+    """
+    Get the season year a cfbstats.com URL belongs to, e.g. 2015 for
+    http://www.cfbstats.com/2015/team/128/roster.html
+
+    :param url: str URL
+    :return: int season year, or None if the URL is not season-specific
+    """
+    match = re.search(r'cfbstats\.com/+(\d{4})/', url)
+    if not match:
+        return(None)
+    return(int(match.group(1)))
+
+
+def atomic_write(path, data):
+    """
+    Write bytes to a file so that readers (other scraper processes included) only ever see
+    either the old file or the complete new one.
+
+    :param path: str output file path
+    :param data: bytes to write
+    :return: None
+    """
+    dir_name = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=dir_name, prefix='.tmp_')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class PageCache(object):
+    """
+    Content-addressed on-disk cache of cfbstats.com pages.
+
+    Page bodies are stored once per distinct content under `objects/`, named by their sha256 hash.
+    Each URL has a small JSON index entry under `index/` pointing at its body along with the
+    response's validators (ETag, Last-Modified), so stale pages can be revalidated with a conditional GET.
+    Pages from past seasons never expire; pages from the current season (or pages with no season)
+    expire after `current_season_ttl` seconds. When the bodies outgrow `max_bytes` the least recently
+    used URLs are evicted. The size of the bodies is kept in shared memory, like throttle.TokenBucket's
+    budget, so all worker processes of a scrape count against the same `max_bytes`.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, current_season_ttl=DEFAULT_CURRENT_SEASON_TTL
+                 , current_season=None):
+        """
+        :param cache_dir: str directory holding the cache, created if missing
+        :param max_bytes: int max total size of cached page bodies
+        :param current_season_ttl: int or float seconds that current-season pages stay fresh
+        :param current_season: int season year considered current, default None means `get_current_season()`
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.current_season_ttl = current_season_ttl
+        self.current_season = current_season or get_current_season()
+        self.index_dir = os.path.join(cache_dir, 'index')
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+
+        for d in [self.index_dir, self.objects_dir]:
+            if not os.path.isdir(d):
+                os.makedirs(d, exist_ok=True)
+
+        self._lock = mp.Lock()
+        self._size = mp.RawValue('q', sum(os.path.getsize(os.path.join(self.objects_dir, x))
+                                          for x in os.listdir(self.objects_dir)))
+
+    def _index_path(self, url):
+        return(os.path.join(self.index_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json'))
+
+    def _object_path(self, digest):
+        return(os.path.join(self.objects_dir, digest))
+
+    def get_ttl(self, url):
+        """
+        Get the number of seconds a page stays fresh
+
+        :param url: str URL
+        :return: int or float seconds, or None if the page never expires
+        """
+        season = get_url_season(url)
+        if season is not None and season < self.current_season:
+            return(None)
+        return(self.current_season_ttl)
+
+    def lookup(self, url):
+        """
+        Find the index entry of a cached URL
+
+        :param url: str URL
+        :return: dictionary index entry, or None if the URL is not cached
+        """
+        index_path = self._index_path(url)
+        try:
+            with open(index_path, 'r') as f:
+                entry = json.load(f)
+        except (IOError, ValueError):
+            return(None)
+
+        if not os.path.isfile(self._object_path(entry['object'])):
+            return(None)
+
+        # index file mtime doubles as the entry's last access time for LRU eviction
+        try:
+            os.utime(index_path, None)
+        except OSError:
+            pass
+        return(entry)
+
+    def is_fresh(self, entry):
+        """
+        Determine whether a cached page can be served without revalidation
+
+        :param entry: dictionary index entry, see `lookup`
+        :return: boolean
+        """
+        ttl = self.get_ttl(entry['url'])
+        return(ttl is None or time.time() - entry['fetched_at'] < ttl)
+
+    def get_revalidation_headers(self, entry):
+        """
+        Build conditional GET headers from a cached page's validators
+
+        :param entry: dictionary index entry, or None
+        :return: dictionary of HTTP request headers
+        """
+        headers = dict()
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return(headers)
+
+    def get_response(self, entry):
+        """
+        Rebuild a requests.Response from a cached page
+
+        :param entry: dictionary index entry, see `lookup`
+        :return: requests.Response with status code 200
+        """
+        with open(self._object_path(entry['object']), 'rb') as f:
+            content = f.read()
+
+        r = requests.Response()
+        r.status_code = 200
+        r.url = entry['url']
+        r.encoding = entry.get('encoding')
+        r._content = content
+        return(r)
+
+    def store(self, url, r):
+        """
+        Cache a successfully downloaded page
+
+        :param url: str URL that was requested
+        :param r: requests.Response with status code 200
+        :return: dictionary index entry
+        """
+        content = r.content
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(digest)
+
+        is_new = not os.path.isfile(object_path)
+        if is_new:
+            atomic_write(object_path, content)
+
+        entry = {'url': url
+                 , 'object': digest
+                 , 'size': len(content)
+                 , 'encoding': r.encoding
+                 , 'etag': r.headers.get('ETag')
+                 , 'last_modified': r.headers.get('Last-Modified')
+                 , 'fetched_at': time.time()}
+        atomic_write(self._index_path(url), json.dumps(entry).encode('utf-8'))
+
+        with self._lock:
+            if is_new:
+                self._size.value += len(content)
+            size = self._size.value
+
+        if size > self.max_bytes:
+            self.evict()
+
+        return(entry)
+
+    def touch(self, entry):
+        """
+        Mark a cached page as fresh again, e.g. after the server answered a conditional GET with 304
+
+        :param entry: dictionary index entry, see `lookup`
+        :return: dictionary updated index entry
+        """
+        entry['fetched_at'] = time.time()
+        atomic_write(self._index_path(entry['url']), json.dumps(entry).encode('utf-8'))
+        return(entry)
+
+    def evict(self, target_fraction=0.9):
+        """
+        Evict least recently used URLs until cached page bodies take up at most
+        `target_fraction` * `max_bytes`, then remove bodies no URL points at anymore.
+
+        :param target_fraction: float fraction of `max_bytes` to shrink the cache to
+        :return: int number of evicted URLs
+        """
+        entries = list()
+        for name in os.listdir(self.index_dir):
+            if name.startswith('.tmp_'):
+                continue
+            index_path = os.path.join(self.index_dir, name)
+            try:
+                with open(index_path, 'r') as f:
+                    entry = json.load(f)
+                entries.append((os.path.getmtime(index_path), index_path, entry))
+            except (IOError, OSError, ValueError):
+                continue
+
+        # object sizes are counted once no matter how many URLs share them
+        object_sizes = dict((entry['object'], entry['size']) for _, _, entry in entries)
+        refs = dict()
+        for _, _, entry in entries:
+            refs[entry['object']] = refs.get(entry['object'], 0) + 1
+        size = sum(object_sizes.values())
+
+        n_evicted = 0
+        for _, index_path, entry in sorted(entries, key=lambda x: x[0]):
+            if size <= self.max_bytes * target_fraction:
+                break
+            try:
+                os.remove(index_path)
+            except OSError:
+                continue
+            n_evicted += 1
+            refs[entry['object']] -= 1
+            if refs[entry['object']] == 0:
+                size -= object_sizes[entry['object']]
+
+        # leave recently written bodies alone, another process may be about to index them
+        now = time.time()
+        for name in os.listdir(self.objects_dir):
+            if name.startswith('.tmp_') or refs.get(name, 0) > 0:
+                continue
+            if now - os.path.getmtime(self._object_path(name)) > 60:
+                try:
+                    os.remove(self._object_path(name))
+                except OSError:
+                    pass
+
+        # recounted from the index: bodies other processes store during an eviction are left out until the next one
+        with self._lock:
+            self._size.value = size
+        return(n_evicted)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+
+class PlayerFrameBuilder(object):
+    """
+    Columnar builder of one team's player statistics DataFrame. Roster fields go into preallocated
+    object arrays and player statistics into one preallocated float matrix with a column per
+    `player_stats` field, so a whole roster becomes a single DataFrame at the end instead of one
+    single-row DataFrame per player followed by a concat.
+
+    Missing values are None in roster columns and NaN in statistics columns. Columns with no values
+    at all are dropped, as are statistics that are not `player_stats` fields.
+    """
+
+    def __init__(self, n_players, stat_fields):
+        """
+        :param n_players: int number of players on the roster
+        :param stat_fields: list of str `player_stats` field names
+        """
+        self.n_players = n_players
+        self.stat_fields = list(stat_fields)
+        self.stat_idx = dict((field, j) for j, field in enumerate(self.stat_fields))
+        self.stats = np.full((n_players, len(self.stat_fields)), np.nan)
+        self.roster = dict()
+
+    def add_player(self, i, player_info, player_stats=None):
+        """
+        Fill in one player's row
+
+        :param i: int row of the player, 0 <= i < n_players
+        :param player_info: player dictionary, see `player_scrape.get_players_from_roster`
+        :param player_stats: player statistics dictionary, see `player_scrape.get_player_stats`,
+        or None for players without a player page
+        :return: None
+        """
+        for field, value in player_info.items():
+            if field not in self.roster:
+                self.roster[field] = np.full(self.n_players, None, dtype=object)
+            self.roster[field][i] = value
+
+        if player_stats:
+            row = self.stats[i]
+            for field, value in player_stats.items():
+                j = self.stat_idx.get(field)
+                if j is not None and value is not None:
+                    row[j] = value
+
+    def build(self):
+        """
+        Build the team's DataFrame
+
+        :return: pandas.DataFrame with one row per player
+        """
+        columns = dict()
+        for field, values in self.roster.items():
+            if pd.notnull(values).any():
+                columns[field] = values
+
+        filled = ~np.isnan(self.stats).all(axis=0)
+        for j in np.flatnonzero(filled):
+            columns[self.stat_fields[j]] = self.stats[:, j]
+
+        return(pd.DataFrame(columns, index=pd.RangeIndex(self.n_players)))
@@ -1,6 +1,6 @@
-from bs4 import BeautifulSoup
-import requests
-from scrape_params import get_player_stat_mapping, standardize_field_name
+from html_parsing import make_soup, ROSTER_STRAINER, PLAYER_STATS_STRAINER
+import fetch
+from scrape_params import get_stat_table_schema
 
 
 def get_players_from_roster(roster_url):
@@ -13,11 +13,21 @@ def get_players_from_roster(roster_url):
     :return: list of dictionaries, one dictionary per player, contains
     player-specific info like name, number, height, player URL
     """
-    r = requests.get(roster_url)
+    r = fetch.get(roster_url)
     if r.status_code != 200:
         raise Warning('Error in querying roster URL %s.' % roster_url)
 
-    soup = BeautifulSoup(r.text, 'html.parser')
+    return(parse_roster(r.text))
+
+
+def parse_roster(html):
+    """
+    Parse players and player metadata out of a cfbstats.com team roster page
+
+    :param html: str HTML of a team roster page
+    :return: list of dictionaries, one dictionary per player, see `get_players_from_roster`
+    """
+    soup = make_soup(html, parse_only=ROSTER_STRAINER)
     roster = soup.find('div', {'class', 'team-roster'})
     player_list = list()
 
@@ -60,30 +70,63 @@ def get_player_stats(player_url):
     http://www.cfbstats.com/2015/player/128/1074005/index.html
     :return: dictionary with player performance numbers
     """
-    r = requests.get(player_url)
+    r = fetch.get(player_url)
     if r.status_code != 200:
         raise Warning('Error in querying player URL %s.' % player_url)
 
-    soup = BeautifulSoup(r.text, 'html.parser')
+    return(parse_player_stats(r.text))
+
+
+def get_player_stats_many(player_urls, max_concurrency=None, skip_failed=False):
+    """
+    Get detailed player statistics for many player URLs at once,
+    overlapping the page downloads.
+
+    :param player_urls: list of str URLs to specific players in specific years
+    :param max_concurrency: int max number of player pages downloaded at once, default None
+    means use the fetch engine default
+    :param skip_failed: boolean, if True a page answering with an error status gets None
+    instead of failing the whole batch
+    :return: list of player statistics dictionaries (or None), one per player URL, see `get_player_stats`
+    """
+    responses = fetch.get_many(player_urls
+                               , max_concurrency=max_concurrency)
+    player_stats = list()
+
+    for player_url, r in zip(player_urls, responses):
+        if r.status_code != 200:
+            if not skip_failed:
+                raise Warning('Error in querying player URL %s.' % player_url)
+            player_stats.append(None)
+            continue
+        player_stats.append(parse_player_stats(r.text))
+
+    return(player_stats)
+
+
+def parse_player_stats(html):
+    """
+    Parse player statistics out of a cfbstats.com player page
+
+    :param html: str HTML of a player page
+    :return: dictionary with player performance numbers, see `get_player_stats`
+    """
+    soup = make_soup(html, parse_only=PLAYER_STATS_STRAINER)
     tables = soup.find_all('table')
     player_stats = dict()
-    field_mapping = get_player_stat_mapping()
 
     for table in tables:
-        table_name = standardize_field_name(table.caption.text)
-        table_fields = list(map(lambda x: standardize_field_name(x.text), table.find_all('th')))
-        table_values = list(map(lambda x: x.text, table.find_all('td')))
+        columns = get_stat_table_schema(table.caption.text
+                                        , headers=tuple(x.text for x in table.find_all('th')))
+        table_values = table.find_all('td')
 
-        for i in range(len(table_values)):
+        for i, field in columns:
+            if i >= len(table_values):
+                continue
             try:
-                table_values[i] = int(table_values[i])
+                player_stats[field] = int(table_values[i].text)
             except ValueError:
-                table_values[i] = None
-
-            field = table_name + '_' + field_mapping.get(table_fields[i], table_fields[i])
-            table_fields[i] = field
-
-        player_stats.update(dict(zip(table_fields, table_values)))
+                player_stats[field] = None
 
     return(player_stats)
 
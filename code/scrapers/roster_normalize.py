@@ -0,0 +1,100 @@
+import pandas as pd
+
+HEIGHT_REGEX = r'^\s*(\d+)\s*-\s*(\d+)\s*$'
+CATEGORICAL_FIELDS = ['position', 'year_in_school', 'hometown', 'hometown_city', 'hometown_state', 'last_school']
+SMALL_INTEGER_FIELDS = ['number', 'weight', 'height']
+
+
+def parse_height_inches(heights):
+    """
+    Convert cfbstats.com heights ("feet-inches", e.g. "6-2") to integer inches, vectorized
+
+    :param heights: pandas.Series of str heights
+    :return: pandas.Series of nullable Int16 inches, missing where a height can't be parsed
+    """
+    parts = heights.astype(object).where(pd.notnull(heights), '').astype(str).str.extract(HEIGHT_REGEX)
+    inches = pd.to_numeric(parts[0], errors='coerce') * 12 + pd.to_numeric(parts[1], errors='coerce')
+    return(inches.astype('Int16'))
+
+
+def split_hometown(hometowns):
+    """
+    Split cfbstats.com hometowns ("City, ST") into city and state, vectorized. The state is whatever
+    follows the last comma, so e.g. "Toronto, Ontario" splits into "Toronto" and "Ontario".
+
+    :param hometowns: pandas.Series of str hometowns
+    :return: (pandas.Series city, pandas.Series state) 2-tuple, missing where there is no comma
+    """
+    parts = hometowns.astype(object).where(pd.notnull(hometowns), '').astype(str).str.rsplit(',', n=1, expand=True)
+    if parts.shape[1] < 2:
+        parts[1] = None
+
+    has_state = parts[1].notnull()
+    city = parts[0].str.strip().where(has_state, None)
+    state = parts[1].str.strip().str.upper().where(has_state, None)
+    return((city, state))
+
+
+def normalize_roster(players_df):
+    """
+    Convert the raw roster fields of scraped player statistics to compact, typed columns, all at once
+    over every row (e.g. a whole season of teams concatenated together):
+
+    - height becomes integer inches
+    - number, weight and height become nullable 16-bit integers
+    - hometown is split into hometown_city and hometown_state (hometown itself is kept)
+    - position, year_in_school, hometowns and last_school become categoricals, since they repeat
+      across players and seasons
+
+    Frames that were already normalized are returned unchanged.
+
+    :param players_df: player statistics DataFrame, see `run_scrape.get_players_df`
+    :return: normalized copy of `players_df`
+    """
+    players_df = players_df.copy()
+
+    if 'height' in players_df.columns and not pd.api.types.is_numeric_dtype(players_df['height']):
+        players_df['height'] = parse_height_inches(players_df['height'])
+
+    if 'hometown' in players_df.columns and 'hometown_state' not in players_df.columns:
+        players_df['hometown_city'], players_df['hometown_state'] = split_hometown(players_df['hometown'])
+
+    for field in SMALL_INTEGER_FIELDS:
+        if field in players_df.columns and players_df[field].dtype != 'Int16':
+            players_df[field] = pd.to_numeric(players_df[field], errors='coerce').astype('Int16')
+
+    for field in CATEGORICAL_FIELDS:
+        if field in players_df.columns and not isinstance(players_df[field].dtype, pd.CategoricalDtype):
+            players_df[field] = players_df[field].astype('category')
+
+    return(players_df)
+
+
+def normalize_season(team_frames):
+    """
+    Normalize a whole season of teams' player statistics in one vectorized pass, so that every team's
+    categorical columns share the same categories
+
+    :param team_frames: dictionary of {str team name: player statistics DataFrame}
+    :return: dictionary of {str team name: normalized player statistics DataFrame}
+    """
+    if not team_frames:
+        return(dict())
+
+    teams = list(team_frames.keys())
+    season_df = pd.concat([team_frames[team] for team in teams]
+                          , keys=range(len(teams))
+                          , names=['team_idx', None])
+    season_df = normalize_roster(season_df)
+
+    # Split back into teams, dropping statistics columns only other teams filled
+    team_dfs = dict()
+    for team_idx, team_df in season_df.groupby(level='team_idx', sort=False):
+        team_dfs[team_idx] = team_df.droplevel('team_idx').dropna(axis=1, how='all')
+
+    # teams with empty rosters have no group, keep them so the season still lists them as scraped
+    normalized = dict()
+    for team_idx, team in enumerate(teams):
+        normalized[team] = team_dfs.get(team_idx, team_frames[team])
+
+    return(normalized)
@@ -2,12 +2,28 @@ import argparse
 import pickle as pkl
 import os
 import json
+import queue
+import time
+import sys
 import pandas as pd
-import sqlalchemy as sa
 from team_scrape import get_team_metadata
-from player_scrape import get_players_from_roster, get_player_stats
+from player_scrape import get_players_from_roster, get_player_stats_many
+from page_cache import PageCache, get_current_season
+from checkpoint import ScrapeCheckpoint
+from scrape_params import set_player_stat_fields
+from player_frame import PlayerFrameBuilder
+from roster_normalize import normalize_roster, normalize_season
+from scrape_output import ColumnarScrapeWriter, OUTPUT_FORMATS
+from throttle import RetryPolicy, TokenBucket, CircuitBreaker
+import fetch
+import html_parsing
 import multiprocessing as mp
 
+# share the loader's database helpers with the scraper
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'loaders'))
+import mysql_helpers as sql
+from scrape_artifact import ScrapeArtifact
+
 # --------------------------------------------------- #
 # command line argument parser, example usage:
 # $ python run_scrape.py -u ffineis -p password -o ./cfbstats_122017.pkl
@@ -37,67 +53,270 @@ parser.add_argument('-n'
                     , '--n_jobs'
                     , default=mp.cpu_count() - 1
                     , type=int
-                    , help='Number of CPUs to use in parallelized web scrape')
+                    , help='Number of processes to use in parallelized web scrape; each process spends most '
+                           'of its time waiting on pages, so this may exceed the number of CPUs')
+parser.add_argument('--player_batch'
+                    , default=8
+                    , type=int
+                    , help='Number of player pages of one roster a process downloads at once')
+parser.add_argument('-w'
+                    , '--metadata_workers'
+                    , default=fetch.DEFAULT_CONCURRENCY
+                    , type=int
+                    , help='Number of team index pages fetched at once when scraping team metadata')
 parser.add_argument('-o'
                     , '--output'
                     , default='./cfbstats_scrape.pkl'
-                    , help='output filepath for saving the results of the cfb scrape')
+                    , help='output filepath for saving the results of the cfb scrape, an output directory '
+                           'for columnar --output_format')
+parser.add_argument('-f'
+                    , '--output_format'
+                    , default='pickle'
+                    , choices=['pickle'] + list(OUTPUT_FORMATS.keys())
+                    , help='pickle: one .pkl written at the end of the scrape; parquet/feather: stream each '
+                           'team to columnar shards partitioned by year as it finishes, plus a manifest')
+parser.add_argument('--cache_dir'
+                    , default=None
+                    , type=str
+                    , help='directory of an on-disk cache of cfbstats.com pages, optional')
+parser.add_argument('--cache_max_mb'
+                    , default=2048
+                    , type=int
+                    , help='max size of the page cache in megabytes, least recently used pages are evicted')
+parser.add_argument('--cache_ttl'
+                    , default=60
+                    , type=float
+                    , help='minutes until cached current-season pages are revalidated; '
+                           'past seasons never expire')
+parser.add_argument('--replay'
+                    , action='store_true'
+                    , help='offline mode: serve every page from --cache_dir and never touch the network')
+parser.add_argument('--incremental'
+                    , action='store_true'
+                    , help='only scrape (year, team) rosters missing from the college_football database '
+                           '(or from --previous) plus the current season, and save them as a delta artifact')
+parser.add_argument('--previous'
+                    , default=None
+                    , type=str
+                    , help='filepath to a previous run_scrape.py output to compare against in --incremental '
+                           'mode, default is to compare against the college_football database')
+parser.add_argument('--current_season'
+                    , default=get_current_season()
+                    , type=int
+                    , help='season that is still being played and is always re-scraped in --incremental mode')
+parser.add_argument('--checkpoint_dir'
+                    , default=None
+                    , type=str
+                    , help='directory where each finished (year, team) is saved as the scrape runs, optional')
+parser.add_argument('--resume'
+                    , action='store_true'
+                    , help='resume an interrupted scrape from --checkpoint_dir, skipping finished teams')
+parser.add_argument('--max_retries'
+                    , default=5
+                    , type=int
+                    , help='max number of retries of a page after a connection error, timeout, HTTP 429 or 5xx')
+parser.add_argument('--backoff'
+                    , default=1.0
+                    , type=float
+                    , help='seconds to wait before the first retry, doubled (with jitter) for every retry after')
+parser.add_argument('--max_backoff'
+                    , default=60.0
+                    , type=float
+                    , help='max seconds to wait between two attempts at a page')
+parser.add_argument('--rate'
+                    , default=10.0
+                    , type=float
+                    , help='max requests per second sent to cfbstats.com, shared by all processes; 0 means no limit')
+parser.add_argument('--burst'
+                    , default=None
+                    , type=float
+                    , help='max number of requests sent back to back, default is --rate')
+parser.add_argument('--breaker_threshold'
+                    , default=10
+                    , type=int
+                    , help='number of consecutive failed requests that pauses all requests')
+parser.add_argument('--breaker_cooldown'
+                    , default=30.0
+                    , type=float
+                    , help='seconds all requests are paused for once --breaker_threshold is hit')
+parser.add_argument('--parser'
+                    , default='html.parser'
+                    , choices=html_parsing.PARSER_BACKENDS
+                    , help='BeautifulSoup HTML parser backend, e.g. lxml (faster, must be installed); '
+                           'compare backends with bench_parsers.py')
 args = parser.parse_args()
 parser.parse_args()
 
+if args.resume and not args.checkpoint_dir:
+    parser.error('--resume requires --checkpoint_dir')
+
+# Configure HTML parsing and the fetch engine at import time so that worker processes pick them up too
+html_parsing.configure(backend=args.parser)
+if args.cache_dir:
+    fetch.configure(cache=PageCache(args.cache_dir
+                                    , max_bytes=args.cache_max_mb * 1024 ** 2
+                                    , current_season_ttl=args.cache_ttl * 60)
+                    , replay=args.replay)
+elif args.replay:
+    parser.error('--replay requires --cache_dir')
+
 # Required overhead: connect to college_football db and obtain the names
 # of individual player statistics fields
-eng_str = 'mysql+mysqlconnector://' + args.user + ':' + args.password + '@' + args.host + '/college_football'
-eng = sa.engine.create_engine(eng_str)
-conn = eng.connect()
-inspector = sa.inspect(eng)
-PLAYER_STAT_FIELDS = [x['name'] for x in inspector.get_columns('player_stats')]
-conn.close()
+eng = sql.get_sa_eng(args.user
+                     , password=args.password
+                     , host=args.host
+                     , db='college_football')
+PLAYER_STAT_FIELDS = list(sql.get_mysql_table_schema(eng, 'player_stats').keys())
+set_player_stat_fields([x for x in PLAYER_STAT_FIELDS if x not in ['player_id', 'year']])
+
+
+def get_scraped_team_years(previous_output=None):
+    """
+    Find the (year, team) rosters that were already scraped, either from the college_football
+    database or from a previous run_scrape.py output file
+
+    :param previous_output: str filepath to a previous run_scrape.py output, a .pkl file or a
+    parquet/feather output directory, default None means read the team_player_position table
+    :return: set of (int year, str team_name) 2-tuples
+    """
+    if previous_output:
+        # columnar outputs are only read up to their manifest
+        previous = ScrapeArtifact(previous_output)
+        return(set((int(yr), team) for yr in previous.get_years() for team in previous.get_teams(yr)))
+
+    query = 'SELECT DISTINCT tpp.year, t.team_name FROM team_player_position tpp ' \
+            'INNER JOIN team t ON tpp.team_id = t.team_id;'
+    return(set((int(x[0]), x[1]) for x in eng.execute(query).fetchall()))
+
+
+def get_roster_for_par(team_task):
+    """
+    For a given college football team name and roster url in a given year,
+    get the team's players and player metadata. To be used with multiprocessing.Pool
+    methods, e.g. `apply_async`.
+
+    :param team_task: (year, str team_name, str roster_url) 3-tuple
+    :returns: (year, str team_name, list of player dictionaries) 3-tuple
+    """
+    yr, team, roster_url = team_task
+    return((yr, team, get_players_from_roster(roster_url)))
 
 
-def get_player_stats_for_par(team_url_tup):
+def get_player_stats_for_par(player_task):
     """
-    For a given college football team name and url,
-    get player performance/info data. To be used with multiprocessing.Pool
-    methods, e.g. `map`.
+    For a batch of player urls of one roster, get the players' performance data, downloading
+    the batch's pages at once. To be used with multiprocessing.Pool methods, e.g. `apply_async`.
 
-    :param team_url_tup: (str team_name , str roster_url) 2-tuple
-    :returns: list of {team name, player statistics DataFrame} key-value pairs
+    :param player_task: (year, str team_name, list of (int roster index, str player_url) 2-tuples) 3-tuple
+    :returns: (year, str team_name, list of (int roster index, player statistics dictionary) 2-tuples) 3-tuple
     """
-    team = team_url_tup[0]
-    roster_url = team_url_tup[1]
+    yr, team, player_urls = player_task
 
-    player_dfs = list()
-    player_dat = get_players_from_roster(roster_url)
+    # Retryable errors were already retried by the fetch engine. A page that answers with a fatal
+    # status (e.g. 404) will never come back, so keep the player without stats; anything else
+    # fails the run, which can be resumed from its checkpoint.
+    player_stats = get_player_stats_many([x[1] for x in player_urls]
+                                         , max_concurrency=len(player_urls)
+                                         , skip_failed=True)
+    for (_, player_url), stats in zip(player_urls, player_stats):
+        if stats is None:
+            print('    ... skipping statistics of %s %s player: error in querying player URL %s.'
+                  % (yr, team, player_url))
+
+    return((yr, team, [(i, stats) for (i, _), stats in zip(player_urls, player_stats)]))
+
+
+def get_players_df(player_dat, player_stats_list):
+    """
+    Assemble a team's players' info and performance data into one DataFrame
+
+    :param player_dat: list of player dictionaries, result of `get_players_from_roster`
+    :param player_stats_list: list of player statistics dictionaries (or None for players
+    without player statistics), one per element of `player_dat`
+    :returns: player statistics DataFrame
+    """
+    builder = PlayerFrameBuilder(len(player_dat)
+                                 , stat_fields=PLAYER_STAT_FIELDS)
 
     for i in range(len(player_dat)):
-        player_info = player_dat[i]
-        player_info['name'] = [player_info['name']]
+        builder.add_player(i
+                           , player_info=player_dat[i]
+                           , player_stats=player_stats_list[i])
 
-        if player_dat[i]['url']:
-            player_stats = None
-            while not player_stats:
-                try:
-                    player_stats = get_player_stats(player_dat[i]['url'])
-                except Exception as e:
-                    UserWarning(e)
-                    print('...retrying')
-                    pass
+    return(builder.build())
 
-            for field in PLAYER_STAT_FIELDS:
-                player_info[field] = [player_stats.get(field, None)]
 
-        player_dfs.append(pd.DataFrame(player_info))
+def init_worker(fetch_options):
+    """
+    multiprocessing.Pool initializer: hand the parent's shared rate limiter and circuit breaker
+    (and the rest of its fetch engine options) to a worker process.
+
+    :param fetch_options: dictionary of keyword arguments to `fetch.configure`
+    :return: None
+    """
+    fetch.configure(**fetch_options)
 
-    players_df = pd.concat(player_dfs
-                           , ignore_index=True)
-    players_df = players_df.where(pd.notnull(players_df)
-                                  , None)
-    players_df.dropna(axis=1
-                      , how='all'
-                      , inplace=True)
 
-    return ({team: players_df})
+def scrape_teams(pool, team_tasks, roster_window, player_batch=1):
+    """
+    Two-level scrape scheduler: roster tasks produce player tasks of `player_batch` player URLs each,
+    whose pages a worker downloads at once (fetch.get_many), and the pool's workers pull roster and
+    player tasks individually, so one large roster never holds up the run.
+    At most `roster_window` rosters are in flight at once, which keeps teams finishing
+    steadily and bounds the number of partially scraped teams held in memory.
+
+    :param pool: multiprocessing.Pool
+    :param team_tasks: list of (year, str team_name, str roster_url) 3-tuples
+    :param roster_window: int max number of rosters being scraped at once
+    :param player_batch: int number of player pages per player task, downloaded at once by one worker
+    :yield: (year, str team_name, player statistics DataFrame) 3-tuples, as each team finishes
+    """
+    done = queue.Queue()
+    pending_team_tasks = iter(team_tasks)
+    rosters = dict()
+    n_teams_left = len(team_tasks)
+
+    def submit_next_roster():
+        team_task = next(pending_team_tasks, None)
+        if team_task:
+            pool.apply_async(get_roster_for_par
+                             , args=(team_task,)
+                             , callback=lambda x: done.put(('roster', x))
+                             , error_callback=lambda e: done.put(('error', e)))
+
+    for _ in range(roster_window):
+        submit_next_roster()
+
+    while n_teams_left:
+        kind, result = done.get()
+
+        if kind == 'error':
+            raise result
+
+        if kind == 'roster':
+            yr, team, player_dat = result
+            player_urls = [(i, x['url']) for i, x in enumerate(player_dat) if x['url']]
+            rosters[(yr, team)] = {'player_dat': player_dat
+                                   , 'player_stats': [None] * len(player_dat)
+                                   , 'n_left': len(player_urls)}
+            for k in range(0, len(player_urls), player_batch):
+                pool.apply_async(get_player_stats_for_par
+                                 , args=((yr, team, player_urls[k:k + player_batch]),)
+                                 , callback=lambda x: done.put(('player', x))
+                                 , error_callback=lambda e: done.put(('error', e)))
+            submit_next_roster()
+
+        else:
+            yr, team, batch_stats = result
+            for i, player_stats in batch_stats:
+                rosters[(yr, team)]['player_stats'][i] = player_stats
+            rosters[(yr, team)]['n_left'] -= len(batch_stats)
+
+        # Reassemble a team's frame once all of its players are in
+        if rosters[(yr, team)]['n_left'] == 0:
+            roster = rosters.pop((yr, team))
+            n_teams_left -= 1
+            yield((yr, team, get_players_df(roster['player_dat'], roster['player_stats'])))
 
 
 if __name__ == '__main__':
@@ -109,15 +328,36 @@ if __name__ == '__main__':
     team_dat_file = args.team_data
     n_jobs = args.n_jobs
 
-    if not team_dat_file or not os.path.isfile(team_dat_file):
+    # Retry policy, rate limit and circuit breaker are shared by this process and all workers
+    fetch_options = {'retry_policy': RetryPolicy(max_retries=args.max_retries
+                                                 , backoff=args.backoff
+                                                 , max_backoff=args.max_backoff)
+                     , 'circuit_breaker': CircuitBreaker(threshold=args.breaker_threshold
+                                                         , cooldown=args.breaker_cooldown)}
+    if args.rate > 0:
+        fetch_options['rate_limiter'] = TokenBucket(rate=args.rate
+                                                    , burst=args.burst)
+    fetch.configure(**fetch_options)
+    checkpoint = ScrapeCheckpoint(args.checkpoint_dir) if args.checkpoint_dir else None
+    team_dat = checkpoint.load_team_metadata() if args.resume else None
+
+    if team_dat:
+        print('Resuming scrape, loading conference/team relationship data from %s...' % args.checkpoint_dir)
+
+    elif not team_dat_file or not os.path.isfile(team_dat_file):
         print('Scraping conference/team relationship data...')
-        team_dat = get_team_metadata()
+        team_dat = get_team_metadata(n_workers=args.metadata_workers)
 
     else:
         print('Loading conference/team relationship data...')
         with open(team_dat_file, 'rb') as f:
             team_dat = json.load(f)
 
+    # Resumed runs must work from exactly the same (year, team) set, so journal it first
+    if checkpoint:
+        checkpoint.save_team_metadata(team_dat)
+        team_dat = checkpoint.load_team_metadata()
+
     yrs = sorted(list(team_dat.keys()))
     print('%d years\' worth of college football conferences found.\n' % len(yrs))
 
@@ -127,24 +367,15 @@ if __name__ == '__main__':
 
     player_year_stats = dict()
     conference_team_dfs = list()
+    team_tasks = list()
 
-    for i in range(len(yrs)):
-        yr = yrs[i]
-        print('Scraping cfbstats.com data for year %s  --  (year %d/%d):' % (yr, i + 1, len(team_dat)))
-
-        # assemble conferences
-        confs = list(team_dat[yr].keys())
+    for yr in yrs:
 
         # get ready to store teams' players' stats on a per-year basis
         player_year_stats[yr] = dict()
 
         for conf in team_dat[yr]:
-
-            # assemble teams/rosters in a conference in a given year
-            conf_teams = list(team_dat[yr][conf].keys())
-            roster_urls = list()
-
-            for team in conf_teams:
+            for team in team_dat[yr][conf]:
                 # arrange team/conference relationships/wins/losses
                 l = team_dat[yr][conf][team]['losses']
                 w = team_dat[yr][conf][team]['wins']
@@ -154,18 +385,81 @@ if __name__ == '__main__':
                                                 , 'games_won': [w]
                                                 , 'games_lost': [l]})
                 conference_team_dfs.append(conf_team_df)
-                roster_urls.append(team_dat[yr][conf][team]['roster_url'])
-
-            # Begin parallel scrape: get players' stats for a set of teams
-            print('    ... obtaining player statistics for %d teams in the %s conference' % (len(conf_teams), conf))
-            p = mp.Pool(processes=n_jobs)
-            roster_dat = p.map(get_player_stats_for_par
-                               , iterable=zip(conf_teams, roster_urls))
-            p.close()
-
-            # Append parallel scrape to storage dictionary
-            for roster in roster_dat:
-                player_year_stats[yr].update(roster)
+                team_tasks.append((yr, team, team_dat[yr][conf][team]['roster_url']))
+
+    # Incremental mode: skip rosters scraped before, except for the season still being played
+    refresh_yrs = list()
+    if args.incremental:
+        scraped_team_yrs = get_scraped_team_years(args.previous)
+        refresh_yrs = [args.current_season]
+        team_tasks = [x for x in team_tasks
+                      if int(x[0]) in refresh_yrs or (int(x[0]), x[1]) not in scraped_team_yrs]
+        print('Incremental scrape: %d new or current-season (%d) teams to scrape, %d already scraped.\n'
+              % (len(team_tasks), args.current_season, len(scraped_team_yrs)))
+
+        # the delta artifact only describes the teams being scraped
+        delta_keys = set((int(x[0]), x[1]) for x in team_tasks)
+        conference_team_dfs = [x for x in conference_team_dfs
+                               if (x['year'][0], x['team_name'][0]) in delta_keys]
+        for yr in yrs:
+            if not [x for x in team_tasks if x[0] == yr]:
+                del player_year_stats[yr]
+
+        if not team_tasks:
+            print('Nothing new to scrape.')
+            raise SystemExit(0)
+
+    # Skip teams a previous run already finished
+    all_team_tasks = team_tasks
+    if args.resume:
+        team_tasks = [x for x in all_team_tasks if not checkpoint.is_done(x[0], x[1])]
+        print('Resuming scrape: %d of %d teams already finished.\n'
+              % (len(all_team_tasks) - len(team_tasks), len(all_team_tasks)))
+
+    # Columnar output streams every finished team to disk instead of keeping it in memory
+    writer = None
+    if args.output_format != 'pickle':
+        writer = ColumnarScrapeWriter(args.output
+                                      , file_format=args.output_format)
+
+    # Begin parallel scrape: every (year, conference, team) roster and every player page goes through
+    # one long-lived pool, teams are collected in whatever order they finish.
+    print('Scraping cfbstats.com player statistics for %d teams over %d years with %d processes:'
+          % (len(team_tasks), len(yrs), n_jobs))
+    start_time = time.time()
+    p = mp.Pool(processes=n_jobs
+                , initializer=init_worker
+                , initargs=(fetch_options,))
+
+    for i, (yr, team, players_df) in enumerate(scrape_teams(p
+                                                            , team_tasks=team_tasks
+                                                            , roster_window=2 * n_jobs
+                                                            , player_batch=args.player_batch), 1):
+        if checkpoint:
+            checkpoint.save(yr, team, players_df)
+        if writer:
+            writer.write_team(yr, team, normalize_roster(players_df))
+        elif not checkpoint:
+            player_year_stats[yr][team] = players_df
+        elapsed = time.time() - start_time
+        print('    ... (%d/%d) %s %s, %d players  --  %.0fs elapsed, ~%.0fs remaining'
+              % (i, len(team_tasks), yr, team, players_df.shape[0], elapsed
+                 , elapsed / i * (len(team_tasks) - i)))
+
+    p.close()
+    p.join()
+
+    # Rebuild the full scrape from the checkpointed pieces
+    if checkpoint:
+        for yr, team, _ in all_team_tasks:
+            if not writer:
+                player_year_stats[yr][team] = checkpoint.load(yr, team)
+            elif (yr, team) not in writer:
+                writer.write_team(yr, team, normalize_roster(checkpoint.load(yr, team)))
+
+    # Convert raw roster strings to compact typed columns, one whole season at a time
+    for yr in player_year_stats:
+        player_year_stats[yr] = normalize_season(player_year_stats[yr])
 
     # ----------------------------------------------------------- #
     # Save DF's with data to be uploaded into college_football DB #
@@ -185,35 +479,54 @@ if __name__ == '__main__':
     print('Found %d teams comprising %d conferences.\n' % (len(teams), len(conferences)))
 
     # data to populate college_football.positions, college_football.player tables
-    positions = list()
-    player_dfs = list()
-    for yr in player_year_stats:
-        for team in player_year_stats[yr]:
-            positions += player_year_stats[yr][team]['position'].unique().tolist()
-            player_dfs.append(player_year_stats[yr][team][['name', 'hometown']])
+    if writer:
+        positions = list(writer.positions)
+
+    else:
+        positions = list()
+        player_dfs = list()
+        for yr in player_year_stats:
+            for team in player_year_stats[yr]:
+                players_df = player_year_stats[yr][team]
+                # an empty roster can come back without any columns
+                if 'position' in players_df.columns:
+                    positions += players_df['position'].dropna().unique().tolist()
+                player_dfs.append(players_df.reindex(columns=['name', 'hometown']))
+
+        # concatenate all player's tables into one (player_dfs -> players_df)
+        players_df = pd.concat(player_dfs
+                               , ignore_index=True)
+        players_df.drop_duplicates(inplace=True)
+        players_df.rename(columns={'name': 'player_name', 'hometown': 'player_hometown'}
+                          , inplace=True)
+        print('Found %d unique players over %d years.\n' % (players_df.shape[0], len(yrs)))
 
     positions = list(set(positions))
     positions_df = pd.DataFrame({'position_name': positions})
     print('Found %d unique player positions.\n' % (len(positions)))
 
-    # concatenate all player's tables into one (player_dfs -> players_df)
-    players_df = pd.concat(player_dfs
-                           , ignore_index=True)
-    players_df.drop_duplicates(inplace=True)
-    players_df.rename(columns={'name': 'player_name', 'hometown': 'player_hometown'}
-                      , inplace=True)
-    print('Found %d unique players over %d years.\n' % (players_df.shape[0], len(yrs)))
-
     # --------- #
     # Save data #
     # --------- #
-    save_dat = {'conference': conference_df
-        , 'team': team_df
-        , 'conference_team': conference_team_df
-        , 'positions': positions_df
-        , 'player_year_dict': player_year_stats}
-
     print('Saving data scraped from cfbstats.com to %s\n' % args.output)
-    pkl.dump(save_dat, open(args.output, 'wb'))
+
+    if writer:
+        writer.close({'conference': conference_df
+                      , 'team': team_df
+                      , 'conference_team': conference_team_df
+                      , 'positions': positions_df}
+                     , delta=args.incremental
+                     , refresh_years=refresh_yrs)
+
+    else:
+        save_dat = {'conference': conference_df
+            , 'team': team_df
+            , 'conference_team': conference_team_df
+            , 'positions': positions_df
+            , 'player_year_dict': player_year_stats
+            , 'delta': args.incremental
+            , 'refresh_years': refresh_yrs}
+
+        pkl.dump(save_dat, open(args.output, 'wb'))
 
     print('Successfully scraped cfbstats.com college football data')
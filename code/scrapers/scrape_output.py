@@ -0,0 +1,114 @@
+import json
+import os
+import time
+from urllib.parse import quote
+from page_cache import atomic_write
+
+OUTPUT_FORMATS = {'parquet': '.parquet'
+                  , 'feather': '.feather'}
+MANIFEST_FILE = 'manifest.json'
+
+
+def write_frame(df, path, file_format):
+    """
+    Write a DataFrame to a columnar file (via pyarrow), atomically
+
+    :param df: pandas.DataFrame
+    :param path: str output file path
+    :param file_format: str 'parquet' or 'feather' (Arrow IPC)
+    :return: None
+    """
+    tmp_path = os.path.join(os.path.dirname(path), '.tmp_' + os.path.basename(path))
+    df = df.reset_index(drop=True)
+
+    if file_format == 'parquet':
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_feather(tmp_path)
+
+    os.replace(tmp_path, path)
+
+
+class ColumnarScrapeWriter(object):
+    """
+    Streams a scrape to disk as it runs, one columnar shard per (year, team) partitioned by year,
+    instead of holding every season in memory until one final pickle. Layout of the output directory:
+
+        manifest.json                          what was written, see `close`
+        conference.<ext>, team.<ext>, ...      small relation tables, written by `close`
+        player_year/year=<year>/<team>.<ext>   one shard of player statistics per (year, team)
+
+    The manifest is written last, so a directory without one is an unfinished scrape.
+    """
+
+    def __init__(self, output_dir, file_format='parquet'):
+        """
+        :param output_dir: str output directory, created if missing
+        :param file_format: str 'parquet' or 'feather' (Arrow IPC)
+        """
+        if file_format not in OUTPUT_FORMATS:
+            raise ValueError('Output format must be one of: %s' % ', '.join(OUTPUT_FORMATS.keys()))
+
+        self.output_dir = output_dir
+        self.file_format = file_format
+        self.extension = OUTPUT_FORMATS[file_format]
+        self.shards = dict()
+        self.positions = set()
+
+        if not os.path.isdir(output_dir):
+            os.makedirs(output_dir, exist_ok=True)
+
+    def __contains__(self, yr_team):
+        return((str(yr_team[0]), yr_team[1]) in self.shards)
+
+    def write_team(self, yr, team, players_df):
+        """
+        Write one team's player statistics shard
+
+        :param yr: year
+        :param team: str team name
+        :param players_df: player statistics DataFrame
+        :return: None
+        """
+        rel_path = os.path.join('player_year', 'year=%s' % yr, quote(team, safe='') + self.extension)
+        path = os.path.join(self.output_dir, rel_path)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        write_frame(players_df
+                    , path=path
+                    , file_format=self.file_format)
+
+        self.shards[(str(yr), team)] = {'year': str(yr)
+                                        , 'team': team
+                                        , 'path': rel_path
+                                        , 'n_rows': int(players_df.shape[0])
+                                        , 'columns': players_df.columns.tolist()}
+        # an empty roster can come back without any columns
+        if 'position' in players_df.columns:
+            self.positions.update(players_df['position'].dropna().unique().tolist())
+
+    def close(self, tables, **metadata):
+        """
+        Write the relation tables and the manifest, finishing the output
+
+        :param tables: dictionary of {str table name: pandas.DataFrame}, e.g. 'conference', 'team'
+        :param metadata: extra JSON-serializable manifest fields, e.g. delta=True
+        :return: dictionary manifest
+        """
+        table_paths = dict()
+        for name, df in tables.items():
+            table_paths[name] = name + self.extension
+            write_frame(df
+                        , path=os.path.join(self.output_dir, table_paths[name])
+                        , file_format=self.file_format)
+
+        manifest = {'format': self.file_format
+                    , 'created_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+                    , 'tables': table_paths
+                    , 'player_year': sorted(self.shards.values(), key=lambda x: (x['year'], x['team']))}
+        manifest.update(metadata)
+
+        atomic_write(os.path.join(self.output_dir, MANIFEST_FILE)
+                     , json.dumps(manifest, indent=2).encode('utf-8'))
+        return(manifest)
@@ -1,31 +1,27 @@
 import re
+import warnings
 
-def get_player_stat_mapping():
-    """
-    Get mapping between cfbstats.com player statistics terminology
-    and a more standardized one used in an RDBMS schema.
-
-    Football terminology learned from https://www.pro-football-reference.com/about/glossary.htm
+FIELD_SEPARATOR_REGEX = re.compile(r'[\s\/-\\%]')
+FIELD_PERIOD_REGEX = re.compile(r'\.')
 
-    :return: dictionary of {cfbstats.com variables: standardized variables}
-    """
-    stat_map = {
-        'g': 'games',
-        'tfl': 'tackles_for_loss',
-        'tfl_yards': 'tackles_for_loss_yards',
-        'att': 'attempts',
-        'yards_att': 'yards_attempted',
-        'fg': 'field_goals',
-        'int': 'interceptions',
-        'int_ret': 'interceptions_returned',
-        '1xp': 'one_xp',
-        '2xp': 'two_xp',
-        'rating': 'passer_rating',
-        'comp': 'completion',
-        'td': 'touchdown'
-    }
 
-    return(stat_map)
+# mapping between cfbstats.com player statistics terminology and a more standardized one used in an
+# RDBMS schema. Football terminology learned from https://www.pro-football-reference.com/about/glossary.htm
+PLAYER_STAT_MAPPING = {
+    'g': 'games',
+    'tfl': 'tackles_for_loss',
+    'tfl_yards': 'tackles_for_loss_yards',
+    'att': 'attempts',
+    'yards_att': 'yards_attempted',
+    'fg': 'field_goals',
+    'int': 'interceptions',
+    'int_ret': 'interceptions_returned',
+    '1xp': 'one_xp',
+    '2xp': 'two_xp',
+    'rating': 'passer_rating',
+    'comp': 'completion',
+    'td': 'touchdown'
+}
 
 
 def standardize_field_name(field_name):
@@ -35,6 +31,92 @@ def standardize_field_name(field_name):
     :param field_name: name of a player statistic, e.g. "TFL"
     :return: standardized field_name
     """
-    field_name = re.sub(r'[\s\/-\\%]', '_', field_name.lower())
-    field_name = re.sub(r'\.', '', field_name)
-    return(field_name)
\ No newline at end of file
+    field_name = FIELD_SEPARATOR_REGEX.sub('_', field_name.lower())
+    field_name = FIELD_PERIOD_REGEX.sub('', field_name)
+    return(field_name)
+
+
+class StatTableSchemaRegistry(object):
+    """
+    Memoized schemas of the stat tables found on cfbstats.com player pages. Player pages only ever
+    show a small, fixed set of stat tables, so each distinct (caption, header tuple) is standardized
+    once and its final column names are reused for every page after.
+
+    If the known `player_stats` fields are set, columns outside of them are left out of the schema
+    and reported once per distinct table instead of silently showing up as stray columns.
+    """
+
+    def __init__(self, known_fields=None):
+        """
+        :param known_fields: list of str `player_stats` field names, default None means accept every column
+        """
+        self.schemas = dict()
+        self.set_known_fields(known_fields)
+
+    def set_known_fields(self, known_fields):
+        """
+        Set the `player_stats` field names columns are checked against, clearing memoized schemas
+
+        :param known_fields: list of str `player_stats` field names, or None to accept every column
+        :return: None
+        """
+        self.known_fields = None
+        if known_fields is not None:
+            self.known_fields = set(known_fields)
+        self.schemas = dict()
+
+    def get_table_schema(self, caption, headers):
+        """
+        Get the schema of a stat table
+
+        :param caption: str raw table caption, e.g. "Passing"
+        :param headers: tuple of str raw table header texts, e.g. ("G", "Att", "Comp")
+        :return: tuple of (int header position, str column name) 2-tuples, one per kept column
+        """
+        key = (caption, headers)
+        if key in self.schemas:
+            return(self.schemas[key])
+
+        table_name = standardize_field_name(caption)
+        columns = list()
+        unknown_fields = list()
+
+        for i, header in enumerate(headers):
+            header = standardize_field_name(header)
+            field = table_name + '_' + PLAYER_STAT_MAPPING.get(header, header)
+
+            if self.known_fields is None or field in self.known_fields:
+                columns.append((i, field))
+            else:
+                unknown_fields.append(field)
+
+        if unknown_fields:
+            warnings.warn('Stat table "%s" has columns that are not player_stats fields, leaving out: %s'
+                          % (caption, ', '.join(unknown_fields)))
+
+        self.schemas[key] = tuple(columns)
+        return(self.schemas[key])
+
+
+STAT_TABLE_SCHEMAS = StatTableSchemaRegistry()
+
+
+def set_player_stat_fields(known_fields):
+    """
+    Set the `player_stats` field names that scraped stat table columns are checked against
+
+    :param known_fields: list of str `player_stats` field names, or None to accept every column
+    :return: None
+    """
+    STAT_TABLE_SCHEMAS.set_known_fields(known_fields)
+
+
+def get_stat_table_schema(caption, headers):
+    """
+    Get the memoized schema of a stat table, see `StatTableSchemaRegistry.get_table_schema`
+
+    :param caption: str raw table caption
+    :param headers: tuple of str raw table header texts
+    :return: tuple of (int header position, str column name) 2-tuples
+    """
+    return(STAT_TABLE_SCHEMAS.get_table_schema(caption, headers))
\ No newline at end of file
@@ -1,17 +1,34 @@
-from bs4 import BeautifulSoup
-import requests
+from html_parsing import make_soup, CONFERENCE_TEAMS_STRAINER, TEAM_RECORD_STRAINER
+import fetch
 import os
+from concurrent.futures import ThreadPoolExecutor
 from json import dump
 from conference_scrape import get_conference_metadata
 
-# TODO: consider parallelizing get_team_metadata
+
+def get_team_record(index_url):
+    """
+    Get the win/loss record of a team in a year from its cfbstats.com index page
+
+    :param index_url: URL to a team's index page, e.g.
+    http://www.cfbstats.com/2015/team/128/index.html
+    :return: (int wins, int losses) 2-tuple
+    """
+    r = fetch.get(index_url)
+    soup = make_soup(r.text, parse_only=TEAM_RECORD_STRAINER)
+    wl = soup.find('div', {'class': 'team-record'}).find_all('td')[1].text.split('-')
+    return((int(wl[0]), int(wl[1])))
+
+
 # TODO: check if output_file is writable location
-def get_team_metadata(output_file=None):
+def get_team_metadata(output_file=None, n_workers=fetch.DEFAULT_CONCURRENCY):
     """
     Get year, conference, team relations from cfbstats.com
 
     :param output_file: full output file path to dump team scrape into a .json, default None
     means don't save output
+    :param n_workers: int number of worker threads fetching team index pages at once, 1 means
+    fetch them one at a time
 
     :return: nested dictionary with key = year, then dictionary
     with key = conference, dictionary with key = team: URL, wins, losses
@@ -21,16 +38,18 @@ def get_team_metadata(output_file=None):
 
     conferences = get_conference_metadata()
     yrs = list(conferences.keys())
+    yr_responses = fetch.get_many([base_url % yr for yr in yrs]
+                                  , max_concurrency=n_workers)
+    team_keys = list()
 
-    for yr in yrs:
-        r = requests.get(base_url % yr)
+    for yr, r in zip(yrs, yr_responses):
 
         if r.status_code != 200:
             raise Warning('Error in querying conference<>team data for %d. Skipping.' % yr)
             next
 
         conf_team_dict[yr] = dict()
-        soup = BeautifulSoup(r.text, 'html.parser')
+        soup = make_soup(r.text, parse_only=CONFERENCE_TEAMS_STRAINER)
         confs = soup.find_all('div', {'class', 'conference'})
 
         # Iterate over conferences available in the year
@@ -48,13 +67,17 @@ def get_team_metadata(output_file=None):
                 conf_team_dict[yr][conf_name][team_name] = dict()
                 conf_team_dict[yr][conf_name][team_name]['index_url'] = index_url
                 conf_team_dict[yr][conf_name][team_name]['roster_url'] = roster_url
+                team_keys.append((yr, conf_name, team_name))
+
+    # Hit every (year, team) index page at once and get the win/loss record for each
+    # valid (conference, team, year) 3-tuple
+    index_urls = [conf_team_dict[yr][conf_name][team_name]['index_url'] for yr, conf_name, team_name in team_keys]
+    with ThreadPoolExecutor(max_workers=max(1, n_workers)) as executor:
+        records = executor.map(get_team_record, index_urls)
 
-                # Hit the index page and get the win/loss record for each valid (conference, team, year) 3-tuple
-                r2 = requests.get(index_url)
-                soup2 = BeautifulSoup(r2.text, 'html.parser')
-                wl = soup2.find('div', {'class': 'team-record'}).find_all('td')[1].text.split('-')
-                conf_team_dict[yr][conf_name][team_name]['wins'] = int(wl[0])
-                conf_team_dict[yr][conf_name][team_name]['losses'] = int(wl[1])
+        for (yr, conf_name, team_name), (wins, losses) in zip(team_keys, records):
+            conf_team_dict[yr][conf_name][team_name]['wins'] = wins
+            conf_team_dict[yr][conf_name][team_name]['losses'] = losses
 
     # Dump output, if desired.
     if output_file:
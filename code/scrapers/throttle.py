@@ -0,0 +1,141 @@
+import multiprocessing as mp
+import random
+import time
+import requests
+
+
+class RetriesExhausted(requests.exceptions.RequestException):
+    """
+    Raised when a request still fails with a retryable error after every retry was used up.
+    """
+    pass
+
+
+class RetryPolicy(object):
+    """
+    Bounded retries with capped exponential backoff and full jitter. Connection errors, timeouts,
+    HTTP 429 and HTTP 5xx responses are retryable; everything else (e.g. a 404 for a page that does
+    not exist) is fatal and returned to the caller right away.
+    """
+
+    def __init__(self, max_retries=5, backoff=1.0, max_backoff=60.0, jitter=True):
+        """
+        :param max_retries: int max number of retries after the first attempt
+        :param backoff: float seconds to wait before the first retry, doubled for each retry after
+        :param max_backoff: float cap on seconds to wait between two attempts
+        :param jitter: boolean, if True wait a random time between 0 and the backoff so that
+        workers that failed together do not retry together
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+
+    def is_retryable_exception(self, e):
+        return(isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)))
+
+    def is_retryable_status(self, status_code):
+        return(status_code == 429 or status_code >= 500)
+
+    def get_delay(self, attempt, retry_after=None):
+        """
+        Get seconds to wait before retrying
+
+        :param attempt: int number of the attempt that just failed, starting at 0
+        :param retry_after: str value of a Retry-After response header, optional
+        :return: float seconds
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+
+        # honor the server's own request to back off (in seconds form), within the cap
+        if retry_after and str(retry_after).isdigit():
+            delay = max(delay, min(self.max_backoff, float(retry_after)))
+
+        return(delay)
+
+
+class TokenBucket(object):
+    """
+    Token-bucket rate limiter kept in shared memory, so that every process and thread of a
+    scrape draws from the same budget. Pass it to worker processes through a multiprocessing.Pool
+    initializer.
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        :param rate: float requests per second allowed on average
+        :param burst: float max number of requests allowed back to back, default None means `rate`
+        """
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, rate))
+        self._lock = mp.Lock()
+        self._tokens = mp.RawValue('d', self.burst)
+        self._updated = mp.RawValue('d', time.time())
+
+    def acquire(self):
+        """
+        Block until a request may be sent
+
+        :return: None
+        """
+        while True:
+            with self._lock:
+                now = time.time()
+                tokens = min(self.burst, self._tokens.value + (now - self._updated.value) * self.rate)
+                self._updated.value = now
+
+                if tokens >= 1:
+                    self._tokens.value = tokens - 1
+                    return
+
+                self._tokens.value = tokens
+                wait = (1 - tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class CircuitBreaker(object):
+    """
+    Circuit breaker kept in shared memory. After `threshold` consecutive retryable failures across all
+    processes the circuit opens and every request waits out `cooldown` seconds, giving a struggling or
+    throttling server room to recover instead of being hammered by all workers at once.
+    """
+
+    def __init__(self, threshold=10, cooldown=30.0):
+        """
+        :param threshold: int number of consecutive failures that opens the circuit
+        :param cooldown: float seconds the circuit stays open
+        """
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = mp.Lock()
+        self._failures = mp.RawValue('i', 0)
+        self._open_until = mp.RawValue('d', 0.0)
+
+    def wait(self):
+        """
+        Block while the circuit is open
+
+        :return: None
+        """
+        while True:
+            with self._lock:
+                wait = self._open_until.value - time.time()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def record_success(self):
+        with self._lock:
+            self._failures.value = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures.value += 1
+            if self._failures.value >= self.threshold:
+                print('... %d consecutive failed requests, pausing all requests for %.1fs'
+                      % (self._failures.value, self.cooldown))
+                self._open_until.value = time.time() + self.cooldown
+                self._failures.value = 0
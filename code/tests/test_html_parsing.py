@@ -0,0 +1,71 @@
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'scrapers'))
+import html_parsing
+from player_scrape import parse_roster, parse_player_stats
+from scrape_params import STAT_TABLE_SCHEMAS
+
+ROSTER_HTML = '''<html><body>
+<div id="seasons"><a href="/2015/index.html">2015</a></div>
+<div class="team-roster"><table>
+<tr><th>No</th><th>Name</th><th>Pos</th><th>Yr</th><th>Ht</th><th>Wt</th><th>Hometown</th><th>Last School</th></tr>
+<tr>
+<td>12</td>
+<td><a href="2015/player/128/1074005/index.html">John Smith</a></td>
+<td>QB</td>
+<td>SR</td>
+<td>6-2</td>
+<td>210</td>
+<td>Austin, TX</td>
+<td>Austin HS</td>
+</tr>
+<tr>
+<td>-</td>
+<td>Tom Jones</td>
+<td>WR</td>
+<td>FR</td>
+<td>5-11</td>
+<td>-</td>
+<td>Waco, TX</td>
+<td>Waco HS</td>
+</tr>
+</table></div>
+</body></html>'''
+
+PLAYER_HTML = '''<html><body>
+<div class="player"><table><caption>Player</caption><tr><td>not a stat table</td></tr></table></div>
+<table><caption>Passing</caption>
+<tr><th>G</th><th>Att</th><th>Comp</th><th>TD</th></tr>
+<tr><td>12</td><td>300</td><td>-</td><td>25</td></tr>
+</table>
+</body></html>'''
+
+
+@pytest.fixture(params=[True, False], ids=['targeted', 'full'])
+def targeted(request):
+    html_parsing.configure(targeted=request.param)
+    yield(request.param)
+    html_parsing.configure(targeted=True)
+
+
+def test_parse_roster(targeted):
+    players = parse_roster(ROSTER_HTML)
+
+    assert [x['name'] for x in players] == ['John Smith', 'Tom Jones']
+    assert players[0]['number'] == 12 and players[1]['number'] is None
+    assert players[1]['weight'] is None
+    assert players[0]['hometown'] == 'Austin, TX'
+    assert players[0]['url'] == 'http://www.cfbstats.com/2015/player/128/1074005/index.html'
+    assert players[1]['url'] is None
+
+
+def test_parse_player_stats(targeted):
+    STAT_TABLE_SCHEMAS.set_known_fields(None)
+    player_stats = parse_player_stats(PLAYER_HTML)
+
+    assert player_stats['passing_games'] == 12
+    assert player_stats['passing_attempts'] == 300
+    assert player_stats['passing_completion'] is None
+    assert player_stats['passing_touchdown'] == 25
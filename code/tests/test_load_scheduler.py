@@ -0,0 +1,38 @@
+import os
+import sys
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'loaders'))
+from load_scheduler import split_by_key, is_lock_error
+
+
+def test_split_by_key():
+    df = pd.DataFrame({'player_id': [5, 1, 3, 1, 2, 5, 4, 3]
+                       , 'year': range(8)})
+    chunks = split_by_key(df, 'player_id', n_chunks=3)
+
+    assert len(chunks) == 3
+    assert sorted(pd.concat(chunks).index.tolist()) == df.index.tolist()
+
+    # chunks hold disjoint, contiguous ranges of keys, a key's rows are never split
+    key_sets = [set(x['player_id']) for x in chunks]
+    assert [sorted(x) for x in key_sets] == [[1, 2], [3, 4], [5]]
+
+
+def test_split_by_key_few_keys():
+    df = pd.DataFrame({'player_id': [1, 1, 2]})
+    assert [x['player_id'].tolist() for x in split_by_key(df, 'player_id', n_chunks=4)] == [[1, 1], [2]]
+    assert len(split_by_key(df, 'player_id', n_chunks=1)) == 1
+    assert len(split_by_key(df.iloc[:0], 'player_id', n_chunks=4)) == 1
+
+
+class LockError(Exception):
+    def __init__(self, errno):
+        self.errno = errno
+
+
+def test_is_lock_error():
+    assert is_lock_error(LockError(1213))
+    assert is_lock_error(LockError(1205))
+    assert not is_lock_error(LockError(1062))
+    assert not is_lock_error(ValueError())
@@ -0,0 +1,26 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'loaders'))
+from mysql_helpers import melt_sparse
+
+
+def test_melt_sparse():
+    df = pd.DataFrame({'player_id': [1, 2, 3]
+                       , 'year': [2015, 2015, 2016]
+                       , 'passing_games': [12., np.nan, np.nan]
+                       , 'rushing_games': [np.nan, 3., np.nan]
+                       , 'rushing_yards': pd.array([10, 0, None], dtype='Int16')})
+
+    long_df = melt_sparse(df
+                          , id_fields=['player_id', 'year']
+                          , value_fields=['passing_games', 'rushing_games', 'rushing_yards'])
+
+    # one row per non-missing value, zeros included, rows without any value left out
+    assert long_df.columns.tolist() == ['player_id', 'year', 'stat_name', 'stat_value']
+    assert long_df[['player_id', 'year']].values.tolist() == [[1, 2015], [1, 2015], [2, 2015], [2, 2015]]
+    assert long_df['stat_name'].tolist() == ['passing_games', 'rushing_yards', 'rushing_games', 'rushing_yards']
+    assert long_df['stat_value'].tolist() == [12., 10., 3., 0.]
+    assert long_df['stat_name'].cat.categories.tolist() == ['passing_games', 'rushing_games', 'rushing_yards']
@@ -0,0 +1,49 @@
+import os
+import sys
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'loaders'))
+from player_dedup import UnionFind, normalize_text, find_duplicate_players
+
+
+def test_union_find():
+    union_find = UnionFind(6)
+    union_find.union(0, 1)
+    union_find.union(2, 3)
+    union_find.union(1, 3)
+
+    roots = [union_find.find(i) for i in range(6)]
+    assert len(set(roots[:4])) == 1
+    assert len(set(roots)) == 3
+    assert union_find.size[roots[0]] == 4
+
+
+def test_normalize_text():
+    values = normalize_text(pd.Series(['  St. Mary\'s,  PA ', None, 'O\'Neil']))
+    assert values.tolist() == ['st marys, pa', '', 'oneil']
+
+
+def test_find_duplicate_players():
+    player_df = pd.DataFrame({'player_name': ['John Smith', 'John Smith', 'john smith', 'Tom Jones']
+                              , 'player_hometown': ['Downingtown, PA', 'Downing Town, PA', 'Downingtown, OH'
+                                                    , 'Downingtown, PA']}
+                             , index=[10, 11, 13, 14])
+
+    representative = find_duplicate_players(player_df)
+
+    # same name and state with similar hometowns: one cluster, represented by its first row. Other
+    # states and other names are never compared
+    assert representative.tolist() == [10, 10, 13, 14]
+    assert representative.index.tolist() == player_df.index.tolist()
+
+
+def test_find_duplicate_players_chains():
+    # clusters are transitive, rows merge through a third row similar to both
+    player_df = pd.DataFrame({'player_name': ['John Smith'] * 3
+                              , 'player_hometown': ['Shippensville', 'Shippenville', 'Shipenville']
+                              , 'hometown_state': ['PA', 'PA', 'PA']})
+
+    representative = find_duplicate_players(player_df
+                                            , state_field='hometown_state'
+                                            , threshold=80)
+    assert representative.tolist() == [0, 0, 0]
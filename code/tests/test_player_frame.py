@@ -0,0 +1,30 @@
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'scrapers'))
+from player_frame import PlayerFrameBuilder
+
+
+def test_build():
+    builder = PlayerFrameBuilder(3, stat_fields=['passing_games', 'passing_attempts', 'rushing_games'])
+    builder.add_player(0, {'name': 'John Smith', 'hometown': 'Austin, TX'}
+                       , {'passing_games': 12, 'passing_attempts': 300, 'not_a_field': 1})
+    builder.add_player(1, {'name': 'Tom Jones', 'hometown': None}, None)
+    builder.add_player(2, {'name': 'Bob Brown', 'hometown': None}, {'passing_games': 1, 'passing_attempts': None})
+    players_df = builder.build()
+
+    assert players_df.shape[0] == 3
+    assert players_df['name'].tolist() == ['John Smith', 'Tom Jones', 'Bob Brown']
+    assert players_df['hometown'].iloc[0] == 'Austin, TX'
+    assert players_df['hometown'].isna().tolist() == [False, True, True]
+    np.testing.assert_array_equal(players_df['passing_games'].values, [12, np.nan, 1])
+    np.testing.assert_array_equal(players_df['passing_attempts'].values, [300, np.nan, np.nan])
+
+    # statistics nobody has, and fields outside of stat_fields, are left out
+    assert 'rushing_games' not in players_df.columns
+    assert 'not_a_field' not in players_df.columns
+
+
+def test_build_empty_roster():
+    assert PlayerFrameBuilder(0, stat_fields=['passing_games']).build().shape == (0, 0)
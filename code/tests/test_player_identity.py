@@ -0,0 +1,91 @@
+import os
+import sys
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'loaders'))
+from player_identity import PlayerIdentityIndex
+
+
+def get_index(tmp_path):
+    # no database: resolution only uses the in-memory index
+    return(PlayerIdentityIndex(None, index_file=str(tmp_path / 'player_identity.json')))
+
+
+def test_resolve_season_player_on_two_rosters(tmp_path):
+    identity = get_index(tmp_path)
+    season_df = pd.DataFrame({'team_name': pd.Categorical(['Army', 'Army', 'Navy'])
+                              , 'player_name': ['John Smith', 'Tom Jones', 'John Smith']
+                              , 'player_hometown': ['Austin, TX', 'Waco, TX', 'Austin, TX']})
+
+    player_ids, new_player_df = identity.resolve_season(season_df, year=2015)
+
+    assert player_ids.tolist() == [1, 2, 1]
+    assert new_player_df['player_id'].tolist() == [1, 2]
+    assert new_player_df['player_name'].tolist() == ['John Smith', 'Tom Jones']
+
+
+def test_resolve_missing_hometown_doesnt_merge_teams(tmp_path):
+    identity = get_index(tmp_path)
+
+    army_ids, army_new_ids = identity.resolve(pd.DataFrame({'player_name': ['John Smith']
+                                                            , 'player_hometown': [None]})
+                                              , year=2015
+                                              , team='Army')
+    navy_ids, navy_new_ids = identity.resolve(pd.DataFrame({'player_name': ['John Smith']
+                                                            , 'player_hometown': [None]})
+                                              , year=2015
+                                              , team='Navy')
+
+    assert army_ids.tolist() == army_new_ids == [1]
+    assert navy_ids.tolist() == navy_new_ids == [2]
+
+
+def test_resolve_same_roster(tmp_path):
+    identity = get_index(tmp_path)
+    roster_df = pd.DataFrame({'player_name': ['John Smith', 'John Smith', 'Tom Jones']
+                              , 'player_hometown': ['Austin, TX', 'Austin, TX', 'Waco, TX']})
+
+    # two rows of one roster never share a player_id, even with the same name and hometown
+    player_ids, new_player_ids = identity.resolve(roster_df, year=2015, team='Army')
+    assert player_ids.tolist() == new_player_ids == [1, 2, 3]
+
+    # the next season, known players keep their player_ids
+    player_ids, new_player_ids = identity.resolve(roster_df.iloc[[2]], year=2016, team='Army')
+    assert player_ids.tolist() == [3]
+    assert new_player_ids == []
+
+
+def test_resolve_team_continuity(tmp_path):
+    identity = get_index(tmp_path)
+    identity.resolve(pd.DataFrame({'player_name': ['Tom Jones'], 'player_hometown': ['Waco, TX']})
+                     , year=2015
+                     , team='Army')
+
+    # a new hometown on the same team within max_year_gap seasons is the same player
+    player_ids, new_player_ids = identity.resolve(pd.DataFrame({'player_name': ['Tom Jones']
+                                                                , 'player_hometown': ['Dallas, TX']})
+                                                  , year=2016
+                                                  , team='Army')
+    assert player_ids.tolist() == [1]
+    assert new_player_ids == []
+
+    # on another team it's someone else
+    player_ids, new_player_ids = identity.resolve(pd.DataFrame({'player_name': ['Tom Jones']
+                                                                , 'player_hometown': ['Houston, TX']})
+                                                  , year=2016
+                                                  , team='Navy')
+    assert player_ids.tolist() == new_player_ids == [2]
+
+
+def test_resolve_hometown_aliases(tmp_path):
+    identity = get_index(tmp_path)
+    identity.resolve(pd.DataFrame({'player_name': ['John Smith'], 'player_hometown': ['Downingtown, PA']})
+                     , year=2015
+                     , team='Army')
+
+    player_ids, _ = identity.resolve(pd.DataFrame({'player_name': ['John Smith']
+                                                   , 'player_hometown': ['Downing Town, PA']})
+                                     , year=2015
+                                     , team='Navy'
+                                     , hometown_aliases={('John Smith', 'Downing Town, PA'): 'Downingtown, PA'})
+    assert player_ids.tolist() == [1]
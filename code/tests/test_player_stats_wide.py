@@ -0,0 +1,21 @@
+import os
+import re
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', '..', 'sql')
+
+
+def read_sql(file_name):
+    with open(os.path.join(SQL_DIR, file_name), 'r') as f:
+        return(f.read())
+
+
+def test_wide_view_columns_match_player_stats():
+    # the stat table is filled with the player_stats statistics fields (see run_load.get_stat_df), so the
+    # view has to pivot exactly those, in the same order
+    stat_fields = re.findall(r'^\s+(\w+) FLOAT', read_sql('player_stats.sql'), flags=re.MULTILINE)
+    view_columns = re.findall(r"MAX\(CASE WHEN s\.stat_name = '(\w+)' THEN psv\.stat_value END\) AS (\w+)"
+                              , read_sql('player_stats_wide.sql'))
+
+    assert stat_fields
+    assert [x[0] for x in view_columns] == [x[1] for x in view_columns]
+    assert [x[0] for x in view_columns] == stat_fields
@@ -0,0 +1,50 @@
+import os
+import sys
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'scrapers'))
+from roster_normalize import parse_height_inches, split_hometown, normalize_roster, normalize_season
+
+
+def test_parse_height_inches():
+    inches = parse_height_inches(pd.Series(['6-2', ' 5 - 11 ', '6', None]))
+    assert inches.dtype == 'Int16'
+    assert inches.tolist()[:2] == [74, 71]
+    assert inches.isna().tolist() == [False, False, True, True]
+
+
+def test_split_hometown():
+    city, state = split_hometown(pd.Series(['Downingtown, pa', 'St. Paul, Minn., MN', 'Toronto', None]))
+    assert city.tolist()[:2] == ['Downingtown', 'St. Paul, Minn.']
+    assert state.tolist()[:2] == ['PA', 'MN']
+    assert city.isna().tolist() == state.isna().tolist() == [False, False, True, True]
+
+
+def test_normalize_roster():
+    players_df = pd.DataFrame({'name': ['John Smith', 'Tom Jones']
+                               , 'hometown': ['Austin, TX', 'Waco, TX']
+                               , 'height': ['6-2', '5-11']
+                               , 'weight': ['210', '']
+                               , 'position': ['QB', 'QB']})
+    normalized = normalize_roster(players_df)
+
+    assert normalized['height'].tolist() == [74, 71]
+    assert normalized['weight'].dtype == 'Int16'
+    assert normalized['weight'].isna().tolist() == [False, True]
+    assert normalized['hometown_state'].tolist() == ['TX', 'TX']
+    assert isinstance(normalized['position'].dtype, pd.CategoricalDtype)
+
+    # already normalized frames come back unchanged
+    pd.testing.assert_frame_equal(normalize_roster(normalized), normalized)
+
+
+def test_normalize_season_keeps_empty_rosters():
+    team_frames = {'Army': pd.DataFrame({'name': ['John Smith'], 'position': ['QB']})
+                   , 'Navy': pd.DataFrame()
+                   , 'Air Force': pd.DataFrame({'name': ['Tom Jones'], 'position': ['WR']})}
+    normalized = normalize_season(team_frames)
+
+    assert list(normalized.keys()) == ['Army', 'Navy', 'Air Force']
+    assert normalized['Navy'].shape[0] == 0
+    assert normalized['Air Force']['name'].tolist() == ['Tom Jones']
+    assert normalized['Army']['position'].cat.categories.tolist() == ['QB', 'WR']
@@ -19,9 +19,13 @@ mysql -u root -h $HOST college_football < team.sql
 mysql -u root -h $HOST college_football < player.sql
 mysql -u root -h $HOST college_football < positions.sql
 mysql -u root -h $HOST college_football < player_stats.sql
+mysql -u root -h $HOST college_football < stat.sql
 mysql -u root -h $HOST college_football < conference_team.sql
 mysql -u root -h $HOST college_football < team_player_position.sql
+mysql -u root -h $HOST college_football < player_identity.sql
+mysql -u root -h $HOST college_football < player_stat_value.sql
+mysql -u root -h $HOST college_football < player_stats_wide.sql
 mysql -u root -h $HOST -e "GRANT ALL PRIVILEGES ON college_football.* TO '$USER'@'$HOST' IDENTIFIED BY '$PASSWORD'"
 
-echo "The following tables were successfully created:\n conference\n team\n player\n positions\n player_stats\n conference_team\n team_player_position\n"
+echo "The following tables were successfully created:\n conference\n team\n player\n positions\n player_stats\n stat\n conference_team\n team_player_position\n player_identity\n player_stat_value\n player_stats_wide (view)\n"
 echo "college_football database successfully deployed to $HOST."
\ No newline at end of file
@@ -0,0 +1,16 @@
+/* migrate team_player_position.height of a database deployed before heights were stored in inches:
+cfbstats.com "feet-inches" strings in a VARCHAR(8) column (e.g. "6-2") become SMALLINT inches (e.g. 74),
+see team_player_position.sql. Heights already in inches are kept, heights that can't be parsed become NULL,
+so running it twice is harmless. */
+
+UPDATE team_player_position
+SET height = CASE
+    WHEN height REGEXP '^[[:space:]]*[0-9]+[[:space:]]*-[[:space:]]*[0-9]+[[:space:]]*$'
+        THEN CAST(TRIM(SUBSTRING_INDEX(height, '-', 1)) AS UNSIGNED) * 12
+            + CAST(TRIM(SUBSTRING_INDEX(height, '-', -1)) AS UNSIGNED)
+    WHEN height REGEXP '^[[:space:]]*[0-9]+[[:space:]]*$'
+        THEN TRIM(height)
+    ELSE NULL
+END;
+
+ALTER TABLE team_player_position MODIFY height SMALLINT;
@@ -0,0 +1,13 @@
+/* persistent index of player identities: normalized (player name, hometown) and (player name, team)
+keys of each player, with the seasons a team key was seen in (see code/loaders/player_identity.py) */
+
+CREATE TABLE player_identity(
+    identity_hash CHAR(40) NOT NULL PRIMARY KEY,
+    identity_type VARCHAR(8) NOT NULL,
+    identity_key VARCHAR(640) NOT NULL,
+    player_id MEDIUMINT NOT NULL,
+    first_year YEAR,
+    last_year YEAR,
+    CONSTRAINT fk_pi_player_id FOREIGN KEY (player_id) REFERENCES player(player_id) ON UPDATE CASCADE ON DELETE CASCADE,
+    INDEX idx_pi_player_id (player_id)
+);
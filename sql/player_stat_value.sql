@@ -0,0 +1,13 @@
+/* create long-format (sparse) table of player performance statistics: one row per statistic a player
+actually has in a season, instead of one mostly NULL player_stats row, references player and stat tables */
+
+CREATE TABLE player_stat_value(
+    player_id MEDIUMINT NOT NULL,
+    year YEAR NOT NULL,
+    stat_id SMALLINT NOT NULL,
+    stat_value FLOAT(32) NOT NULL,
+    PRIMARY KEY (player_id, year, stat_id),
+    CONSTRAINT fk_psv_player_id FOREIGN KEY (player_id) REFERENCES player(player_id) ON UPDATE CASCADE ON DELETE CASCADE,
+    CONSTRAINT fk_psv_stat_id FOREIGN KEY (stat_id) REFERENCES stat(stat_id) ON UPDATE CASCADE ON DELETE CASCADE,
+    INDEX idx_psv_stat_year (stat_id, year)
+);
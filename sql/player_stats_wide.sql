@@ -0,0 +1,100 @@
+/* compatibility view rebuilding the wide player_stats shape from the long-format player_stat_value
+table, one column per statistic (NULL where a player has no value) */
+
+CREATE VIEW player_stats_wide AS
+SELECT psv.player_id,
+  psv.year,
+  MAX(CASE WHEN s.stat_name = 'all_purpose_running_games' THEN psv.stat_value END) AS all_purpose_running_games,
+  MAX(CASE WHEN s.stat_name = 'all_purpose_running_interceptions_returned' THEN psv.stat_value END) AS all_purpose_running_interceptions_returned,
+  MAX(CASE WHEN s.stat_name = 'all_purpose_running_kick_ret' THEN psv.stat_value END) AS all_purpose_running_kick_ret,
+  MAX(CASE WHEN s.stat_name = 'all_purpose_running_plays' THEN psv.stat_value END) AS all_purpose_running_plays,
+  MAX(CASE WHEN s.stat_name = 'all_purpose_running_punt_ret' THEN psv.stat_value END) AS all_purpose_running_punt_ret,
+  MAX(CASE WHEN s.stat_name = 'all_purpose_running_recv' THEN psv.stat_value END) AS all_purpose_running_recv,
+  MAX(CASE WHEN s.stat_name = 'all_purpose_running_rush' THEN psv.stat_value END) AS all_purpose_running_rush,
+  MAX(CASE WHEN s.stat_name = 'all_purpose_running_total_yards' THEN psv.stat_value END) AS all_purpose_running_total_yards,
+  MAX(CASE WHEN s.stat_name = 'all_purpose_running_yards_play' THEN psv.stat_value END) AS all_purpose_running_yards_play,
+  MAX(CASE WHEN s.stat_name = 'fumble_returns_fum_ret' THEN psv.stat_value END) AS fumble_returns_fum_ret,
+  MAX(CASE WHEN s.stat_name = 'fumble_returns_games' THEN psv.stat_value END) AS fumble_returns_games,
+  MAX(CASE WHEN s.stat_name = 'fumble_returns_touchdown' THEN psv.stat_value END) AS fumble_returns_touchdown,
+  MAX(CASE WHEN s.stat_name = 'fumble_returns_yards' THEN psv.stat_value END) AS fumble_returns_yards,
+  MAX(CASE WHEN s.stat_name = 'interceptions_games' THEN psv.stat_value END) AS interceptions_games,
+  MAX(CASE WHEN s.stat_name = 'interceptions_interceptions' THEN psv.stat_value END) AS interceptions_interceptions,
+  MAX(CASE WHEN s.stat_name = 'interceptions_touchdown' THEN psv.stat_value END) AS interceptions_touchdown,
+  MAX(CASE WHEN s.stat_name = 'interceptions_yards' THEN psv.stat_value END) AS interceptions_yards,
+  MAX(CASE WHEN s.stat_name = 'kickoff_returns_games' THEN psv.stat_value END) AS kickoff_returns_games,
+  MAX(CASE WHEN s.stat_name = 'kickoff_returns_ret' THEN psv.stat_value END) AS kickoff_returns_ret,
+  MAX(CASE WHEN s.stat_name = 'kickoff_returns_touchdown' THEN psv.stat_value END) AS kickoff_returns_touchdown,
+  MAX(CASE WHEN s.stat_name = 'kickoff_returns_yards' THEN psv.stat_value END) AS kickoff_returns_yards,
+  MAX(CASE WHEN s.stat_name = 'kickoffs_games' THEN psv.stat_value END) AS kickoffs_games,
+  MAX(CASE WHEN s.stat_name = 'kickoffs_kickoffs' THEN psv.stat_value END) AS kickoffs_kickoffs,
+  MAX(CASE WHEN s.stat_name = 'kickoffs_onside' THEN psv.stat_value END) AS kickoffs_onside,
+  MAX(CASE WHEN s.stat_name = 'kickoffs_out_of_bounds' THEN psv.stat_value END) AS kickoffs_out_of_bounds,
+  MAX(CASE WHEN s.stat_name = 'kickoffs_touchback' THEN psv.stat_value END) AS kickoffs_touchback,
+  MAX(CASE WHEN s.stat_name = 'kickoffs_yards' THEN psv.stat_value END) AS kickoffs_yards,
+  MAX(CASE WHEN s.stat_name = 'misc_defense_fumbles_forced' THEN psv.stat_value END) AS misc_defense_fumbles_forced,
+  MAX(CASE WHEN s.stat_name = 'misc_defense_games' THEN psv.stat_value END) AS misc_defense_games,
+  MAX(CASE WHEN s.stat_name = 'misc_defense_kicks_punts_blocked' THEN psv.stat_value END) AS misc_defense_kicks_punts_blocked,
+  MAX(CASE WHEN s.stat_name = 'misc_defense_passes_broken_up' THEN psv.stat_value END) AS misc_defense_passes_broken_up,
+  MAX(CASE WHEN s.stat_name = 'misc_defense_qb_hurries' THEN psv.stat_value END) AS misc_defense_qb_hurries,
+  MAX(CASE WHEN s.stat_name = 'passing_attempts' THEN psv.stat_value END) AS passing_attempts,
+  MAX(CASE WHEN s.stat_name = 'passing_completion' THEN psv.stat_value END) AS passing_completion,
+  MAX(CASE WHEN s.stat_name = 'passing_games' THEN psv.stat_value END) AS passing_games,
+  MAX(CASE WHEN s.stat_name = 'passing_interceptions' THEN psv.stat_value END) AS passing_interceptions,
+  MAX(CASE WHEN s.stat_name = 'passing_passer_rating' THEN psv.stat_value END) AS passing_passer_rating,
+  MAX(CASE WHEN s.stat_name = 'passing_touchdown' THEN psv.stat_value END) AS passing_touchdown,
+  MAX(CASE WHEN s.stat_name = 'passing_yards' THEN psv.stat_value END) AS passing_yards,
+  MAX(CASE WHEN s.stat_name = 'passing_yards_attempted' THEN psv.stat_value END) AS passing_yards_attempted,
+  MAX(CASE WHEN s.stat_name = 'place_kicking_' THEN psv.stat_value END) AS place_kicking_,
+  MAX(CASE WHEN s.stat_name = 'place_kicking_attempts' THEN psv.stat_value END) AS place_kicking_attempts,
+  MAX(CASE WHEN s.stat_name = 'place_kicking_extra_point' THEN psv.stat_value END) AS place_kicking_extra_point,
+  MAX(CASE WHEN s.stat_name = 'place_kicking_field_goal' THEN psv.stat_value END) AS place_kicking_field_goal,
+  MAX(CASE WHEN s.stat_name = 'place_kicking_games' THEN psv.stat_value END) AS place_kicking_games,
+  MAX(CASE WHEN s.stat_name = 'place_kicking_made' THEN psv.stat_value END) AS place_kicking_made,
+  MAX(CASE WHEN s.stat_name = 'punt_returns_games' THEN psv.stat_value END) AS punt_returns_games,
+  MAX(CASE WHEN s.stat_name = 'punt_returns_ret' THEN psv.stat_value END) AS punt_returns_ret,
+  MAX(CASE WHEN s.stat_name = 'punt_returns_touchdown' THEN psv.stat_value END) AS punt_returns_touchdown,
+  MAX(CASE WHEN s.stat_name = 'punt_returns_yards' THEN psv.stat_value END) AS punt_returns_yards,
+  MAX(CASE WHEN s.stat_name = 'punting_games' THEN psv.stat_value END) AS punting_games,
+  MAX(CASE WHEN s.stat_name = 'punting_punts' THEN psv.stat_value END) AS punting_punts,
+  MAX(CASE WHEN s.stat_name = 'punting_yards' THEN psv.stat_value END) AS punting_yards,
+  MAX(CASE WHEN s.stat_name = 'receiving_games' THEN psv.stat_value END) AS receiving_games,
+  MAX(CASE WHEN s.stat_name = 'receiving_rec' THEN psv.stat_value END) AS receiving_rec,
+  MAX(CASE WHEN s.stat_name = 'receiving_touchdown' THEN psv.stat_value END) AS receiving_touchdown,
+  MAX(CASE WHEN s.stat_name = 'receiving_yards' THEN psv.stat_value END) AS receiving_yards,
+  MAX(CASE WHEN s.stat_name = 'rushing_attempts' THEN psv.stat_value END) AS rushing_attempts,
+  MAX(CASE WHEN s.stat_name = 'rushing_games' THEN psv.stat_value END) AS rushing_games,
+  MAX(CASE WHEN s.stat_name = 'rushing_touchdown' THEN psv.stat_value END) AS rushing_touchdown,
+  MAX(CASE WHEN s.stat_name = 'rushing_yards' THEN psv.stat_value END) AS rushing_yards,
+  MAX(CASE WHEN s.stat_name = 'sacks_games' THEN psv.stat_value END) AS sacks_games,
+  MAX(CASE WHEN s.stat_name = 'sacks_sack_yards' THEN psv.stat_value END) AS sacks_sack_yards,
+  MAX(CASE WHEN s.stat_name = 'sacks_sacks' THEN psv.stat_value END) AS sacks_sacks,
+  MAX(CASE WHEN s.stat_name = 'scoring_field_goals' THEN psv.stat_value END) AS scoring_field_goals,
+  MAX(CASE WHEN s.stat_name = 'scoring_games' THEN psv.stat_value END) AS scoring_games,
+  MAX(CASE WHEN s.stat_name = 'scoring_one_xp' THEN psv.stat_value END) AS scoring_one_xp,
+  MAX(CASE WHEN s.stat_name = 'scoring_points' THEN psv.stat_value END) AS scoring_points,
+  MAX(CASE WHEN s.stat_name = 'scoring_safety' THEN psv.stat_value END) AS scoring_safety,
+  MAX(CASE WHEN s.stat_name = 'scoring_touchdown' THEN psv.stat_value END) AS scoring_touchdown,
+  MAX(CASE WHEN s.stat_name = 'scoring_two_xp' THEN psv.stat_value END) AS scoring_two_xp,
+  MAX(CASE WHEN s.stat_name = 'tackles_assisted' THEN psv.stat_value END) AS tackles_assisted,
+  MAX(CASE WHEN s.stat_name = 'tackles_for_loss_games' THEN psv.stat_value END) AS tackles_for_loss_games,
+  MAX(CASE WHEN s.stat_name = 'tackles_for_loss_tackles_for_loss' THEN psv.stat_value END) AS tackles_for_loss_tackles_for_loss,
+  MAX(CASE WHEN s.stat_name = 'tackles_for_loss_tackles_for_loss_yards' THEN psv.stat_value END) AS tackles_for_loss_tackles_for_loss_yards,
+  MAX(CASE WHEN s.stat_name = 'tackles_games' THEN psv.stat_value END) AS tackles_games,
+  MAX(CASE WHEN s.stat_name = 'tackles_solo' THEN psv.stat_value END) AS tackles_solo,
+  MAX(CASE WHEN s.stat_name = 'tackles_total' THEN psv.stat_value END) AS tackles_total,
+  MAX(CASE WHEN s.stat_name = 'total_offense_games' THEN psv.stat_value END) AS total_offense_games,
+  MAX(CASE WHEN s.stat_name = 'total_offense_pass_yards' THEN psv.stat_value END) AS total_offense_pass_yards,
+  MAX(CASE WHEN s.stat_name = 'total_offense_plays' THEN psv.stat_value END) AS total_offense_plays,
+  MAX(CASE WHEN s.stat_name = 'total_offense_rush_yards' THEN psv.stat_value END) AS total_offense_rush_yards,
+  MAX(CASE WHEN s.stat_name = 'total_offense_total_yards' THEN psv.stat_value END) AS total_offense_total_yards,
+  MAX(CASE WHEN s.stat_name = 'total_offense_yards_play' THEN psv.stat_value END) AS total_offense_yards_play,
+  MAX(CASE WHEN s.stat_name = 'yards_from_scrimmage_games' THEN psv.stat_value END) AS yards_from_scrimmage_games,
+  MAX(CASE WHEN s.stat_name = 'yards_from_scrimmage_plays' THEN psv.stat_value END) AS yards_from_scrimmage_plays,
+  MAX(CASE WHEN s.stat_name = 'yards_from_scrimmage_recv_yards' THEN psv.stat_value END) AS yards_from_scrimmage_recv_yards,
+  MAX(CASE WHEN s.stat_name = 'yards_from_scrimmage_rush_yards' THEN psv.stat_value END) AS yards_from_scrimmage_rush_yards,
+  MAX(CASE WHEN s.stat_name = 'yards_from_scrimmage_total_yards' THEN psv.stat_value END) AS yards_from_scrimmage_total_yards,
+  MAX(CASE WHEN s.stat_name = 'yards_from_scrimmage_touchdown' THEN psv.stat_value END) AS yards_from_scrimmage_touchdown,
+  MAX(CASE WHEN s.stat_name = 'yards_from_scrimmage_yards_play' THEN psv.stat_value END) AS yards_from_scrimmage_yards_play
+FROM player_stat_value psv
+INNER JOIN stat s ON s.stat_id = psv.stat_id
+GROUP BY psv.player_id, psv.year;
@@ -0,0 +1,10 @@
+/* create dimension table of player statistics (e.g. passing_yards) and the cfbstats.com stat table
+each one comes from (e.g. passing), used by the long-format player_stat_value table */
+
+CREATE TABLE stat(
+    stat_id SMALLINT NOT NULL PRIMARY KEY AUTO_INCREMENT,
+    stat_name VARCHAR(64) NOT NULL,
+    stat_table VARCHAR(32) NOT NULL,
+    CONSTRAINT u_stat_name UNIQUE (stat_name),
+    INDEX idx_stat_table (stat_table)
+);
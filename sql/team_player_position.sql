@@ -1,5 +1,5 @@
 /* create table for expressing (inherently temporal) relationships between players,
-college football teams, and a players position on a team over time */
+college football teams, and a players position on a team over time (height in inches) */
 
 CREATE TABLE team_player_position(
     player_id MEDIUMINT NOT NULL,
@@ -7,7 +7,7 @@ CREATE TABLE team_player_position(
     position_id MEDIUMINT NOT NULL,
     year Year NOT NULL,
     year_in_school VARCHAR(4) NOT NULL,
-    height VARCHAR(8),
+    height SMALLINT,
     weight SMALLINT,
     CONSTRAINT fk_tpp_player_id FOREIGN KEY (player_id) REFERENCES player(player_id) ON UPDATE CASCADE ON DELETE CASCADE,
     CONSTRAINT fk_tpp_team_id FOREIGN KEY (team_id) REFERENCES team(team_id) ON UPDATE CASCADE ON DELETE CASCADE,